@@ -0,0 +1,231 @@
+import os
+import socketserver
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from inspect import iscoroutinefunction
+from typing import Callable, Dict, Optional, Union
+
+from common.exceptions import PlenumTypeError
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, value=1):
+        self.value += value
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, value=1):
+        self.value += value
+
+    def dec(self, value=1):
+        self.value -= value
+
+
+class Timer:
+    """
+    Number, total and maximum of durations in seconds
+    """
+
+    kind = 'summary'
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+
+Metric = Union[Counter, Gauge, Timer]
+
+
+class Instrumentation:
+    """
+    Registry of counters, gauges and timers by name. Each node has its own
+    one, so nodes running in one process do not mix their metrics, and
+    passes it to the objects it instruments. Instrumented code checks
+    `enabled` before updating them, so instrumentation costs an attribute
+    lookup while it is disabled. Code wrapped with `timed` is wrapped only
+    if instrumentation is enabled at the time of wrapping.
+    """
+
+    def __init__(self, prefix='plenum_'):
+        self.prefix = prefix
+        self.enabled = False
+        self._metrics = {}  # type: Dict[str, Metric]
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self._metrics.clear()
+
+    def _get(self, name: str, cls) -> Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls()
+        elif not isinstance(metric, cls):
+            raise PlenumTypeError(name, metric, cls,
+                                  prefix='metric is registered')
+        return metric
+
+    def counter(self, name: str) -> Counter:
+        return self._get(name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        return self._get(name, Gauge)
+
+    def timer(self, name: str) -> Timer:
+        return self._get(name, Timer)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """
+        Returns `func` measuring its calls with the timer `name` if
+        instrumentation is enabled, otherwise `func` itself
+        """
+        if not self.enabled:
+            return func
+        timer = self.timer(name)
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    timer.observe(time.perf_counter() - start)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    timer.observe(time.perf_counter() - start)
+        return wrapper
+
+    def render(self) -> str:
+        """
+        Returns the metrics in Prometheus text exposition format
+        """
+        lines = []
+        for name, metric in sorted(list(self._metrics.items())):
+            name = self.prefix + name
+            lines.append('# TYPE {} {}'.format(name, metric.kind))
+            if isinstance(metric, Timer):
+                lines.append('{}_count {}'.format(name, metric.count))
+                lines.append('{}_sum {}'.format(name, metric.total))
+                lines.append('# TYPE {}_max gauge'.format(name))
+                lines.append('{}_max {}'.format(name, metric.max))
+            else:
+                lines.append('{} {}'.format(name, metric.value))
+        return '\n'.join(lines) + '\n'
+
+
+def measured(name: str) -> Callable:
+    """
+    Decorator measuring calls of a method with the timer `name` of the
+    instrumentation set as the `instrumentation` attribute of its object,
+    while it is set and enabled
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            instr = self.instrumentation  # type: Optional[Instrumentation]
+            if instr is None or not instr.enabled:
+                return func(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                instr.timer(name).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class _HttpHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = self.server.instrumentation.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _UnixSocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.wfile.write(self.server.instrumentation.render().encode())
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn,
+                           socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class InstrumentationExporter:
+    """
+    Serves metrics of the instrumentation in Prometheus text format from a
+    background thread, over HTTP on a local address given as (host, port)
+    or to clients connecting to a Unix socket given as a path
+    """
+
+    def __init__(self, address, instr: Instrumentation):
+        if isinstance(address, str):
+            self._server = _ThreadingUnixServer(address, _UnixSocketHandler)
+        else:
+            self._server = _ThreadingHTTPServer(tuple(address), _HttpHandler)
+        self._server.instrumentation = instr
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='instrumentation-exporter',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
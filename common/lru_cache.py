@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+from common.exceptions import PlenumValueError
+
+
+class LRUCache:
+    """
+    Bounded mapping which evicts the least recently used entry once
+    `max_size` is reached. Unlike `functools.lru_cache` it allows single
+    entries to be invalidated and exposes hit/miss statistics.
+    """
+
+    def __init__(self, max_size: int):
+        if max_size <= 0:
+            raise PlenumValueError('max_size', max_size, '> 0')
+        self._max_size = max_size
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = value
+        if len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,125 @@
+import asyncio
+import socket
+import urllib.request
+
+import pytest
+
+from common.exceptions import PlenumTypeError
+from common.instrumentation import Instrumentation, \
+    InstrumentationExporter, measured
+
+
+@pytest.fixture()
+def instr():
+    instr = Instrumentation()
+    instr.enable()
+    return instr
+
+
+def test_metrics_are_registered_by_name(instr):
+    instr.counter('msgs').inc()
+    instr.counter('msgs').inc(2)
+    instr.gauge('depth').set(5)
+    instr.gauge('depth').dec()
+    assert instr.get('msgs').value == 3
+    assert instr.get('depth').value == 4
+    with pytest.raises(PlenumTypeError):
+        instr.timer('msgs')
+
+
+def test_timed_is_noop_when_disabled():
+    instr = Instrumentation()
+
+    def f():
+        return 1
+
+    assert instr.timed('f', f) is f
+    assert instr.get('f') is None
+
+
+def test_timed_measures_functions_and_coroutines(instr):
+    def f(x):
+        return x + 1
+
+    async def g(x):
+        return x * 2
+
+    assert instr.timed('f', f)(1) == 2
+    assert asyncio.get_event_loop().run_until_complete(
+        instr.timed('g', g)(2)) == 4
+    assert instr.get('f').count == 1
+    assert instr.get('g').count == 1
+    assert instr.get('g').max >= 0
+
+
+def test_measured_uses_instrumentation_of_object():
+    class Measured:
+        instrumentation = None
+
+        @measured('f')
+        def f(self):
+            return 1
+
+    obj = Measured()
+    assert obj.f() == 1
+
+    instr = Instrumentation()
+    obj.instrumentation = instr
+    assert obj.f() == 1
+    assert instr.get('f') is None
+
+    # Enabled is checked on each call
+    instr.enable()
+    assert obj.f() == 1
+    assert instr.get('f').count == 1
+
+    # Other objects have their own instrumentation
+    assert Measured().f() == 1
+    assert instr.get('f').count == 1
+
+
+def test_render_in_prometheus_text_format(instr):
+    instr.counter('sent_bytes').inc(10)
+    instr.timer('commit').observe(0.5)
+    assert instr.render() == '\n'.join([
+        '# TYPE plenum_commit summary',
+        'plenum_commit_count 1',
+        'plenum_commit_sum 0.5',
+        '# TYPE plenum_commit_max gauge',
+        'plenum_commit_max 0.5',
+        '# TYPE plenum_sent_bytes counter',
+        'plenum_sent_bytes 10',
+    ]) + '\n'
+
+
+def test_http_exporter(instr):
+    instr.counter('sent_bytes').inc(10)
+    exporter = InstrumentationExporter(('127.0.0.1', 0), instr)
+    exporter.start()
+    try:
+        host, port = exporter.address
+        url = 'http://{}:{}/metrics'.format(host, port)
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            assert resp.read().decode() == instr.render()
+    finally:
+        exporter.stop()
+
+
+def test_unix_socket_exporter(instr, tmpdir):
+    instr.counter('sent_bytes').inc(10)
+    path = str(tmpdir.join('metrics.sock'))
+    exporter = InstrumentationExporter(path, instr)
+    exporter.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(path)
+            data = b''
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        assert data.decode() == instr.render()
+    finally:
+        exporter.stop()
@@ -0,0 +1,45 @@
+import pytest
+
+from common.exceptions import PlenumValueError
+from common.lru_cache import LRUCache
+
+
+def test_lru_cache_requires_positive_size():
+    with pytest.raises(PlenumValueError):
+        LRUCache(0)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert len(cache) == 2
+
+
+def test_lru_cache_stats():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('b')
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    cache.reset_stats()
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_lru_cache_pop_and_clear():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.pop('a') == 1
+    assert cache.pop('a') is None
+    cache.clear()
+    assert len(cache) == 0
@@ -3,6 +3,7 @@ from collections import namedtuple
 from typing import Sequence
 
 from common.exceptions import PlenumTypeError
+from common.lru_cache import LRUCache
 
 GroupParams = namedtuple('GroupParams',
                          'group_name, g')
@@ -55,3 +56,50 @@ class BlsCryptoVerifier(metaclass=ABCMeta):
     @abstractmethod
     def verify_multi_sig(self, signature: str, message: bytes, pks: Sequence[str]) -> bool:
         pass
+
+
+class CachedBlsCryptoVerifier(BlsCryptoVerifier):
+    """
+    Verifier keeping results of multi-signature verification by the
+    signature, the message and the public keys, so the same multi-signature
+    of a state, like the one in state proofs of many read replies, is
+    verified with pairings only once. Results do not depend on anything
+    else, so the cache is always valid; `clear` just frees it when the BLS
+    keys of the pool change.
+    """
+
+    def __init__(self, verifier: BlsCryptoVerifier, cache_size: int):
+        self._verifier = verifier
+        self._multi_sig_results = LRUCache(cache_size)
+
+    @property
+    def verifier(self) -> BlsCryptoVerifier:
+        return self._verifier
+
+    def cache_info(self) -> dict:
+        return {
+            'hits': self._multi_sig_results.hits,
+            'misses': self._multi_sig_results.misses,
+            'size': len(self._multi_sig_results),
+        }
+
+    def clear(self):
+        self._multi_sig_results.clear()
+        clear = getattr(self._verifier, 'clear', None)
+        if clear is not None:
+            clear()
+
+    def create_multi_sig(self, signatures: Sequence[str]) -> str:
+        return self._verifier.create_multi_sig(signatures)
+
+    def verify_sig(self, signature: str, message: bytes, pk: str) -> bool:
+        return self._verifier.verify_sig(signature, message, pk)
+
+    def verify_multi_sig(self, signature: str, message: bytes,
+                         pks: Sequence[str]) -> bool:
+        key = (signature, message, tuple(pks))
+        result = self._multi_sig_results.get(key)
+        if result is None:
+            result = self._verifier.verify_multi_sig(signature, message, pks)
+            self._multi_sig_results.put(key, result)
+        return result
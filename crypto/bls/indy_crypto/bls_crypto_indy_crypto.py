@@ -5,6 +5,7 @@ from typing import Sequence, Optional
 import base58
 from indy_crypto import IndyCryptoError
 
+from common.lru_cache import LRUCache
 from crypto.bls.bls_crypto import GroupParams, BlsGroupParamsLoader, BlsCryptoVerifier, BlsCryptoSigner
 from indy_crypto.bls import BlsEntity, Generator, VerKey, SignKey, Bls, Signature, MultiSignature
 
@@ -61,15 +62,29 @@ class IndyCryptoBlsUtils:
 
 
 class BlsCryptoVerifierIndyCrypto(BlsCryptoVerifier):
-    def __init__(self, params: GroupParams):
+    def __init__(self, params: GroupParams, ver_key_cache_size=1000):
         self._generator = \
             IndyCryptoBlsUtils.bls_from_str(params.g, Generator)  # type: Generator
+        # Public keys of nodes are the same in most messages, so they are
+        # deserialized from base58 once
+        self._ver_keys = LRUCache(ver_key_cache_size)
+
+    def _ver_key(self, pk: str) -> Optional[VerKey]:
+        ver_key = self._ver_keys.get(pk)
+        if ver_key is None:
+            ver_key = IndyCryptoBlsUtils.bls_from_str(pk, VerKey)
+            if ver_key is not None:
+                self._ver_keys.put(pk, ver_key)
+        return ver_key
+
+    def clear(self):
+        self._ver_keys.clear()
 
     def verify_sig(self, signature: str, message: bytes, pk: str) -> bool:
         bls_signature = IndyCryptoBlsUtils.bls_from_str(signature, Signature)
         if bls_signature is None:
             return False
-        bls_pk = IndyCryptoBlsUtils.bls_from_str(pk, VerKey)
+        bls_pk = self._ver_key(pk)
         if bls_pk is None:
             return False
         return Bls.verify(bls_signature,
@@ -78,7 +93,7 @@ class BlsCryptoVerifierIndyCrypto(BlsCryptoVerifier):
                           self._generator)
 
     def verify_multi_sig(self, signature: str, message: bytes, pks: Sequence[str]) -> bool:
-        epks = [IndyCryptoBlsUtils.bls_from_str(p, VerKey) for p in pks]
+        epks = [self._ver_key(p) for p in pks]
         if None in epks:
             return False
 
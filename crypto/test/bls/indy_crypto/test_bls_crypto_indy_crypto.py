@@ -431,3 +431,19 @@ def test_verify_multi_signature_invalid_long_pk(bls_signer1, bls_signer2, bls_ve
         pks = [invalid_pk1, invalid_pk2]
         assert not bls_verifier.verify_multi_sig(multi_sig,
                                                  message, pks)
+
+
+def test_ver_keys_deserialized_once(bls_signer1, bls_signer2, bls_verifier, message):
+    pks = [bls_signer1.pk, bls_signer2.pk]
+    multi_sig = bls_verifier.create_multi_sig([bls_signer1.sign(message),
+                                               bls_signer2.sign(message)])
+
+    assert bls_verifier.verify_multi_sig(multi_sig, message, pks)
+    assert bls_verifier.verify_multi_sig(multi_sig, message, pks)
+    assert bls_verifier.verify_sig(bls_signer1.sign(message), message, pks[0])
+    assert bls_verifier._ver_keys.misses == 2
+    assert bls_verifier._ver_keys.hits == 3
+
+    bls_verifier.clear()
+    assert bls_verifier.verify_multi_sig(multi_sig, message, pks)
+    assert bls_verifier._ver_keys.misses == 4
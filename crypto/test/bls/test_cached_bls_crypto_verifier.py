@@ -0,0 +1,54 @@
+from typing import Sequence
+
+from crypto.bls.bls_crypto import BlsCryptoVerifier, CachedBlsCryptoVerifier
+
+
+class CountingVerifier(BlsCryptoVerifier):
+    def __init__(self):
+        self.multi_sig_verifications = 0
+        self.cleared = False
+
+    def create_multi_sig(self, signatures: Sequence[str]) -> str:
+        return ''.join(signatures)
+
+    def verify_sig(self, signature: str, message: bytes, pk: str) -> bool:
+        return signature == pk
+
+    def verify_multi_sig(self, signature: str, message: bytes,
+                         pks: Sequence[str]) -> bool:
+        self.multi_sig_verifications += 1
+        return signature == ''.join(pks)
+
+    def clear(self):
+        self.cleared = True
+
+
+def test_multi_sig_verified_once():
+    verifier = CountingVerifier()
+    cached = CachedBlsCryptoVerifier(verifier, cache_size=10)
+
+    for _ in range(3):
+        assert cached.verify_multi_sig('ab', b'root', ['a', 'b'])
+        assert not cached.verify_multi_sig('ba', b'root', ['a', 'b'])
+    assert verifier.multi_sig_verifications == 2
+    assert cached.cache_info() == {'hits': 4, 'misses': 2, 'size': 2}
+
+    # Different keys or message are verified again
+    assert cached.verify_multi_sig('ab', b'root', ('a', 'b', 'c')) is False
+    assert cached.verify_multi_sig('ab', b'other root', ['a', 'b'])
+    assert verifier.multi_sig_verifications == 4
+
+
+def test_cache_is_bounded_and_cleared():
+    verifier = CountingVerifier()
+    cached = CachedBlsCryptoVerifier(verifier, cache_size=1)
+
+    cached.verify_multi_sig('ab', b'root', ['a', 'b'])
+    cached.verify_multi_sig('ab', b'other root', ['a', 'b'])
+    cached.verify_multi_sig('ab', b'root', ['a', 'b'])
+    assert verifier.multi_sig_verifications == 3
+
+    cached.clear()
+    assert verifier.cleared
+    cached.verify_multi_sig('ab', b'root', ['a', 'b'])
+    assert verifier.multi_sig_verifications == 4
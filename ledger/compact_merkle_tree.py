@@ -113,6 +113,16 @@ class CompactMerkleTree(merkle_tree.MerkleTree):
         additional partition to conform with the structure of a merkle tree,
         which is a more complex operation, performed by extend().
         """
+        hashes, nodes = self.__add_subtree(leaves)
+        if self.hashStore:
+            for h in hashes:
+                self.hashStore.writeLeaf(h)
+            for node in nodes:
+                self.hashStore.writeNode(node)
+
+    def __add_subtree(self, leaves: List[bytes]):
+        """Does what _push_subtree() does but instead of writing the leaf
+        hashes and the new nodes to the hash store, returns them."""
         size = len(leaves)
         if count_bits_set(size) != 1:
             raise ValueError("invalid subtree with size != 2^k: %s" % size)
@@ -124,16 +134,10 @@ class CompactMerkleTree(merkle_tree.MerkleTree):
                 subtree_h, mintree_h))
         root_hash, hashes = self.__hasher._hash_full(leaves, 0, size)
 
-        if self.hashStore:
-            for h in hashes:
-                self.hashStore.writeLeaf(h)
-
         new_node_hashes = self.__push_subtree_hash(subtree_h, root_hash)
 
         nodes = [(self.tree_size, height, h) for h, height in new_node_hashes]
-        if self.hashStore:
-            for node in nodes:
-                self.hashStore.writeNode(node)
+        return hashes, nodes
 
     def __push_subtree_hash(self, subtree_h: int, sub_hash: bytes):
         size, mintree_h = 1 << (subtree_h - 1), self.__mintree_height
@@ -159,6 +163,28 @@ class CompactMerkleTree(merkle_tree.MerkleTree):
         self._push_subtree([new_leaf])
         return auditPath
 
+    def append_many(self, new_leaves: List[bytes]) \
+            -> List[Tuple[List[bytes], bytes]]:
+        """Append new leaves onto the end of this tree one by one and return
+        the audit path and the root hash after appending of each leaf.
+
+        The result is the same as of calling append() for each leaf but the
+        leaf hashes and the new nodes are written to the hash store at once.
+        """
+        proofs = []
+        leaf_hashes = []
+        nodes = []
+        for new_leaf in new_leaves:
+            auditPath = list(reversed(self.__hashes))
+            hashes, new_nodes = self.__add_subtree([new_leaf])
+            leaf_hashes.extend(hashes)
+            nodes.extend(new_nodes)
+            proofs.append((auditPath, self.root_hash))
+        if self.hashStore and new_leaves:
+            self.hashStore.writeLeaves(leaf_hashes)
+            self.hashStore.writeNodes(nodes)
+        return proofs
+
     def extend(self, new_leaves: List[bytes]):
         """Extend this tree with new_leaves on the end.
 
@@ -196,27 +222,50 @@ class CompactMerkleTree(merkle_tree.MerkleTree):
 
     @functools.lru_cache(maxsize=256)
     def merkle_tree_hash(self, start: int, end: int):
-        if not end > start:
-            raise ValueError("end must be greater than start")
-        if (end - start) == 1:
-            return self.hashStore.readLeaf(end)
-        leafs, nodes = self.hashStore.getPath(end, start)
-        leafHash = self.hashStore.readLeaf(end)
-        hashes = [leafHash, ]
-        for h in leafs:
-            hashes.append(self.hashStore.readLeaf(h))
-        for h in nodes:
-            hashes.append(self.hashStore.readNode(h))
-        foldedHash = self.__hasher._hash_fold(hashes[::-1])
-        return foldedHash
+        return self._merkle_tree_hashes([(start, end)])[0]
+
+    def _merkle_tree_hashes(self, ranges: List[Tuple[int, int]]):
+        """
+        Hashes of the trees of leaves in the ranges. All the leaf and node
+        hashes they are folded from are read from the hash store at once.
+        """
+        paths = []
+        leaf_positions = []
+        node_positions = []
+        for start, end in ranges:
+            if not end > start:
+                raise ValueError("end must be greater than start")
+            if (end - start) == 1:
+                leafs, nodes = [], []
+            else:
+                leafs, nodes = self.hashStore.getPath(end, start)
+            paths.append((len(leafs), len(nodes)))
+            leaf_positions.append(end)
+            leaf_positions.extend(leafs)
+            node_positions.extend(nodes)
+
+        leaf_hashes = iter(self.hashStore.readLeafsByPos(leaf_positions)
+                           if leaf_positions else [])
+        node_hashes = iter(self.hashStore.readNodesByPos(node_positions)
+                           if node_positions else [])
+        result = []
+        for leafs_count, nodes_count in paths:
+            leafHash = next(leaf_hashes)
+            if leafs_count == nodes_count == 0:
+                result.append(leafHash)
+                continue
+            hashes = [leafHash, ]
+            hashes.extend(next(leaf_hashes) for _ in range(leafs_count))
+            hashes.extend(next(node_hashes) for _ in range(nodes_count))
+            result.append(self.__hasher._hash_fold(hashes[::-1]))
+        return result
 
     def consistency_proof(self, first: int, second: int):
-        return [self.merkle_tree_hash(a, b) for a, b in
-                self._subproof(first, 0, second, True)]
+        return self._merkle_tree_hashes(self._subproof(first, 0, second,
+                                                       True))
 
     def inclusion_proof(self, start, end):
-        return [self.merkle_tree_hash(a, b)
-                for a, b in self._path(start, 0, end)]
+        return self._merkle_tree_hashes(self._path(start, 0, end))
 
     def _subproof(self, m, start_n: int, end_n: int, b: int):
         n = end_n - start_n
@@ -0,0 +1,125 @@
+from typing import List
+
+from common.lru_cache import LRUCache
+from ledger.hash_stores.hash_store import HashStore
+
+
+class CachedHashStore(HashStore):
+    """
+    Hash store keeping the recently read and written leaf and node hashes
+    of another hash store in memory. Hashes never change once they are
+    written, so cached entries have to be dropped only on reset.
+    Positions missing in the cache are read from the underlying store at
+    once with `readLeafsByPos` and `readNodesByPos`.
+    """
+
+    def __init__(self, hash_store: HashStore, cache_size: int):
+        self._store = hash_store
+        self._leaves = LRUCache(cache_size)
+        self._nodes = LRUCache(cache_size)
+
+    @property
+    def store(self) -> HashStore:
+        return self._store
+
+    def cache_info(self) -> dict:
+        return {
+            'hits': self._leaves.hits + self._nodes.hits,
+            'misses': self._leaves.misses + self._nodes.misses,
+            'leaves': len(self._leaves),
+            'nodes': len(self._nodes),
+        }
+
+    @property
+    def is_persistent(self) -> bool:
+        return self._store.is_persistent
+
+    def writeLeaf(self, leafHash):
+        self._store.writeLeaf(leafHash)
+        self._leaves.put(self._store.leafCount, leafHash)
+
+    def writeNode(self, node):
+        self._store.writeNode(node)
+        start, height, nodeHash = node
+        self._nodes.put(self.getNodePosition(start, height), nodeHash)
+
+    def writeLeaves(self, leafHashes):
+        start = self._store.leafCount + 1
+        self._store.writeLeaves(leafHashes)
+        for i, leafHash in enumerate(leafHashes):
+            self._leaves.put(start + i, leafHash)
+
+    def writeNodes(self, nodes):
+        self._store.writeNodes(nodes)
+        for start, height, nodeHash in nodes:
+            self._nodes.put(self.getNodePosition(start, height), nodeHash)
+
+    def readLeaf(self, pos):
+        return self._read_one(pos, self._leaves, self._store.readLeaf)
+
+    def readNode(self, pos):
+        return self._read_one(pos, self._nodes, self._store.readNode)
+
+    def readLeafs(self, startpos, endpos):
+        return self.readLeafsByPos(range(startpos, endpos + 1))
+
+    def readNodes(self, startpos, endpos):
+        return self.readNodesByPos(range(startpos, endpos + 1))
+
+    def readLeafsByPos(self, positions) -> List[bytes]:
+        return self._read(positions, self._leaves,
+                          self._store.readLeafsByPos)
+
+    def readNodesByPos(self, positions) -> List[bytes]:
+        return self._read(positions, self._nodes,
+                          self._store.readNodesByPos)
+
+    @staticmethod
+    def _read_one(pos, cache: LRUCache, read):
+        h = cache.get(pos)
+        if h is None:
+            h = read(pos)
+            if h is not None:
+                cache.put(pos, h)
+        return h
+
+    @staticmethod
+    def _read(positions, cache: LRUCache, read_many) -> List[bytes]:
+        positions = list(positions)
+        hashes = [cache.get(pos) for pos in positions]
+        missing = [pos for pos, h in zip(positions, hashes) if h is None]
+        if missing:
+            read = dict(zip(missing, read_many(missing)))
+            for pos, h in read.items():
+                if h is not None:
+                    cache.put(pos, h)
+            hashes = [read[pos] if h is None else h
+                      for pos, h in zip(positions, hashes)]
+        return hashes
+
+    @property
+    def leafCount(self) -> int:
+        return self._store.leafCount
+
+    @leafCount.setter
+    def leafCount(self, count: int) -> None:
+        self._store.leafCount = count
+
+    @property
+    def nodeCount(self) -> int:
+        return self._store.nodeCount
+
+    @property
+    def closed(self):
+        return self._store.closed
+
+    def open(self):
+        self._store.open()
+
+    def close(self):
+        self._store.close()
+
+    def reset(self) -> bool:
+        self._leaves.clear()
+        self._nodes.clear()
+        return self._store.reset()
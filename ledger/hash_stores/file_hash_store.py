@@ -32,8 +32,18 @@ class FileHashStore(HashStore):
     def is_persistent(self) -> bool:
         return True
 
+    @classmethod
+    def write(cls, data, store, size):
+        store.put(key=None, value=cls._checkedData(data, size))
+
+    @classmethod
+    def writeMany(cls, items, store, size):
+        if items:
+            data = b''.join(cls._checkedData(d, size) for d in items)
+            store.put(key=None, value=data)
+
     @staticmethod
-    def write(data, store, size):
+    def _checkedData(data, size):
         if not isinstance(data, bytes):
             data = data.encode()
         dataSize = len(data)
@@ -42,7 +52,7 @@ class FileHashStore(HashStore):
                 "Data size not allowed. Size of the data should be "
                 "{} but instead was {}".format(
                     size, dataSize))
-        store.put(key=None, value=data)
+        return data
 
     @staticmethod
     def read(store: KeyValueStorageFile, entryNo, size):
@@ -72,6 +82,13 @@ class FileHashStore(HashStore):
     def writeLeaf(self, leafHash):
         self.write(leafHash, self.leavesFile, self.leafSize)
 
+    def writeNodes(self, nodes):
+        self.writeMany([node[2] for node in nodes], self.nodesFile,
+                       self.nodeSize)
+
+    def writeLeaves(self, leafHashes):
+        self.writeMany(leafHashes, self.leavesFile, self.leafSize)
+
     def readNode(self, pos):
         data = self.read(self.nodesFile, pos, self.nodeSize)
         if len(data) < self.nodeSize:
@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from typing import List
 
 from ledger.util import count_bits_set
 from ledger.util import highest_bit_set
@@ -29,6 +30,25 @@ class HashStore:
         :param node: tuple of start, height and nodeHash
         """
 
+    def writeLeaves(self, leafHashes):
+        """
+        append multiple leafHashes to the leaf hash store at once
+
+        :param leafHashes: hashes of the leaves in the order of appending
+        """
+        for leafHash in leafHashes:
+            self.writeLeaf(leafHash)
+
+    def writeNodes(self, nodes):
+        """
+        append multiple nodes to the node hash store at once
+
+        :param nodes: tuples of start, height and nodeHash in the order of
+        appending
+        """
+        for node in nodes:
+            self.writeNode(node)
+
     @abstractmethod
     def readLeaf(self, pos):
         """
@@ -69,6 +89,25 @@ class HashStore:
         :return: list of nodeHashes
         """
 
+    def readLeafsByPos(self, positions) -> List[bytes]:
+        """
+        Read the leaf hashes at the given positions at once
+
+        :param positions: sequence numbers of the leaves
+        :return: list of leafHashes in the order of positions
+        """
+        return [self.readLeaf(pos) for pos in positions]
+
+    def readNodesByPos(self, positions) -> List[bytes]:
+        """
+        Read the node hashes at the given positions at once
+
+        :param positions: sequence numbers of the nodes (as calculated by
+        getNodePosition)
+        :return: list of nodeHashes in the order of positions
+        """
+        return [self.readNode(pos) for pos in positions]
+
     @property
     @abstractmethod
     def leafCount(self) -> int:
@@ -1,5 +1,6 @@
 import logging
 import time
+from typing import List
 
 import base58
 from common.exceptions import PlenumValueError
@@ -131,6 +132,26 @@ class Ledger(ImmutableStore):
 
         return merkle_info
 
+    def add_txns(self, leaves) -> List[dict]:
+        """
+        Add multiple leaves (transactions) to the log and the merkle tree.
+        The log and the hash store of the tree are written in one batch
+        each, merkle info of each leaf is the same as returned by `add`.
+        """
+        start = self.seqNo + 1
+        self._transactionLog.setBatch(
+            [(str(start + i), self.serialize_for_txn_log(leaf))
+             for i, leaf in enumerate(leaves)])
+
+        proofs = self.tree.append_many(
+            [self.serialize_for_tree(leaf) for leaf in leaves])
+        merkle_infos = []
+        for audit_path, root_hash in proofs:
+            self.seqNo += 1
+            merkle_infos.append(self._build_merkle_proof(audit_path,
+                                                         root_hash))
+        return merkle_infos
+
     def _addToTree(self, leafData, serialized=False):
         serializedLeafData = self.serialize_for_tree(leafData) if \
             not serialized else leafData
@@ -146,10 +167,11 @@ class Ledger(ImmutableStore):
         self.seqNo += 1
         return self._build_merkle_proof(audit_path)
 
-    def _build_merkle_proof(self, audit_path):
+    def _build_merkle_proof(self, audit_path, root_hash=None):
+        root_hash = root_hash or self.tree.root_hash
         return {
             F.seqNo.name: self.seqNo,
-            F.rootHash.name: self.hashToStr(self.tree.root_hash),
+            F.rootHash.name: self.hashToStr(root_hash),
             F.auditPath.name: [self.hashToStr(h) for h in audit_path]
         }
 
@@ -240,6 +262,17 @@ class Ledger(ImmutableStore):
             else:
                 break
 
+    def get_serialized_txns(self, frm: int = None, to: int = None):
+        """
+        Same as `getAllTxn` but yields transactions as they are stored,
+        serialized with `txn_serializer`
+        """
+        for seq_no, txn in self._transactionLog.iterator(start=frm, end=to):
+            if to is None or int(seq_no) <= to:
+                yield (int(seq_no), txn)
+            else:
+                break
+
     @staticmethod
     def hashToStr(h):
         return txn_root_serializer.serialize(h)
@@ -84,6 +84,26 @@ def test_query_merkle_info(ledger, genesis_txns, genesis_txn_file):
             sorted(ledger.merkleInfo(i + 1 + offset).items())
 
 
+def test_add_txns(ledger, genesis_txns, genesis_txn_file):
+    offset = len(genesis_txns) if genesis_txn_file else 0
+    txns = [random_txn(i) for i in range(40)]
+    merkleInfo = {}
+    ledger.add(txns[0])
+    for batch in (txns[1:2], txns[2:9], txns[9:25], txns[25:]):
+        for mi in ledger.add_txns(batch):
+            merkleInfo[mi.pop(F.seqNo.name)] = mi
+    assert ledger.add_txns([]) == []
+
+    assert ledger.size == len(txns) + offset
+    assert ledger.tree.hashStore.leafCount == len(txns) + offset
+    assert ledger.tree.hashStore.is_consistent
+    for seqNo in range(2 + offset, len(txns) + 1 + offset):
+        assert sorted(merkleInfo[seqNo].items()) == \
+            sorted(ledger.merkleInfo(seqNo).items())
+    for i, txn in enumerate(txns):
+        assert sorted(txn.items()) == sorted(ledger[i + 1 + offset].items())
+
+
 """
 If the server holding the ledger restarts, the ledger should be fully rebuilt
 from persisted data. Any incoming commands should be stashed. (Does this affect
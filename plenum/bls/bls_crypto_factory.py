@@ -1,10 +1,12 @@
 import os
-from crypto.bls.bls_crypto import BlsGroupParamsLoader
+from crypto.bls.bls_crypto import BlsGroupParamsLoader, \
+    CachedBlsCryptoVerifier
 from crypto.bls.bls_factory import BlsFactoryCrypto
 from crypto.bls.bls_key_manager import BlsKeyManager
 from crypto.bls.indy_crypto.bls_crypto_indy_crypto import BlsGroupParamsLoaderIndyCrypto, BlsCryptoSignerIndyCrypto, \
     BlsCryptoVerifierIndyCrypto
 from plenum.bls.bls_key_manager_file import BlsKeyManagerFile
+from plenum.common.config_util import getConfig
 
 
 # class BlsFactoryCharm(BlsFactoryPlenum):
@@ -41,7 +43,11 @@ class BlsFactoryIndyCrypto(BlsFactoryCrypto):
         return BlsCryptoSignerIndyCrypto(sk=sk, pk=pk, params=group_params)
 
     def _create_bls_crypto_verifier(self, group_params):
-        return BlsCryptoVerifierIndyCrypto(group_params)
+        config = getConfig()
+        verifier = BlsCryptoVerifierIndyCrypto(
+            group_params, ver_key_cache_size=config.BLS_VER_KEY_CACHE_SIZE)
+        return CachedBlsCryptoVerifier(verifier,
+                                       config.BLS_MULTI_SIG_CACHE_SIZE)
 
     def _create_key_manager(self, group_params) -> BlsKeyManager:
         assert self._keys_dir
@@ -1,6 +1,5 @@
 from crypto.bls.bls_key_register import BlsKeyRegister
 from plenum.common.constants import BLS_KEY, NODE, ALIAS, DATA
-from plenum.common.tools import lazy_field
 from plenum.common.txn_util import get_payload_data, get_type
 
 
@@ -11,14 +10,24 @@ class BlsKeyRegisterPoolLedger(BlsKeyRegister):
 
     def __init__(self, ledger):
         self._ledger = ledger
+        self._bls_keys = None  # {node_name : BLS key}
         # Not supported methods
 
     def get_pool_root_hash_committed(self):
         raise NotImplementedError()
 
-    @lazy_field
+    @property
     def _current_bls_keys(self):
-        return self._load_keys_for_root()  # {node_name : BLS key}
+        if self._bls_keys is None:
+            self._bls_keys = self._load_keys_for_root()
+        return self._bls_keys
+
+    def reset(self):
+        """
+        Makes keys to be loaded from the ledger again, when it gets new
+        NODE transactions
+        """
+        self._bls_keys = None
 
     def get_key_by_name(self, node_name, pool_state_root_hash=None):
         return self._current_bls_keys.get(node_name)
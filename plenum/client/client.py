@@ -24,6 +24,7 @@ from plenum.bls.bls_crypto_factory import create_default_bls_crypto_factory
 from plenum.bls.bls_key_register_pool_ledger import \
     BlsKeyRegisterPoolLedger
 from plenum.client.pool_manager import HasPoolManager
+from plenum.client.reply_index import ReplyIndex
 from plenum.common.config_util import getConfig
 from plenum.common.has_file_storage import HasFileStorage
 from plenum.common.ledger import Ledger
@@ -39,8 +40,10 @@ from plenum.common.startable import Status, Mode
 from plenum.common.constants import REPLY, POOL_LEDGER_TXNS, \
     LEDGER_STATUS, CONSISTENCY_PROOF, CATCHUP_REP, REQACK, REQNACK, REJECT, \
     OP_FIELD_NAME, POOL_LEDGER_ID, LedgerState, MULTI_SIGNATURE, MULTI_SIGNATURE_PARTICIPANTS, \
-    MULTI_SIGNATURE_SIGNATURE, MULTI_SIGNATURE_VALUE, CURRENT_PROTOCOL_VERSION
-from plenum.common.txn_util import get_reply_identifier, get_reply_reqId
+    MULTI_SIGNATURE_SIGNATURE, MULTI_SIGNATURE_VALUE, CURRENT_PROTOCOL_VERSION, \
+    NODE, BLS_KEY, DATA
+from plenum.common.txn_util import get_reply_identifier, get_reply_reqId, \
+    get_type, get_payload_data
 from plenum.common.types import f
 from plenum.common.util import getMaxFailures, rawToFriendly, mostCommonElement
 from plenum.persistence.client_req_rep_store_file import ClientReqRepStoreFile
@@ -179,7 +182,13 @@ class Client(Motor,
 
         Motor.__init__(self)
 
-        self.inBox = deque()
+        # Most recent messages from nodes
+        self.inBox = deque(maxlen=self.config.CLIENT_INBOX_SIZE)
+        # Messages from nodes for requests by request key and sender, unlike
+        # `inBox` messages of confirmed requests are dropped
+        self.replyIndex = ReplyIndex(
+            self.config.CLIENT_CONFIRMED_REPLIES_CACHE_SIZE,
+            self.config.CLIENT_PENDING_REQUESTS_CACHE_SIZE)
 
         self.nodestack.connectNicelyUntil = 0  # don't need to connect
         # nicely as a client
@@ -243,6 +252,15 @@ class Client(Motor,
                          format(self, ledgerType))
             return
         self.processPoolTxn(txn)
+        if get_type(txn) == NODE and \
+                BLS_KEY in get_payload_data(txn).get(DATA, {}):
+            self._bls_keys_changed()
+
+    def _bls_keys_changed(self):
+        self._bls_register.reset()
+        clear = getattr(self._multi_sig_verifier, 'clear', None)
+        if clear is not None:
+            clear()
 
     # noinspection PyAttributeOutsideInit
     def setPoolParams(self):
@@ -361,12 +379,25 @@ class Client(Motor,
                     self.ledgerManager.processCatchupRep(cMsg, frm)
             elif msg[OP_FIELD_NAME] == REQACK:
                 self.reqRepStore.addAck(msg, frm)
+                self.replyIndex.add_ack(self._req_key_of(msg), frm)
                 self._got_expected(msg, frm)
             elif msg[OP_FIELD_NAME] == REQNACK:
                 self.reqRepStore.addNack(msg, frm)
+                key = self._req_key_of(msg)
+                nacks = self.replyIndex.add_nack(key, frm,
+                                                 msg.get(f.REASON.nm))
+                # Nodes which did not nack the request can not order it
+                if self.quorums.strong.is_reached(nacks):
+                    self.replyIndex.fail(key)
                 self._got_expected(msg, frm)
             elif msg[OP_FIELD_NAME] == REJECT:
                 self.reqRepStore.addReject(msg, frm)
+                key = self._req_key_of(msg)
+                rejects = self.replyIndex.add_reject(key, frm,
+                                                     msg.get(f.REASON.nm))
+                # At least one correct node found the request invalid
+                if self.quorums.reply.is_reached(rejects):
+                    self.replyIndex.fail(key)
                 self._got_expected(msg, frm)
             elif msg[OP_FIELD_NAME] == REPLY:
                 result = msg[f.RESULT.nm]
@@ -376,10 +407,15 @@ class Client(Motor,
                                                        reqId,
                                                        frm,
                                                        result)
+                self.replyIndex.add_reply((identifier, reqId), frm, msg)
 
                 self._got_expected(msg, frm)
                 self.postReplyRecvd(identifier, reqId, frm, result, numReplies)
 
+    @staticmethod
+    def _req_key_of(msg) -> Tuple[str, int]:
+        return get_reply_identifier(msg), get_reply_reqId(msg)
+
     def postReplyRecvd(self, identifier, reqId, frm, result, numReplies):
         if not self.txnLog.hasTxn(identifier, reqId):
             reply, _ = self.getReply(identifier, reqId)
@@ -451,11 +487,21 @@ class Client(Motor,
 
         :param identifier: identifier of the entity making the request
         :param reqId: Request ID
-        :return: list of request results from all nodes
+        :return: list of request results from all nodes, kept once the
+        reply for the request is confirmed for
+        `CLIENT_CONFIRMED_REPLIES_CACHE_SIZE` most recently used requests,
+        empty for requests confirmed before them
         """
-        return {frm: msg for msg, frm in self.inBox
-                if msg[OP_FIELD_NAME] == REPLY and get_reply_reqId(msg[f.RESULT.nm]) == reqId and
-                get_reply_identifier(msg[f.RESULT.nm]) == identifier}
+        return dict(self.replyIndex.replies((identifier, reqId)))
+
+    def getAcks(self, identifier: str, reqId: int) -> Set[str]:
+        return set(self.replyIndex.acks((identifier, reqId)))
+
+    def getNacks(self, identifier: str, reqId: int) -> Dict[str, str]:
+        return dict(self.replyIndex.nacks((identifier, reqId)))
+
+    def getRejects(self, identifier: str, reqId: int) -> Dict[str, str]:
+        return dict(self.replyIndex.rejects((identifier, reqId)))
 
     def hasConsensus(self, identifier: str, reqId: int) -> Optional[Reply]:
         """
@@ -465,6 +511,16 @@ class Client(Motor,
         :param identifier: identifier of the entity making the request
         :param reqId: Request ID
         """
+        key = (identifier, reqId)
+        confirmed = self.replyIndex.confirmed(key)
+        if confirmed is None and key not in self.replyIndex:
+            # The reply index keeps a limited number of confirmed replies,
+            # all of them are in the transaction log
+            confirmed = self.txnLog.getTxn(identifier, reqId)
+            if confirmed is not None:
+                self.replyIndex.confirm(key, confirmed)
+        if confirmed is not None:
+            return confirmed
         full_req_id = '({}:{})'.format(identifier, reqId)
         replies = self.getRepliesFromAllNodes(identifier, reqId)
         if not replies:
@@ -472,11 +528,13 @@ class Client(Motor,
         proved_reply = self.take_one_proved(replies, full_req_id)
         if proved_reply:
             logger.debug("Found proved reply for {}".format(full_req_id))
+            self.replyIndex.confirm(key, proved_reply)
             return proved_reply
         quorumed_reply = self.take_one_quorumed(replies, full_req_id)
         if quorumed_reply:
             logger.debug("Reply quorum for {} achieved"
                          .format(full_req_id))
+            self.replyIndex.confirm(key, quorumed_reply)
             return quorumed_reply
 
     def take_one_quorumed(self, replies, full_req_id):
@@ -0,0 +1,155 @@
+from typing import Any, Dict, Optional, Set, Tuple
+
+from common.lru_cache import LRUCache
+
+ReqKeyType = Tuple[str, int]
+
+
+class PendingRequest:
+    """
+    Messages received from nodes for a request with no confirmed reply
+    """
+    __slots__ = ('replies', 'acks', 'nacks', 'rejects')
+
+    def __init__(self):
+        self.replies = {}  # type: Dict[str, Any]
+        self.acks = set()  # type: Set[str]
+        self.nacks = {}  # type: Dict[str, str]
+        self.rejects = {}  # type: Dict[str, str]
+
+
+class ReplyIndex:
+    """
+    Replies, acks, nacks and rejects received by the client from nodes,
+    indexed by (identifier, reqId) of the request and the sender node, so
+    looking them up does not depend on the number of received messages.
+
+    Once a request has a confirmed reply, i.e. a quorum of equal replies or
+    a reply with a valid state proof, acks, nacks and rejects for it are
+    dropped and the confirmed reply is kept along with the replies of the
+    nodes, for `max_confirmed` most recently used requests. Later replies
+    are added to the kept ones, other later messages are ignored.
+
+    Once a request fails, i.e. it has a quorum of nacks or rejects, its
+    replies and acks are dropped and its nacks and rejects are kept for
+    `max_confirmed` most recently used failed requests. Later nacks and
+    rejects are added to the kept ones, other later messages are ignored.
+
+    Messages of requests which neither are confirmed nor fail are kept for
+    `max_pending` most recently used requests.
+    """
+
+    def __init__(self, max_confirmed: int, max_pending: int):
+        self._pending = LRUCache(max_pending)
+        # Confirmed reply and replies of the nodes by request
+        self._confirmed = LRUCache(max_confirmed)
+        # Nacks and rejects by failed request
+        self._failed = LRUCache(max_confirmed)
+
+    def _pending_request(self, key: ReqKeyType) -> PendingRequest:
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = PendingRequest()
+            self._pending.put(key, pending)
+        return pending
+
+    def add_reply(self, key: ReqKeyType, sender: str, msg) -> int:
+        """
+        Returns the number of nodes the request has replies from
+        """
+        confirmed = self._confirmed.get(key)
+        if confirmed is not None:
+            replies = confirmed[1]
+        elif key in self._failed:
+            return 0
+        else:
+            replies = self._pending_request(key).replies
+        replies[sender] = msg
+        return len(replies)
+
+    def add_ack(self, key: ReqKeyType, sender: str):
+        if key not in self._confirmed and key not in self._failed:
+            self._pending_request(key).acks.add(sender)
+
+    def add_nack(self, key: ReqKeyType, sender: str, reason: str) -> int:
+        """
+        Returns the number of nodes the request has nacks from
+        """
+        if key in self._confirmed:
+            return 0
+        failed = self._failed.get(key)
+        nacks = failed.nacks if failed is not None else \
+            self._pending_request(key).nacks
+        nacks[sender] = reason
+        return len(nacks)
+
+    def add_reject(self, key: ReqKeyType, sender: str, reason: str) -> int:
+        """
+        Returns the number of nodes the request has rejects from
+        """
+        if key in self._confirmed:
+            return 0
+        failed = self._failed.get(key)
+        rejects = failed.rejects if failed is not None else \
+            self._pending_request(key).rejects
+        rejects[sender] = reason
+        return len(rejects)
+
+    def replies(self, key: ReqKeyType) -> Dict[str, Any]:
+        confirmed = self._confirmed.get(key)
+        if confirmed is not None:
+            return confirmed[1]
+        pending = self._pending.get(key)
+        return pending.replies if pending is not None else {}
+
+    def acks(self, key: ReqKeyType) -> Set[str]:
+        pending = self._pending.get(key)
+        return pending.acks if pending is not None else set()
+
+    def nacks(self, key: ReqKeyType) -> Dict[str, str]:
+        pending = self._pending.get(key) or self._failed.get(key)
+        return pending.nacks if pending is not None else {}
+
+    def rejects(self, key: ReqKeyType) -> Dict[str, str]:
+        pending = self._pending.get(key) or self._failed.get(key)
+        return pending.rejects if pending is not None else {}
+
+    def confirm(self, key: ReqKeyType, reply):
+        pending = self._pending.pop(key)
+        self._failed.pop(key)
+        self._confirmed.put(key, (reply,
+                                  pending.replies if pending is not None
+                                  else {}))
+
+    def confirmed(self, key: ReqKeyType) -> Optional[Any]:
+        confirmed = self._confirmed.get(key)
+        return confirmed[0] if confirmed is not None else None
+
+    def fail(self, key: ReqKeyType):
+        """
+        Drops replies and acks of the request keeping its nacks and rejects
+        """
+        if key in self._confirmed or key in self._failed:
+            return
+        failed = self._pending.pop(key) or PendingRequest()
+        failed.replies = {}
+        failed.acks = set()
+        self._failed.put(key, failed)
+
+    def failed(self, key: ReqKeyType) -> bool:
+        return key in self._failed
+
+    def __contains__(self, key: ReqKeyType) -> bool:
+        """
+        Whether the request has a confirmed reply or any received messages
+        """
+        return key in self._confirmed or key in self._pending or \
+            key in self._failed
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Number of requests with received messages but with no confirmed
+        reply which have not failed
+        """
+        return len(self._pending)
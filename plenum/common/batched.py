@@ -1,7 +1,9 @@
 from collections import deque
-from typing import Any, Iterable, Dict
+from functools import partial
+from typing import Any, Iterable, Dict, List
 
-from plenum.common.constants import BATCH, OP_FIELD_NAME
+from plenum.common.constants import BATCH, OP_FIELD_NAME, PREPREPARE, \
+    PREPARE, COMMIT, PROPAGATE, CATCHUP_REP
 from plenum.common.prepare_batch import split_messages_on_batches
 from stp_core.common.constants import CONNECTION_PREFIX
 from stp_core.crypto.signer import Signer
@@ -21,6 +23,9 @@ class Batched(MessageProcessor):
     Assumes a Stack (ZStack or RStack) is mixed
     """
 
+    # Messages sent with msgpack to remotes accepting it, when enabled
+    msgpack_ops = {PREPREPARE, PREPARE, COMMIT, PROPAGATE, CATCHUP_REP}
+
     def __init__(self, config=None):
         """
         :param self: 'NodeStacked'
@@ -65,11 +70,25 @@ class Batched(MessageProcessor):
         :param message_splitter: callable that splits msg on
             two smaller messages
         """
+        if self._can_send_msgpack(msg):
+            rids = rids or list(self.remotes.keys())
+            msgpack_rids = [r for r in rids if self._accepts_msgpack(r)]
+            if msgpack_rids:
+                json_rids = [r for r in rids if r not in msgpack_rids]
+                rv = self._send(msg, msgpack_rids, signer, message_splitter,
+                                binary=True)
+                if json_rids and rv[0]:
+                    rv = self._send(msg, json_rids, signer, message_splitter)
+                return rv
+        return self._send(msg, rids, signer, message_splitter)
+
+    def _send(self, msg, rids, signer, message_splitter, binary=False):
         # Signing (if required) and serializing before enqueueing otherwise
         # each call to `_enqueue` will have to sign it and `transmit` will try
         # to serialize it which is waste of resources
         message_parts, err_msg = \
-            self.prepare_for_sending(msg, signer, message_splitter)
+            self.prepare_for_sending(msg, signer, message_splitter,
+                                     binary=binary)
 
         # TODO: returning breaks contract of super class
         if err_msg is not None:
@@ -84,6 +103,46 @@ class Batched(MessageProcessor):
                 self._enqueueIntoAllRemotes(part, signer)
         return True, None
 
+    def send_serialized(self, msg_parts: List[bytes], *rids: int) -> None:
+        """
+        Enqueue messages which are already serialized the way the remotes
+        accept and fit the message length limit
+
+        :param msg_parts: the serialized messages
+        :param rids: ids of the remotes to whose outBoxes
+            the messages must be enqueued
+        """
+        for r in rids:
+            for part in msg_parts:
+                self._enqueue(part, r, None)
+
+    def accepts_msgpack(self, op: str, rid: int) -> bool:
+        """
+        Whether messages of type `op` are sent to the remote with msgpack
+        """
+        return self._can_send_msgpack_op(op) and self._accepts_msgpack(rid)
+
+    def _can_send_msgpack(self, msg) -> bool:
+        op = getattr(msg, 'typename', None)
+        if op is None and isinstance(msg, dict):
+            op = msg.get(OP_FIELD_NAME)
+        return self._can_send_msgpack_op(op)
+
+    def _can_send_msgpack_op(self, op) -> bool:
+        # msgpack messages can be batched only in frames
+        if self.stp_config.NODE_STACK_SERIALIZATION != 'msgpack' or \
+                not self.stp_config.BATCH_FRAMING_ENABLED:
+            return False
+        return op in self.msgpack_ops
+
+    def _accepts_msgpack(self, rid) -> bool:
+        # msgpack messages are batched only in frames, so the remote has to
+        # accept both
+        remote = self.remotes.get(rid)
+        return remote is not None and \
+            remote.name in self.msgpackRemotes and \
+            remote.name in self.framingRemotes
+
     def flushOutBoxes(self) -> None:
         """
         Clear the outBoxes and transmit batched messages to remotes.
@@ -101,8 +160,10 @@ class Batched(MessageProcessor):
                         "{} batching {} msgs to {} into fewer transmissions".
                         format(self, len(msgs), dest))
                     logger.trace("    messages: {}".format(msgs))
+                    make_batch = partial(self._make_batch,
+                                         framed=self._accepts_frames(rid))
                     batches = split_messages_on_batches(list(msgs),
-                                                        self._make_batch,
+                                                        make_batch,
                                                         self._test_batch_len,
                                                         )
                     msgs.clear()
@@ -139,8 +200,18 @@ class Batched(MessageProcessor):
                              logMethod=logger.debug)
             del self.outBoxes[rid]
 
-    def _make_batch(self, msgs):
+    def _accepts_frames(self, rid) -> bool:
+        if not self.stp_config.BATCH_FRAMING_ENABLED:
+            return False
+        remote = self.remotes.get(rid)
+        return remote is not None and remote.name in self.framingRemotes
+
+    def _make_batch(self, msgs, framed=False):
         if len(msgs) > 1:
+            if framed:
+                # Messages are already serialized so they are just framed,
+                # receiver deserializes each message once
+                return self.frameMsgs(msgs)
             batch = Batch(msgs, None)
             serialized_batch = self.sign_and_serialize(batch)
         else:
@@ -166,12 +237,16 @@ class Batched(MessageProcessor):
         return msg
 
     def prepare_for_sending(self, msg, signer,
-                            message_splitter=lambda x: None):
+                            message_splitter=lambda x: None, binary=False):
         large_msg_parts = [msg]
         fine_msg_parts = []
         while len(large_msg_parts):
             part = large_msg_parts.pop()
-            part_bytes = self.sign_and_serialize(part, signer)
+            if binary:
+                part_bytes = self.sign_and_serialize(part, signer,
+                                                     binary=True)
+            else:
+                part_bytes = self.sign_and_serialize(part, signer)
             if self.msg_len_val.is_len_less_than_limit(len(part_bytes)):
                 fine_msg_parts.append(part_bytes)
                 continue
@@ -189,8 +264,10 @@ class Batched(MessageProcessor):
 
         return fine_msg_parts, None
 
-    def sign_and_serialize(self, msg, signer=None):
+    def sign_and_serialize(self, msg, signer=None, binary=False):
         payload = self.prepForSending(msg, signer)
+        if binary:
+            return self.serializeMsgpack(payload)
         msg_bytes = self.serializeMsg(payload)
         return msg_bytes
 
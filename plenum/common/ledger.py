@@ -2,6 +2,7 @@ from copy import copy
 from typing import List, Tuple
 
 from common.exceptions import PlenumValueError
+from common.instrumentation import measured
 from ledger.ledger import Ledger as _Ledger
 from ledger.util import F
 from plenum.common.txn_util import append_txn_metadata, get_seq_no
@@ -11,6 +12,9 @@ logger = getlogger()
 
 
 class Ledger(_Ledger):
+    # Instrumentation of the node having the ledger, set by the node
+    instrumentation = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Merkle tree of containing transactions that have not yet been
@@ -60,6 +64,15 @@ class Ledger(_Ledger):
         merkle_info.pop(F.seqNo.name, None)
         return merkle_info
 
+    def add_txns(self, txns):
+        for i, txn in enumerate(txns):
+            if get_seq_no(txn) is None:
+                append_txn_metadata(txn, seq_no=self.seqNo + i + 1)
+        merkle_infos = super().add_txns(txns)
+        for merkle_info in merkle_infos:
+            merkle_info.pop(F.seqNo.name, None)
+        return merkle_infos
+
     def _append_seq_no(self, txns, start_seq_no):
         # TODO: Fix name `start_seq_no`, it is misleading. The seq no start from `start_seq_no`+1
         seq_no = start_seq_no
@@ -68,6 +81,7 @@ class Ledger(_Ledger):
             append_txn_metadata(txn, seq_no=seq_no)
         return txns
 
+    @measured('ledger_commit')
     def commitTxns(self, count: int) -> Tuple[Tuple[int, int], List]:
         """
         The number of txns from the beginning of `uncommittedTxns` to commit
@@ -76,10 +90,10 @@ class Ledger(_Ledger):
         numbers of the committed txns
         """
         committedSize = self.size
-        committedTxns = []
-        for txn in self.uncommittedTxns[:count]:
-            txn.update(self.append(txn))
-            committedTxns.append(txn)
+        committedTxns = self.uncommittedTxns[:count]
+        for txn, merkle_info in zip(committedTxns,
+                                    self.add_txns(committedTxns)):
+            txn.update(merkle_info)
         self.uncommittedTxns = self.uncommittedTxns[count:]
         logger.debug('Committed {} txns, {} are uncommitted'.
                      format(len(committedTxns), len(self.uncommittedTxns)))
@@ -1,5 +1,90 @@
+from typing import List, Optional, Tuple
+
+from sortedcontainers import SortedDict, SortedList
+
 from plenum.common.constants import LedgerState
 from plenum.common.ledger import Ledger
+from plenum.common.types import f
+
+
+class CatchupRepliesBuffer:
+    """
+    Transactions received in catchup replies which are not applied to the
+    ledger yet, ordered by sequence number. If several replies contain a
+    transaction, the first received one is kept. The replies themselves are
+    indexed by the range of sequence numbers they contain along with their
+    own transactions, so the reply to verify the transactions following the
+    ledger against can be found without merging or scanning all of them,
+    and each reply is verified with the transactions it contains.
+    """
+
+    def __init__(self):
+        self._txns = SortedDict()
+        # Entries are (first seq no, last seq no, sender, reply, txns)
+        self._replies = SortedList(key=lambda entry: entry[:2])
+
+    def add(self, frm: str, rep, txns: List[Tuple[int, dict]]):
+        """
+        Add a reply from `frm` with its transactions sorted by sequence
+        number, the transactions have to be contiguous
+        """
+        if not txns:
+            return
+        for seq_no, txn in txns:
+            self._txns.setdefault(seq_no, txn)
+        self._replies.add((txns[0][0], txns[-1][0], frm, rep, txns))
+
+    def reply_with(self, seq_no: int) -> Optional[Tuple]:
+        """
+        Returns an entry of a reply containing transaction `seq_no`
+        """
+        idx = self._replies.bisect_key_right((seq_no, float('inf')))
+        for entry in reversed(self._replies[:idx]):
+            if entry[1] >= seq_no:
+                return entry
+
+    @staticmethod
+    def reply_txns(entry: Tuple, start: int) -> List[Tuple[int, dict]]:
+        """
+        Returns transactions of the reply of `entry` from `start` to its end
+        """
+        first, _, _, _, txns = entry
+        return txns[max(start - first, 0):]
+
+    def txns(self, start: int, end: int) -> List[Tuple[int, dict]]:
+        return [(seq_no, self._txns[seq_no])
+                for seq_no in self._txns.irange(start, end)]
+
+    def remove_till(self, seq_no: int):
+        """
+        Remove transactions till `seq_no` and replies having no other ones
+        """
+        for key in list(self._txns.irange(maximum=seq_no)):
+            del self._txns[key]
+        for entry in [e for e in self._replies if e[1] <= seq_no]:
+            self._replies.remove(entry)
+
+    def remove_reply(self, entry: Tuple):
+        """
+        Remove a reply along with the transactions in its range, putting
+        back the ones other replies have for this range
+        """
+        start, end = entry[:2]
+        self._replies.remove(entry)
+        for key in list(self._txns.irange(start, end)):
+            del self._txns[key]
+        for other_start, other_end, _, _, txns in self._replies:
+            if other_start > end or other_end < start:
+                continue
+            for seq_no, txn in txns:
+                if start <= seq_no <= end:
+                    self._txns.setdefault(seq_no, txn)
+
+    def __iter__(self):
+        return iter(self._txns.items())
+
+    def __len__(self):
+        return len(self._txns)
 
 
 # TODO: Choose a better name, its not just information about a ledger, its more
@@ -13,7 +98,8 @@ class LedgerInfo:
                  preCatchupCompleteClbk,
                  postCatchupCompleteClbk,
                  postTxnAddedToLedgerClbk,
-                 verifier):
+                 verifier,
+                 postTxnsAddedToLedgerClbk=None):
 
         self.id = id
         self.ledger = ledger
@@ -23,6 +109,9 @@ class LedgerInfo:
         self.preCatchupCompleteClbk = preCatchupCompleteClbk
         self.postCatchupCompleteClbk = postCatchupCompleteClbk
         self.postTxnAddedToLedgerClbk = postTxnAddedToLedgerClbk
+        # Called instead of `postTxnAddedToLedgerClbk` with all transactions
+        # added to the ledger at once if given
+        self.postTxnsAddedToLedgerClbk = postTxnsAddedToLedgerClbk
         self.verifier = verifier
 
         self.set_defaults()
@@ -53,10 +142,7 @@ class LedgerInfo:
         self.catchUpTill = None
 
         # Catchup replies that need to be applied to the ledger
-        self.receivedCatchUpReplies = []
-
-        # Keep track of received replies from different senders
-        self.recvdCatchupRepliesFrm = {}
+        self.receivedCatchUpReplies = CatchupRepliesBuffer()
 
         # Tracks the beginning of consistency proof timer. Timer starts when the
         #  node gets f+1 consistency proofs. If the node is not able to begin
@@ -84,8 +170,7 @@ class LedgerInfo:
         self.ledgerStatusOk = set()
         self.last_txn_3PC_key = {}
         self.recvdConsistencyProofs = {}
-        self.receivedCatchUpReplies = []
-        self.recvdCatchupRepliesFrm = {}
+        self.receivedCatchUpReplies = CatchupRepliesBuffer()
         if self.postCatchupCompleteClbk:
             self.postCatchupCompleteClbk()
         self.catchupReplyTimer = None
@@ -1,19 +1,22 @@
-import heapq
 import math
 import operator
 import time
-from collections import Callable, Counter
+from collections import Callable, Counter, deque
 from functools import partial
 from random import shuffle
-from typing import Any, List, Dict, Tuple
+from typing import Any, List, Dict, Tuple, Deque, Generator
 from typing import Optional
 
+import msgpack
+
+from common.serializers.msgpack_serializer import MsgPackSerializer
 from ledger.merkle_verifier import MerkleVerifier
 from plenum.common.config_util import getConfig
 from plenum.common.constants import POOL_LEDGER_ID, LedgerState, DOMAIN_LEDGER_ID, \
-    CONSISTENCY_PROOF, CATCH_UP_PREFIX, TXN_TIME, CURRENT_PROTOCOL_VERSION
+    CONSISTENCY_PROOF, CATCH_UP_PREFIX, TXN_TIME, CURRENT_PROTOCOL_VERSION, \
+    CATCHUP_REP, OP_FIELD_NAME
 from plenum.common.ledger import Ledger
-from plenum.common.ledger_info import LedgerInfo
+from plenum.common.ledger_info import LedgerInfo, CatchupRepliesBuffer
 from plenum.common.messages.node_messages import LedgerStatus, CatchupRep, \
     ConsistencyProof, f, CatchupReq
 from plenum.common.util import compare_3PC_keys, SortedDict, min_3PC_key
@@ -59,18 +62,22 @@ class LedgerManager(HasActionQueue):
         # will be applied when they are received through the catchup process
         self.last_caught_up_3PC = (0, 0)
 
+        # Catchup requests being served, see `_serve_catchup_req`
+        self._catchups_to_serve = deque()  # type: Deque[Generator]
+
     def __repr__(self):
         return self.owner.name
 
     def service(self):
-        return self._serviceActions()
+        return self._serviceActions() + self._serve_catchups()
 
     def addLedger(self, iD: int, ledger: Ledger,
                   preCatchupStartClbk: Callable = None,
                   postCatchupStartClbk: Callable = None,
                   preCatchupCompleteClbk: Callable = None,
                   postCatchupCompleteClbk: Callable = None,
-                  postTxnAddedToLedgerClbk: Callable = None):
+                  postTxnAddedToLedgerClbk: Callable = None,
+                  postTxnsAddedToLedgerClbk: Callable = None):
 
         if iD in self.ledgerRegistry:
             logger.error("{} already present in ledgers "
@@ -85,7 +92,8 @@ class LedgerManager(HasActionQueue):
             preCatchupCompleteClbk=preCatchupCompleteClbk,
             postCatchupCompleteClbk=postCatchupCompleteClbk,
             postTxnAddedToLedgerClbk=postTxnAddedToLedgerClbk,
-            verifier=MerkleVerifier(ledger.hasher)
+            verifier=MerkleVerifier(ledger.hasher),
+            postTxnsAddedToLedgerClbk=postTxnsAddedToLedgerClbk
         )
 
     def _cancel_request_ledger_statuses_and_consistency_proofs(self, ledger_id):
@@ -144,7 +152,6 @@ class LedgerManager(HasActionQueue):
 
         ledgerInfo.recvdConsistencyProofs = {}
         ledgerInfo.consistencyProofsTimer = None
-        ledgerInfo.recvdCatchupRepliesFrm = {}
 
     @staticmethod
     def _missing_txns(ledger_info) -> Tuple[bool, int]:
@@ -454,6 +461,124 @@ class LedgerManager(HasActionQueue):
 
         logger.debug("node {} requested catchup for {} from {} to {}"
                      .format(frm, end - start + 1, start, end))
+        self._catchups_to_serve.append(self._serve_catchup_req(req, frm))
+
+    def _serve_catchups(self) -> int:
+        """
+        Send catchup replies to the requests being served in turns until
+        `CATCHUP_TXNS_SERVED_PER_PROD` transactions are sent, so serving
+        large catchups does not hold up the other work of the node
+
+        :return: the number of sent transactions
+        """
+        sent = 0
+        while self._catchups_to_serve and \
+                sent < self.config.CATCHUP_TXNS_SERVED_PER_PROD:
+            serving = self._catchups_to_serve.popleft()
+            try:
+                sent += next(serving)
+            except StopIteration:
+                continue
+            self._catchups_to_serve.append(serving)
+        return sent
+
+    def _serve_catchup_req(self, req: CatchupReq, frm: str):
+        """
+        Send the transactions requested in `req`. A reply is sent on each
+        iteration, the number of transactions in it is yielded.
+
+        Nodes accepting msgpack get replies packed right from the stored
+        transactions, see `_make_catchup_rep_frame`
+        """
+        ledger_id = getattr(req, f.LEDGER_ID.nm)
+        start = getattr(req, f.SEQ_NO_START.nm)
+        end = getattr(req, f.SEQ_NO_END.nm)
+        ledger = self.getLedgerForMsg(req)
+        if not self._can_send_stored_txns(ledger_id, ledger, frm):
+            self._send_catchup_rep(req, frm)
+            yield end - start + 1
+            return
+
+        while start <= end:
+            rid = self._connected_node_rid(frm)
+            if rid is None:
+                logger.info("{} stopped serving catchup request {} since "
+                            "{} is disconnected".format(self, req, frm))
+                return
+            frame, frame_end = self._make_catchup_rep_frame(
+                ledger_id, ledger, start, end, req.catchupTill)
+            if frame is None:
+                logger.warning("{} cannot send transaction {} of ledger {} "
+                               "to {} since it exceeds the message size "
+                               "limit".format(self, start, ledger_id, frm))
+                return
+            self.nodestack.send_serialized([frame], rid)
+            yield frame_end - start + 1
+            start = frame_end + 1
+
+    def _can_send_stored_txns(self, ledger_id, ledger: Ledger, frm) -> bool:
+        if self.owner.has_txns_with_extra_data(ledger_id) or \
+                not isinstance(ledger.txn_serializer, MsgPackSerializer):
+            return False
+        rid = self._connected_node_rid(frm)
+        return rid is not None and \
+            self.nodestack.accepts_msgpack(CATCHUP_REP, rid)
+
+    def _connected_node_rid(self, name) -> Optional[int]:
+        if not self.nodestack.isConnectedTo(name):
+            return None
+        return self.nodestack.getRemote(name).uid
+
+    def _make_catchup_rep_frame(self, ledger_id, ledger: Ledger,
+                                start: int, end: int, catchup_till: int):
+        """
+        Pack a CATCHUP_REP with msgpack for transactions from `start`,
+        putting the stored msgpack transactions in the message as they are.
+        Since the byte length of every transaction is known, the message
+        takes as many transactions till `end` as fit the message size limit
+        without serializing it again.
+
+        :return: the serialized message and the last transaction in it or
+            None and `start` if even a single transaction does not fit
+        """
+        packer = msgpack.Packer(use_bin_type=True)
+        head = b''.join((self.nodestack.msgpackPrefix,
+                         packer.pack_map_header(4),
+                         packer.pack(OP_FIELD_NAME), packer.pack(CATCHUP_REP),
+                         packer.pack(f.LEDGER_ID.nm), packer.pack(ledger_id),
+                         packer.pack(f.TXNS.nm)))
+        proof_key = packer.pack(f.CONS_PROOF.nm)
+        # The map header takes at most 5 bytes, a consistency proof has no
+        # more hashes than twice the height of the tree, each is a base58
+        # string of at most 44 characters taking 46 bytes with its header
+        reserved = len(head) + 5 + len(proof_key) + 5 + \
+            46 * 2 * catchup_till.bit_length()
+        limit = self.nodestack.msg_len_val.max_allowed - reserved
+
+        txns = []
+        size = 0
+        frame_end = start - 1
+        for seq_no, txn in ledger.get_serialized_txns(start, end):
+            entry = packer.pack(str(seq_no)) + bytes(txn)
+            if size + len(entry) > limit:
+                break
+            txns.append(entry)
+            size += len(entry)
+            frame_end = seq_no
+        if not txns:
+            return None, start
+
+        cons_proof = self._make_consistency_proof(ledger, frame_end,
+                                                  catchup_till)
+        frame = b''.join((head, packer.pack_map_header(len(txns)),
+                          *txns,
+                          proof_key, packer.pack(cons_proof)))
+        return frame, frame_end
+
+    def _send_catchup_rep(self, req: CatchupReq, frm: str):
+        start = getattr(req, f.SEQ_NO_START.nm)
+        end = getattr(req, f.SEQ_NO_END.nm)
+        ledger = self.getLedgerForMsg(req)
         logger.info("{} generating consistency proof: {} from {}".format(self, end, req.catchupTill))
         cons_proof = self._make_consistency_proof(ledger, end, req.catchupTill)
         txns = {}
@@ -489,30 +614,14 @@ class LedgerManager(HasActionQueue):
         ledger_info = self.getLedgerInfoByType(ledgerId)
         ledger = ledger_info.ledger
 
-        if txns:
-            if frm not in ledger_info.recvdCatchupRepliesFrm:
-                ledger_info.recvdCatchupRepliesFrm[frm] = []
-
-            ledger_info.recvdCatchupRepliesFrm[frm].append(rep)
-
-            txns_already_rcvd_in_catchup = ledger_info.receivedCatchUpReplies
-            # Creating a list of txns sorted on the basis of sequence
-            # numbers, but not keeping any duplicates
-            logger.info("{} merging all received catchups".format(self))
-            txns_already_rcvd_in_catchup = self._get_merged_catchup_txns(
-                txns_already_rcvd_in_catchup, txns)
-
-            logger.info("{} merged catchups, there are {} of them now, from {} to {}".
-                        format(self, len(txns_already_rcvd_in_catchup), txns_already_rcvd_in_catchup[0][0],
-                               txns_already_rcvd_in_catchup[-1][0]))
-
-            numProcessed = self._processCatchupReplies(
-                ledgerId, ledger, txns_already_rcvd_in_catchup)
-            logger.info("{} processed {} catchup replies with sequence numbers {}".
-                        format(self, numProcessed,
-                               [seqNo for seqNo, _ in txns_already_rcvd_in_catchup[:numProcessed]]))
-
-            ledger_info.receivedCatchUpReplies = txns_already_rcvd_in_catchup[numProcessed:]
+        catchup_replies = ledger_info.receivedCatchUpReplies
+        catchup_replies.add(frm, rep, [(s, t) for s, t in txns
+                                       if s > ledger.size])
+        numProcessed = self._processCatchupReplies(ledgerId, ledger,
+                                                   catchup_replies)
+        logger.info("{} processed {} catchup replies, {} transactions are "
+                    "left to process".format(self, numProcessed,
+                                             len(catchup_replies)))
 
         # This check needs to happen anyway since it might be the case that
         # just before sending requests for catchup, it might have processed
@@ -520,56 +629,58 @@ class LedgerManager(HasActionQueue):
         self.mark_catchup_completed_if_possible(ledger_info)
 
     def _processCatchupReplies(self, ledgerId, ledger: Ledger,
-                               catchUpReplies: List):
-        # Removing transactions for sequence numbers are already
-        # present in the ledger
-        # TODO: Inefficient, should check list in reverse and stop at first
-        # match since list is already sorted
-        numProcessed = sum(1 for s, _ in catchUpReplies if s <= ledger.size)
-        if numProcessed:
-            logger.info("{} found {} already processed transactions in the catchup replies".
-                        format(self, numProcessed))
-        # If `catchUpReplies` has any transaction that has not been applied
-        # to the ledger
-        catchUpReplies = catchUpReplies[numProcessed:]
-        if catchUpReplies:
-            seqNo = catchUpReplies[0][0]
-            if seqNo - ledger.seqNo == 1:
-                result, nodeName, toBeProcessed = self.hasValidCatchupReplies(
-                    ledgerId, ledger, seqNo, catchUpReplies)
-                if result:
-                    ledgerInfo = self.getLedgerInfoByType(ledgerId)
-                    for _, txn in catchUpReplies[:toBeProcessed]:
-                        self._add_txn(ledgerId, ledger,
-                                      ledgerInfo, txn)
-                    self._removePrcdCatchupReply(ledgerId, nodeName, seqNo)
-                    return numProcessed + toBeProcessed + \
-                        self._processCatchupReplies(ledgerId, ledger,
-                                                    catchUpReplies[toBeProcessed:])
-                else:
-                    if self.ownedByNode:
-                        self.owner.blacklistNode(nodeName,
-                                                 reason="Sent transactions "
-                                                        "that could not be "
-                                                        "verified")
-                        self._removePrcdCatchupReply(ledgerId, nodeName,
-                                                     seqNo)
-                        # Invalid transactions have to be discarded so letting
-                        # the caller know how many txns have to removed from
-                        # `self.receivedCatchUpReplies`
-                        return numProcessed + toBeProcessed
-        return numProcessed
+                               catchUpReplies: CatchupRepliesBuffer) -> int:
+        """
+        Apply the transactions following the last one of the ledger, a reply
+        at a time. The transactions of the reply from the ledger end to the
+        end of the reply are verified against the consistency proof of the
+        reply and added to the ledger at once. A reply failing verification
+        is discarded and only its sender is blacklisted.
+
+        :return: the number of applied transactions
+        """
+        # Transactions might have been added to the ledger meanwhile
+        catchUpReplies.remove_till(ledger.seqNo)
+        numProcessed = 0
+        while True:
+            seqNo = ledger.seqNo + 1
+            reply = catchUpReplies.reply_with(seqNo)
+            if reply is None:
+                return numProcessed
+            _, end, nodeName, catchupReply, _ = reply
+            txns = catchUpReplies.reply_txns(reply, seqNo)
+            if self.hasValidCatchupReplies(ledgerId, ledger, catchupReply,
+                                           txns):
+                ledgerInfo = self.getLedgerInfoByType(ledgerId)
+                self._add_txns(ledgerId, ledger, ledgerInfo,
+                               [txn for _, txn in txns])
+                catchUpReplies.remove_till(end)
+                numProcessed += len(txns)
+            else:
+                if self.ownedByNode:
+                    self.owner.blacklistNode(nodeName,
+                                             reason="Sent transactions "
+                                                    "that could not be "
+                                                    "verified")
+                # Invalid transactions have to be discarded, other replies
+                # for the same range might still be valid
+                catchUpReplies.remove_reply(reply)
 
     def _add_txn(self, ledgerId, ledger: Ledger, ledgerInfo, txn):
         ledger.add(self._transform(txn))
         ledgerInfo.postTxnAddedToLedgerClbk(ledgerId, txn)
 
-    def _removePrcdCatchupReply(self, ledgerId, node, seqNo):
-        ledgerInfo = self.getLedgerInfoByType(ledgerId)
-        for i, rep in enumerate(ledgerInfo.recvdCatchupRepliesFrm[node]):
-            if str(seqNo) in getattr(rep, f.TXNS.nm):
-                break
-        ledgerInfo.recvdCatchupRepliesFrm[node].pop(i)
+    def _add_txns(self, ledgerId, ledger: Ledger, ledgerInfo, txns: List):
+        """
+        Add transactions to the ledger with one write to its storages and
+        make post-add callbacks for all of them at once if possible
+        """
+        ledger.add_txns([self._transform(txn) for txn in txns])
+        if ledgerInfo.postTxnsAddedToLedgerClbk:
+            ledgerInfo.postTxnsAddedToLedgerClbk(ledgerId, txns)
+        else:
+            for txn in txns:
+                ledgerInfo.postTxnAddedToLedgerClbk(ledgerId, txn)
 
     def _transform(self, txn):
         # Certain transactions might need to be
@@ -578,27 +689,17 @@ class LedgerManager(HasActionQueue):
             self.owner.transform_txn_for_ledger(txn)
         return z
 
-    def hasValidCatchupReplies(self, ledgerId, ledger, seqNo, catchUpReplies):
-        # Here seqNo has to be the seqNo of first transaction of
-        # `catchupReplies`
-
-        # Get the transactions in the catchup reply which has sequence
-        # number `seqNo`
-        nodeName, catchupReply = self._getCatchupReplyForSeqNo(ledgerId,
-                                                               seqNo)
-        txns = getattr(catchupReply, f.TXNS.nm)
-
-        # Add only those transaction in the temporary tree from the above
-        # batch which are not present in the ledger
-        # Integer keys being converted to strings when marshaled to JSON
-        txns = [self._transform(txn)
-                for s, txn in catchUpReplies[:len(txns)]
-                if str(s) in txns]
-
+    def hasValidCatchupReplies(self, ledgerId, ledger, catchupReply, txns):
+        """
+        Verify the consistency proof of `catchupReply` with `txns` added to
+        the ledger, `txns` have to follow the last transaction of the ledger
+        and end with the last transaction of the reply
+        """
         # Creating a temporary tree which will be used to verify consistency
         # proof, by inserting transactions. Duplicating a merkle tree is not
         # expensive since we are using a compact merkle tree.
-        tempTree = ledger.treeWithAppliedTxns(txns)
+        tempTree = ledger.treeWithAppliedTxns(
+            [self._transform(txn) for _, txn in txns])
 
         proof = getattr(catchupReply, f.CONS_PROOF.nm)
         ledgerInfo = self.getLedgerInfoByType(ledgerId)
@@ -622,19 +723,7 @@ class LedgerManager(HasActionQueue):
         except Exception as ex:
             logger.info("{} could not verify catchup reply {} since {}".format(self, catchupReply, ex))
             verified = False
-        return bool(verified), nodeName, len(txns)
-
-    def _getCatchupReplyForSeqNo(self, ledgerId, seqNo):
-        # This is inefficient if we have large number of nodes but since
-        # number of node are always between 60-120, this is ok.
-
-        ledgerInfo = self.getLedgerInfoByType(ledgerId)
-        for k, catchupReps in ledgerInfo.recvdCatchupRepliesFrm.items():
-            for rep in catchupReps:
-                txns = getattr(rep, f.TXNS.nm)
-
-                if str(seqNo) in txns:
-                    return k, rep
+        return bool(verified)
 
     def mark_catchup_completed_if_possible(self, ledger_info: LedgerInfo):
         """
@@ -953,27 +1042,6 @@ class LedgerManager(HasActionQueue):
                 break
         return reqs
 
-    @staticmethod
-    def _get_merged_catchup_txns(existing_txns, new_txns):
-        """
-        Merge any newly received txns during catchup with already received txns
-        :param existing_txns:
-        :param new_txns:
-        :return:
-        """
-        idx_to_remove = []
-        for i, (seq_no, _) in enumerate(existing_txns):
-            if seq_no < new_txns[0][0]:
-                continue
-            if seq_no > new_txns[-1][0]:
-                break
-            idx_to_remove.append(seq_no - new_txns[0][0])
-        for idx in reversed(idx_to_remove):
-            new_txns.pop(idx)
-
-        return list(heapq.merge(existing_txns, new_txns,
-                                key=operator.itemgetter(0)))
-
     def getConsistencyProof(self, status: LedgerStatus):
         ledger = self.getLedgerForMsg(status)  # type: Ledger
         ledgerId = getattr(status, f.LEDGER_ID.nm)
@@ -2,7 +2,7 @@ import ipaddress
 import json
 import re
 from abc import ABCMeta, abstractmethod
-from typing import Iterable
+from typing import Iterable, Callable
 
 import base58
 import dateutil
@@ -32,6 +32,14 @@ class FieldValidator(metaclass=ABCMeta):
         :return: error message or None
         """
 
+    def compiled_validator(self) -> Callable:
+        """
+        Returns a callable validating field values the same way as
+        `validate`, used by message validators which prepare their
+        schemas once
+        """
+        return self.validate
+
 
 class FieldBase(FieldValidator, metaclass=ABCMeta):
     """
@@ -64,6 +72,26 @@ class FieldBase(FieldValidator, metaclass=ABCMeta):
         if spec_err:
             return spec_err
 
+    def compiled_validator(self) -> Callable:
+        # Subclasses overriding `validate` are used as they are
+        if type(self).validate is not FieldBase.validate:
+            return self.validate
+        nullable = self.nullable
+        base_types = self._base_types
+        wrong_type_msg = self._wrong_type_msg
+        specific_validation = self._specific_validation
+
+        def validate(val):
+            if nullable and val is None:
+                return
+            if base_types is not None and not isinstance(val, base_types):
+                return wrong_type_msg(val)
+            spec_err = specific_validation(val)
+            if spec_err:
+                return spec_err
+
+        return validate
+
     @abstractmethod
     def _specific_validation(self, val):
         """
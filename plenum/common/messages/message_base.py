@@ -1,5 +1,5 @@
 from collections import OrderedDict
-from operator import itemgetter
+from functools import partial
 from typing import Mapping
 
 from plenum.common.types import f
@@ -9,6 +9,24 @@ from plenum.common.exceptions import MissingProtocolVersionError
 from plenum.common.messages.fields import FieldValidator
 
 
+class CompiledSchema:
+    """
+    Schema of a message validator with everything needed to validate
+    messages against it prepared once: field names in order, required
+    field names and a validator callable for each field
+    """
+
+    __slots__ = ('schema', 'names', 'required', 'validators')
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.names = tuple(name for name, _ in schema)
+        self.required = frozenset(name for name, field in schema
+                                  if not field.optional)
+        self.validators = {name: field.compiled_validator()
+                           for name, field in schema}
+
+
 class MessageValidator(FieldValidator):
     # the schema has to be an ordered iterable because the message class
     # can be create with positional arguments __init__(*args)
@@ -16,6 +34,11 @@ class MessageValidator(FieldValidator):
     schema = ()
     optional = False
     schema_is_strict = SCHEMA_IS_STRICT
+    _compiled_schema = CompiledSchema(schema)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._compiled_schema = CompiledSchema(cls.schema)
 
     def __init__(self, schema_is_strict=SCHEMA_IS_STRICT):
         self.schema_is_strict = schema_is_strict
@@ -24,21 +47,35 @@ class MessageValidator(FieldValidator):
         self._validate_fields_with_schema(dct, self.schema)
         self._validate_message(dct)
 
+    def _compiled(self, schema) -> CompiledSchema:
+        """
+        Returns the compiled schema, compiling it again if the schema was
+        replaced after the class was defined, e.g. extended by plugins
+        """
+        compiled = self._compiled_schema
+        if compiled.schema is not schema:
+            compiled = CompiledSchema(schema)
+            if schema is type(self).schema:
+                type(self)._compiled_schema = compiled
+            else:
+                self._compiled_schema = compiled
+        return compiled
+
     def _validate_fields_with_schema(self, dct, schema):
         if not isinstance(dct, dict):
             self._raise_invalid_type(dct)
-        schema_dct = dict(schema)
-        required_fields = filter(lambda x: not x[1].optional, schema)
-        required_field_names = map(lambda x: x[0], required_fields)
-        missed_required_fields = set(required_field_names) - set(dct)
+        compiled = self._compiled(schema)
+        missed_required_fields = compiled.required - set(dct)
         if missed_required_fields:
             self._raise_missed_fields(*missed_required_fields)
+        validators = compiled.validators
         for k, v in dct.items():
-            if k not in schema_dct:
+            validate = validators.get(k)
+            if validate is None:
                 if self.schema_is_strict:
                     self._raise_unknown_fields(k, v)
             else:
-                validation_error = schema_dct[k].validate(v)
+                validation_error = validate(v)
                 if validation_error:
                     self._raise_invalid_fields(k, v, validation_error)
 
@@ -87,26 +124,27 @@ class MessageBase(Mapping, MessageValidator):
             # op field is not required since there is self.typename
             kwargs.pop(OP_FIELD_NAME, None)
 
+        names = self._compiled(self.schema).names
         argsLen = len(args or kwargs)
-        if self.schema_is_strict and argsLen > len(self.schema):
+        if self.schema_is_strict and argsLen > len(names):
             raise ValueError(
                 "number of parameters {} should be less than or equal to "
                 "the number of fields in schema {}"
-                .format(argsLen, len(self.schema))
+                .format(argsLen, len(names))
             )
 
         super().__init__()
-        input_as_dict = kwargs if kwargs else self._join_with_schema(args)
+        input_as_dict = kwargs if kwargs else dict(zip(names, args))
 
         self.validate(input_as_dict)
 
-        self._fields = OrderedDict(
+        self._fields = OrderedDict([
             (name, input_as_dict[name])
-            for name, _ in self.schema
-            if name in input_as_dict)
+            for name in names
+            if name in input_as_dict])
 
     def _join_with_schema(self, args):
-        return dict(zip(map(itemgetter(0), self.schema), args))
+        return dict(zip(self._compiled(self.schema).names, args))
 
     def __getattr__(self, item):
         return self._fields[item]
@@ -173,3 +211,8 @@ class MessageBase(Mapping, MessageValidator):
 
     def __contains__(self, key):
         return key in self._fields
+
+    def __reduce__(self):
+        # Messages are pickled by their fields, e.g. to be passed to
+        # replicas running in other processes
+        return partial(self.__class__, **self._fields), ()
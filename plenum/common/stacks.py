@@ -2,7 +2,7 @@ import time
 import zmq
 
 from random import randint
-from typing import Callable, Any, List, Dict
+from typing import Callable, Any, List, Dict, Set
 
 from plenum.common.batched import Batched, logger
 from plenum.common.config_util import getConfig, \
@@ -167,6 +167,16 @@ class NodeZStack(Batched, KITZStack):
                            seed=seed, sighex=sighex, config=config)
         MessageProcessor.__init__(self, allowDictOnly=False)
 
+    def _connsChanged(self, ins: Set[str], outs: Set[str]) -> None:
+        super()._connsChanged(ins, outs)
+        self.framingRemotes.difference_update(outs)
+        self.msgpackRemotes.difference_update(outs)
+        for name in ins:
+            self.advertiseFraming(name)
+        if self.config.NODE_STACK_SERIALIZATION == 'msgpack':
+            for name in ins:
+                self.advertiseMsgpack(name)
+
     # TODO: Reconsider defaulting `reSetupAuth` to True.
     def start(self, restricted=None, reSetupAuth=True):
         KITZStack.start(self, restricted=restricted, reSetupAuth=reSetupAuth)
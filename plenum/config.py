@@ -39,6 +39,8 @@ stateTsDbName = "state_ts_db"
 
 stateSignatureDbName = 'state_signature'
 
+roleIndexDbName = 'role_index'
+
 # There is only one seqNoDB as it maintain the mapping of
 # request id to sequence numbers
 seqNoDbName = 'seq_no_db'
@@ -49,6 +51,10 @@ hashStore = {
     "type": HS_ROCKSDB
 }
 
+# Number of leaf hashes and of node hashes of each ledger kept in memory for
+# building merkle proofs, used for LevelDB and RocksDB hash stores, 0 disables
+HASH_STORE_CACHE_SIZE = 10000
+
 primaryStorage = None
 
 domainStateStorage = KeyValueStorageType.Rocksdb
@@ -58,8 +64,19 @@ reqIdToTxnStorage = KeyValueStorageType.Rocksdb
 
 stateSignatureStorage = KeyValueStorageType.Rocksdb
 
+roleIndexStorage = KeyValueStorageType.Rocksdb
+
 transactionLogDefaultStorage = KeyValueStorageType.Rocksdb
 
+# Number of decoded trie nodes kept in memory by each state, 0 disables
+# the cache
+stateNodeCacheSize = 4096
+
+# Number of signature verifiers and of verkeys read from the state kept by
+# client authenticators of the node
+CLIENT_VERIFIER_CACHE_SIZE = 10000
+CLIENT_VERKEY_CACHE_SIZE = 10000
+
 rocksdb_default_config = {
     'max_open_files': None,
     'max_log_file_size': None,
@@ -97,6 +114,9 @@ rocksdb_state_signature_config = rocksdb_default_config.copy()
 rocksdb_state_ts_db_config = rocksdb_default_config.copy()
 # Change state_ts_db config here if you fully understand what's going on
 
+rocksdb_role_index_config = rocksdb_default_config.copy()
+# Change role_index config here if you fully understand what's going on
+
 # FIXME: much more clear solution is to check which key-value storage type is
 # used for each storage and set corresponding config, but for now only RocksDB
 # tuning is supported (now other storage implementations ignore this parameter)
@@ -108,6 +128,7 @@ db_transactions_config = rocksdb_transactions_config
 db_seq_no_db_config = rocksdb_seq_no_db_config
 db_state_signature_config = rocksdb_state_signature_config
 db_state_ts_db_config = rocksdb_state_ts_db_config
+db_role_index_config = rocksdb_role_index_config
 
 
 DefaultPluginPath = {
@@ -147,6 +168,24 @@ MIN_LATENCY_COUNT = 10
 ThroughputInnerWindowSize = 15
 ThroughputMinActivityThreshold = 16
 
+# Period in seconds node metrics like latency histograms and counters are
+# reported for, number of clients latency histograms are kept for and
+# period of sampling queue depths of the node
+METRICS_WINDOW_SIZE = 60
+METRICS_MAX_CLIENTS = 1000
+METRICS_SAMPLING_FREQ = 5
+
+# Counters, gauges and timers of the hot paths of the node: steps of the
+# node's prod, 3 phase commit message processing, ledger commits, state
+# trie updates and bytes sent and received by stacks. They are served in
+# Prometheus text format over HTTP on `INSTRUMENTATION_HOST` and
+# `INSTRUMENTATION_PORT`, or to clients of the Unix socket at
+# `INSTRUMENTATION_UNIX_SOCKET` if it is set; port 0 disables the endpoint
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_HOST = '127.0.0.1'
+INSTRUMENTATION_PORT = 0
+INSTRUMENTATION_UNIX_SOCKET = None
+
 notifierEventTriggeringConfig = {
     'clusterThroughputSpike': {
         'bounds_coeff': 10,
@@ -202,6 +241,15 @@ LedgerStatusTimeout = 5
 # Timeout for pool catchuping would be nodeCount * CatchupTransactionsTimeout
 CatchupTransactionsTimeout = 6
 
+# Max number of transactions a node sends in catchup replies each time it
+# is prodded, replies to several catchup requests are sent in turns
+CATCHUP_TXNS_SERVED_PER_PROD = 1000
+
+# Number of ledger txns applied to the state being recreated from the ledger
+# before the state is written to its db along with a checkpoint to continue
+# from if the node stops
+STATE_REBUILD_CHUNK_SIZE = 10000
+
 # Log configuration
 logRotationBackupCount = 150
 logRotationMaxBytes = 100 * 1024 * 1024
@@ -231,6 +279,25 @@ log_override_tags = dict(cli={}, demo={})
 LISTENER_MESSAGE_QUOTA = 100
 REMOTES_MESSAGE_QUOTA = 100
 
+# Number of threads verifying signatures of client requests received in one
+# pass over the client stack; 0 disables batched verification, so each
+# request is verified on receipt
+CLIENT_SIG_VERIFICATION_WORKERS = 4
+# Size of a process pool used instead of the threads above when not 0;
+# processes also serialize signed messages and compute request digests
+CLIENT_SIG_VERIFICATION_PROCESSES = 0
+
+# Limits of write requests from clients being processed by the node, new
+# requests are rejected with REQNACK while they are reached; 0 disables
+# a limit. Each client can have `ADMISSION_MIN_CLIENT_QUOTA` or its fair
+# share of `ADMISSION_MAX_REQUESTS` requests, whichever is more. The limit
+# of requests is disabled by default; when set it should be well above
+# `Max3PCBatchSize` times the number of batches in flight, otherwise the
+# node rejects requests it could order
+ADMISSION_MAX_REQUESTS = 0
+ADMISSION_MAX_REQUESTS_BYTES = 100 * 1024 * 1024
+ADMISSION_MIN_CLIENT_QUOTA = 100
+
 # After `Max3PCBatchSize` requests or `Max3PCBatchWait`, whichever is earlier,
 # a 3 phase batch is sent
 # Max batch size for 3 phase commit
@@ -238,6 +305,26 @@ Max3PCBatchSize = 10000
 # Max time to wait before creating a batch for 3 phase commit
 Max3PCBatchWait = 1
 
+# Run replicas of backup protocol instances in separate processes, so they
+# do not take time of the master replica in the node process
+BACKUP_REPLICAS_IN_PROCESSES = False
+# Time a replica process waits for messages from its node before servicing
+# its queues again
+REPLICA_PROCESS_POLL_TIMEOUT = 0.01
+# How replica processes are started, 'spawn' or 'forkserver'. They are not
+# forked since the node process has threads
+REPLICA_PROCESS_START_METHOD = 'spawn'
+# Time the node waits for a replica process to start, and to handle the
+# messages and calls passed to it, before starting the process again
+REPLICA_PROCESS_START_TIMEOUT = 60
+REPLICA_PROCESS_REPLY_TIMEOUT = 30
+# Time a stopped replica process has to exit before it is killed
+REPLICA_PROCESS_STOP_TIMEOUT = 1
+# Size of the items written to a replica process and not handled by it yet
+# over which the node keeps further items queued, so writing to the pipe
+# does not wait for a process which is behind
+REPLICA_PROCESS_MAX_PENDING_BYTES = 64 * 1024
+
 # Each node keeps a map of PrePrepare sequence numbers and the corresponding
 # txn seqnos that came out of it. Helps in servicing Consistency Proof Requests
 ProcessedBatchMapsToKeep = 1000
@@ -260,6 +347,23 @@ CLIENT_REPLY_TIMEOUT = 15
 CLIENT_MAX_RETRY_ACK = 5
 CLIENT_MAX_RETRY_REPLY = 5
 
+# Number of requests the client keeps the confirmed reply of once it has a
+# quorum of replies or a reply with a state proof
+CLIENT_CONFIRMED_REPLIES_CACHE_SIZE = 100000
+
+# Number of requests the client keeps the replies, acks, nacks and rejects
+# of before they have a confirmed reply or a quorum of nacks or rejects
+CLIENT_PENDING_REQUESTS_CACHE_SIZE = 100000
+
+# Number of most recent messages from nodes the client keeps in its inBox,
+# replies, acks and nacks for requests are looked up in its reply index
+CLIENT_INBOX_SIZE = 10000
+
+# Number of results of BLS multi-signature verification and of deserialized
+# BLS public keys kept by verifiers of nodes and clients
+BLS_MULTI_SIG_CACHE_SIZE = 10000
+BLS_VER_KEY_CACHE_SIZE = 1000
+
 # Connections tracking and stack restart parameters.
 # NOTE: TRACK_CONNECTED_CLIENTS_NUM_ENABLED must be set to True
 # if CLIENT_STACK_RESTART_ENABLED is set to True as stack restart
@@ -315,4 +419,13 @@ ENABLED_PLUGINS = []
 # 2 during replay
 STACK_COMPANION = 0
 
+# Storage of recorded messages, 'rocksdb' or 'segments' for buffered
+# append-only segment files
+RECORDER_STORAGE = 'rocksdb'
+# Buffered records are written after reaching the size (bytes) or interval
+# (seconds) since the last write, whichever is earlier
+RECORDER_FLUSH_SIZE = 1024 * 1024
+RECORDER_FLUSH_INTERVAL = 1
+RECORDER_SEGMENT_SIZE = 64 * 1024 * 1024
+
 ENABLE_INCONSISTENCY_WATCHER_NETWORK = False
@@ -35,6 +35,12 @@ class ClientTxnLog(HasFileStorage):
             key=key, value=self.serializer.serialize(
                 txn, fields=self.txnFieldOrdering, toBytes=False))
 
+    def getTxn(self, identifier, reqId):
+        key = '{}{}'.format(identifier, reqId)
+        if key not in self.transactionLog:
+            return None
+        return self.serializer.deserialize(self.transactionLog.get(key))
+
     def hasTxn(self, identifier, reqId) -> bool:
         key = '{}{}'.format(identifier, reqId)
         return key in self.transactionLog
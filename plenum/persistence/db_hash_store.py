@@ -44,6 +44,17 @@ class DbHashStore(HashStore):
         seqNo = self.getNodePosition(start, height)
         self.nodesDb.put(str(seqNo), nodeHash)
 
+    def writeLeaves(self, leafHashes):
+        start = self.leafCount + 1
+        self.leavesDb.setBatch([(str(start + i), leafHash)
+                                for i, leafHash in enumerate(leafHashes)])
+        self.leafCount += len(leafHashes)
+
+    def writeNodes(self, nodes):
+        self.nodesDb.setBatch([(str(self.getNodePosition(start, height)),
+                                nodeHash)
+                               for start, height, nodeHash in nodes])
+
     def readLeaf(self, seqNo):
         return self._readOne(seqNo, self.leavesDb)
 
@@ -64,14 +75,30 @@ class DbHashStore(HashStore):
     def readNodes(self, start, end):
         return self._readMultiple(start, end, self.nodesDb)
 
+    def readLeafsByPos(self, positions):
+        return self._readMany(positions, self.leavesDb)
+
+    def readNodesByPos(self, positions):
+        return self._readMany(positions, self.nodesDb)
+
     def _readMultiple(self, start, end, db):
         """
         Returns a list of hashes with serial numbers between start
          and end, both inclusive.
          """
         self._validatePos(start, end)
+        return self._readMany(range(start, end + 1), db)
+
+    def _readMany(self, positions, db):
+        """
+        Returns a list of hashes at the positions read from the db at once
+        """
+        positions = list(positions)
+        for pos in positions:
+            self._validatePos(pos)
         # Converting any bytearray to bytes
-        return [bytes(db.get(str(pos))) for pos in range(start, end + 1)]
+        return [bytes(h) for h in
+                db.get_multiple([str(pos) for pos in positions])]
 
     @property
     def leafCount(self) -> int:
@@ -0,0 +1,60 @@
+from storage.kv_store import KeyValueStorage
+from storage.optimistic_kv_store import OptimisticKVStore
+
+
+class RoleIndex:
+    """
+    Keeps the number of NYM transactions which assigned each role. Counters
+    changed by applied but not yet committed batches are kept in memory and
+    persisted when the batch is committed, following the same flow as the
+    state: `on_batch_created`, `on_batch_rejected` and `on_batch_committed`,
+    or `on_batch_discarded` if the batch is reverted before being created.
+    Sequence number of the last indexed transaction is stored too, so
+    transactions replayed from the ledger are not counted twice.
+    """
+    lastSeqNoKey = b'last_seq_no'
+
+    def __init__(self, keyValueStorage: KeyValueStorage):
+        self._kv = keyValueStorage
+        self._store = OptimisticKVStore(keyValueStorage)
+
+    @staticmethod
+    def _role_key(role) -> bytes:
+        return 'role:{}'.format(role).encode()
+
+    def _get_int(self, key, is_committed):
+        try:
+            return int(self._store.get(key, is_committed=is_committed))
+        except KeyError:
+            return 0
+
+    def count(self, role, is_committed=False) -> int:
+        return self._get_int(self._role_key(role), is_committed)
+
+    def add(self, role, is_committed=False):
+        self._store.set(self._role_key(role),
+                        str(self.count(role, is_committed) + 1),
+                        is_committed=is_committed)
+
+    def last_seq_no(self, is_committed=False) -> int:
+        return self._get_int(self.lastSeqNoKey, is_committed)
+
+    def set_last_seq_no(self, seq_no, is_committed=False):
+        self._store.set(self.lastSeqNoKey, str(seq_no),
+                        is_committed=is_committed)
+
+    def on_batch_created(self, state_root):
+        self._store.create_batch_from_current(state_root)
+
+    def on_batch_rejected(self):
+        self._store.reject_batch()
+
+    def on_batch_discarded(self):
+        self._store.discard_current_batch()
+
+    def on_batch_committed(self):
+        if self._store.un_committed:
+            self._store.commit_batch()
+
+    def close(self):
+        self._kv.close()
@@ -31,11 +31,12 @@ class CombinedRecorder(Recorder):
 
             self.store.put(k, existing + self.c_prefix + v)
 
-    def start_playing(self):
+    def start_playing(self, start=None):
         assert not self.is_playing
         self.is_playing = True
         self.play_started_at = time.perf_counter()
-        self.store_iterator = self.store.iterator(include_value=True)
+        self.store_iterator = self.store.iterator(start=start,
+                                                  include_value=True)
 
     @staticmethod
     def get_parsed(msg, only_incoming=None, only_outgoing=None):
@@ -2,6 +2,7 @@ import os
 import time
 from typing import Callable
 
+from plenum.recorder.segment_store import RecorderSegmentStore
 from storage.kv_store_rocksdb_int_keys import KeyValueStorageRocksdbIntKeys
 
 try:
@@ -52,6 +53,13 @@ class Recorder:
             existing = []
         self.store.put(key, json.dumps([*existing, val]))
 
+    def service(self):
+        """
+        Called periodically while recording, records are written to the
+        store as they are added
+        """
+        pass
+
     def register_replay_target(self, id, target: Callable):
         assert id not in self.replay_targets
         self.replay_targets[id] = target
@@ -68,11 +76,16 @@ class Recorder:
     def create_db_val_for_disconnecteds(*nodes):
         return [Recorder.DISCONN_FLAG, *nodes]
 
-    def start_playing(self):
+    def start_playing(self, start=None):
+        """
+        :param start: key (time) of the first record to be played, all
+            records are played if None
+        """
         assert not self.is_playing
         self.is_playing = True
         self.play_started_at = time.perf_counter()
-        self.store_iterator = self.store.iterator(include_value=True)
+        self.store_iterator = self.store.iterator(start=start,
+                                                  include_value=True)
 
     def get_next(self):
         if self.item_for_next_get is None:
@@ -142,6 +155,24 @@ class Recorder:
         return msg[0] == Recorder.DISCONN_FLAG
 
 
+class BufferedRecorder(Recorder):
+    """
+    Recorder backed by `RecorderSegmentStore`, records are appended to the
+    store's buffer instead of reading and rewriting the value stored for the
+    key. Records having the same key are grouped when read.
+    """
+
+    def __init__(self, store: RecorderSegmentStore,
+                 skip_metadata_write=False):
+        Recorder.__init__(self, store, skip_metadata_write=skip_metadata_write)
+
+    def add_to_store(self, key, val):
+        self.store.append(int(key), val)
+
+    def service(self):
+        self.store.flush_if_due()
+
+
 def add_start_time(data_directory, tm):
     if not os.path.isdir(data_directory):
         os.makedirs(data_directory)
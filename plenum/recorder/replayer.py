@@ -11,7 +11,8 @@ from plenum.common.constants import OP_FIELD_NAME, PREPREPARE, BATCH, \
 from plenum.common.types import f
 from plenum.common.util import get_utc_epoch
 from plenum.recorder.combined_recorder import CombinedRecorder
-from plenum.recorder.recorder import Recorder
+from plenum.recorder.recorder import Recorder, BufferedRecorder
+from plenum.recorder.segment_store import RecorderSegmentStore
 from storage.helper import initKeyValueStorageIntKeys
 
 
@@ -23,6 +24,11 @@ def to_bytes(v):
 def get_recorders_from_node_data_dir(node_data_dir, node_name) -> Tuple[Recorder, Recorder]:
     rec_path = os.path.join(node_data_dir, node_name, 'recorder')
     client_stack_name = node_name + CLIENT_STACK_SUFFIX
+    if RecorderSegmentStore.exists(rec_path, node_name):
+        return BufferedRecorder(RecorderSegmentStore(rec_path, node_name),
+                                skip_metadata_write=True), \
+            BufferedRecorder(RecorderSegmentStore(rec_path, client_stack_name),
+                             skip_metadata_write=True)
     client_rec_kv_store = initKeyValueStorageIntKeys(KeyValueStorageType.Rocksdb,
                                                      rec_path, client_stack_name)
     node_rec_kv_store = initKeyValueStorageIntKeys(
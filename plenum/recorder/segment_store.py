@@ -0,0 +1,191 @@
+import glob
+import os
+import struct
+import time
+from bisect import bisect_right
+
+import msgpack
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+class RecorderSegmentStore:
+    """
+    Append-only storage for recorded messages. Each record is a (key, value)
+    pair, where key is the time the message was recorded at, packed with
+    msgpack and prefixed with its length. Records are buffered in memory and
+    written to the current segment file once the buffer reaches
+    `flush_size` bytes or `flush_interval` seconds have passed since the last
+    write, the interval is checked on `append` and `flush_if_due`. Segment
+    files are rolled over after `segment_size` bytes.
+
+    Each write adds an entry to a sparse index of (key, segment, offset) so
+    iteration can start at any key without reading preceding segments.
+
+    `iterator` yields records grouped by key with values encoded the same way
+    as the key-value storage used by `Recorder` does, so recordings can be
+    read in the same way regardless of the storage.
+    """
+    SEGMENT_EXT = '.seg'
+    INDEX_EXT = '.idx'
+    _length = struct.Struct('>I')
+    _index_entry = struct.Struct('>QII')
+
+    def __init__(self, db_dir, db_name, flush_size=1024 * 1024,
+                 flush_interval=1, segment_size=64 * 1024 * 1024):
+        self._db_dir = db_dir
+        self._db_name = db_name
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._segment_size = segment_size
+
+        self._buffer = bytearray()
+        self._buffer_start_key = None
+        self._last_flush_at = time.perf_counter()
+
+        os.makedirs(db_dir, exist_ok=True)
+        self._index = self._read_index()
+        segments = self._segment_numbers()
+        self._segment_no = segments[-1] if segments else 0
+        self._segment_file = None
+        self._index_file = open(self._index_path, 'ab')
+        self._open_segment()
+
+    @classmethod
+    def exists(cls, db_dir, db_name) -> bool:
+        return os.path.isfile(os.path.join(db_dir, db_name + cls.INDEX_EXT))
+
+    @property
+    def _index_path(self):
+        return os.path.join(self._db_dir, self._db_name + self.INDEX_EXT)
+
+    def _segment_path(self, segment_no):
+        return os.path.join(self._db_dir, '{}.{:06d}{}'.format(
+            self._db_name, segment_no, self.SEGMENT_EXT))
+
+    def _segment_numbers(self):
+        pattern = os.path.join(self._db_dir,
+                               self._db_name + '.*' + self.SEGMENT_EXT)
+        prefix_len = len(self._db_name) + 1
+        suffix_len = len(self.SEGMENT_EXT)
+        return sorted(int(os.path.basename(path)[prefix_len:-suffix_len])
+                      for path in glob.glob(pattern))
+
+    def _read_index(self):
+        if not os.path.isfile(self._index_path):
+            return []
+        with open(self._index_path, 'rb') as f:
+            data = f.read()
+        size = self._index_entry.size
+        # A partially written last entry is ignored
+        return [self._index_entry.unpack_from(data, offset)
+                for offset in range(0, len(data) - size + 1, size)]
+
+    def _open_segment(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_file = open(self._segment_path(self._segment_no), 'ab')
+
+    @property
+    def closed(self):
+        return self._segment_file is None
+
+    def append(self, key: int, val):
+        """
+        Adds a record, writing buffered records if thresholds are reached
+        """
+        if self._buffer_start_key is None:
+            self._buffer_start_key = key
+        data = msgpack.packb([key, val], use_bin_type=True)
+        self._buffer += self._length.pack(len(data))
+        self._buffer += data
+        if len(self._buffer) >= self._flush_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        """
+        Writes buffered records if `flush_interval` seconds have passed since
+        the last write. Has to be called periodically, so records do not stay
+        in the buffer while nothing is appended.
+        """
+        if time.perf_counter() - self._last_flush_at >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush_at = time.perf_counter()
+        if not self._buffer:
+            return
+        offset = self._segment_file.tell()
+        if offset >= self._segment_size:
+            self._segment_no += 1
+            self._open_segment()
+            offset = 0
+        entry = (self._buffer_start_key, self._segment_no, offset)
+        self._segment_file.write(self._buffer)
+        self._segment_file.flush()
+        self._index_file.write(self._index_entry.pack(*entry))
+        self._index_file.flush()
+        self._index.append(entry)
+        self._buffer = bytearray()
+        self._buffer_start_key = None
+
+    def _records(self, start=None):
+        segment_no, offset = 0, 0
+        if start is not None:
+            pos = bisect_right(self._index, (start, ))
+            if pos > 0:
+                # Records with `start` key can begin in the previous write
+                _, segment_no, offset = self._index[pos - 1]
+        for seg in self._segment_numbers():
+            if seg < segment_no:
+                continue
+            with open(self._segment_path(seg), 'rb') as f:
+                if seg == segment_no:
+                    f.seek(offset)
+                while True:
+                    header = f.read(self._length.size)
+                    if len(header) < self._length.size:
+                        break
+                    length, = self._length.unpack(header)
+                    data = f.read(length)
+                    if len(data) < length:
+                        break
+                    key, val = msgpack.unpackb(data, encoding='utf-8')
+                    if start is None or key >= start:
+                        yield key, val
+
+    def iterator(self, start=None, include_value=True):
+        """
+        Iterates over recorded values grouped by key, keys are returned as
+        bytes and values as a json list, starting from key `start` if given
+        """
+        self.flush()
+        current_key, values = None, []
+        for key, val in self._records(start):
+            if key != current_key and values:
+                yield self._item(current_key, values, include_value)
+                values = []
+            current_key = key
+            values.append(val)
+        if values:
+            yield self._item(current_key, values, include_value)
+
+    @staticmethod
+    def _item(key, values, include_value):
+        key = str(key).encode()
+        if not include_value:
+            return key
+        return key, json.dumps(values).encode()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self._segment_file.close()
+        self._segment_file = None
+        self._index_file.close()
@@ -5,7 +5,9 @@ from storage.kv_store_rocksdb_int_keys import KeyValueStorageRocksdbIntKeys
 
 from stp_core.common.log import getlogger
 
-from plenum.recorder.recorder import Recorder
+from plenum.common.config_util import getConfig
+from plenum.recorder.recorder import Recorder, BufferedRecorder
+from plenum.recorder.segment_store import RecorderSegmentStore
 from stp_zmq.simple_zstack import SimpleZStack
 
 logger = getlogger()
@@ -22,19 +24,44 @@ class SimpleZStackWithRecorder(SimpleZStack):
         else:
             db_path = os.path.join(parent_dir, 'data', name[:-1], 'recorder')
         os.makedirs(db_path, exist_ok=True)
-        db = KeyValueStorageRocksdbIntKeys(db_path, name)
-        self.recorder = Recorder(db)
+        config = kwargs.get('config') or getConfig()
+        if config.RECORDER_STORAGE == 'segments':
+            store = RecorderSegmentStore(
+                db_path, name,
+                flush_size=config.RECORDER_FLUSH_SIZE,
+                flush_interval=config.RECORDER_FLUSH_INTERVAL,
+                segment_size=config.RECORDER_SEGMENT_SIZE)
+            self.recorder = BufferedRecorder(store)
+        else:
+            db = KeyValueStorageRocksdbIntKeys(db_path, name)
+            self.recorder = Recorder(db)
         super().__init__(*args, **kwargs)
 
+    async def service(self, limit=None) -> int:
+        count = await super().service(limit)
+        # Buffered records are written in time even if nothing is recorded
+        self.recorder.service()
+        return count
+
     def _verifyAndAppend(self, msg, ident):
         if super()._verifyAndAppend(msg, ident):
             logger.trace('{} recording incoming {} from {}'.format(self, msg, ident))
+            if msg.startswith(self.msgpackPrefix):
+                # Messages are recorded as JSON
+                msg = self.serializeMsg(self.deserializeMsg(msg))
             self.recorder.add_incoming(msg, ident)
 
     def transmit(self, msg, uid, timeout=None, serialized=False):
         status, err = super().transmit(msg, uid, timeout=timeout, serialized=serialized)
         if status:
-            self.recorder.add_outgoing(msg, uid)
+            if isinstance(msg, bytes) and msg.startswith(self.batchFramePrefix):
+                # Messages of a batch frame are recorded one by one
+                for m in self.unframeMsgs(msg):
+                    if m.startswith(self.msgpackPrefix):
+                        m = self.serializeMsg(self.deserializeMsg(m))
+                    self.recorder.add_outgoing(m, uid)
+            else:
+                self.recorder.add_outgoing(msg, uid)
         return status, err
 
     def _connsChanged(self, ins: Set[str], outs: Set[str]) -> None:
@@ -0,0 +1,108 @@
+from typing import Dict, Optional, Tuple
+
+from stp_core.common.log import getlogger
+
+logger = getlogger()
+
+
+class AdmissionControl:
+    """
+    Limits write requests received from clients which are not yet executed
+    and freed by the node. A new request is admitted if the number and the
+    total size of admitted requests are below the limits and the client
+    sending it holds less than its fair share of the requests. The fair
+    share is the limit of requests divided by the number of clients
+    holding admitted requests, but not less than `min_client_quota`.
+
+    Requests are checked on receipt, before their signatures are verified,
+    and accounted once they are recorded by the node, so the limits can be
+    exceeded by the requests received in one pass over the client stack.
+    """
+
+    def __init__(self,
+                 max_requests: int,
+                 max_bytes: int,
+                 min_client_quota: int = 1):
+        """
+        :param max_requests: maximum number of admitted requests, 0 for no
+            limit
+        :param max_bytes: maximum total size of admitted requests, 0 for no
+            limit
+        :param min_client_quota: number of requests each client can hold
+            regardless of the number of clients
+        """
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.min_client_quota = min_client_quota
+        # client and size of each admitted request by its key
+        self._admitted = {}  # type: Dict[str, Tuple[str, int]]
+        self._per_client = {}  # type: Dict[str, int]
+        self._bytes = 0
+        self.rejected = 0
+
+    @property
+    def requests_count(self) -> int:
+        return len(self._admitted)
+
+    @property
+    def bytes_count(self) -> int:
+        return self._bytes
+
+    def client_quota(self, client: str) -> Optional[int]:
+        if not self.max_requests:
+            return None
+        clients = len(self._per_client)
+        if client not in self._per_client:
+            clients += 1
+        return max(self.min_client_quota, self.max_requests // clients)
+
+    def check(self, client: str, size: int = 0) -> Optional[str]:
+        """
+        Returns the reason a new request of the client can not be admitted
+        or None if it can be
+        """
+        reason = None
+        if self.max_requests and len(self._admitted) >= self.max_requests:
+            reason = 'too many requests are being processed'
+        elif self.max_bytes and self._bytes + size > self.max_bytes:
+            reason = 'too much data of requests is being processed'
+        elif self.max_requests and \
+                self._per_client.get(client, 0) >= self.client_quota(client):
+            reason = 'client has too many requests being processed'
+        return reason
+
+    def reject(self):
+        """
+        Accounts a request rejected for the reason returned by `check`
+        """
+        self.rejected += 1
+
+    def admit(self, key: str, client: str, size: int = 0):
+        """
+        Accounts the request recorded by the node till it is released
+        """
+        if key in self._admitted:
+            return
+        self._admitted[key] = (client, size)
+        self._per_client[client] = self._per_client.get(client, 0) + 1
+        self._bytes += size
+
+    def release(self, key: str):
+        admitted = self._admitted.pop(key, None)
+        if admitted is None:
+            return
+        client, size = admitted
+        self._bytes -= size
+        count = self._per_client[client] - 1
+        if count:
+            self._per_client[client] = count
+        else:
+            del self._per_client[client]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'admitted_requests': len(self._admitted),
+            'admitted_bytes': self._bytes,
+            'clients': len(self._per_client),
+            'rejected_requests': self.rejected,
+        }
@@ -2,10 +2,12 @@
 Clients are authenticated with a digital signature.
 """
 from abc import abstractmethod
-from typing import Dict
+from typing import Any, Dict, List, Tuple
 
 import base58
+from common.lru_cache import LRUCache
 from common.serializers.serialization import serialize_msg_for_signing
+from plenum.common.config_util import getConfig
 from plenum.common.constants import VERKEY, ROLE, GET_TXN
 from plenum.common.exceptions import EmptySignature, \
     MissingSignature, EmptyIdentifier, \
@@ -78,38 +80,111 @@ class ClientAuthNr:
         """
 
 
+class SigVerificationBatch:
+    """
+    Signature checks postponed by `NaclAuthNr.authenticate_multi` while the
+    batch is set as the authenticator's `sig_batch`. Checks of each
+    `authenticate_multi` call are kept as a group tagged with the current
+    `key`, so all checks can be performed at once and failures mapped back
+    to the messages they came from.
+    """
+
+    def __init__(self):
+        self.key = None
+        # List of (key, list of (verifier, signature, message to serialize))
+        self.groups = []  # type: List[Tuple[Any, List[Tuple]]]
+
+    def add(self, checks: List[Tuple]):
+        self.groups.append((self.key, checks))
+
+    @property
+    def checks(self) -> List[Tuple]:
+        return [check for _, checks in self.groups for check in checks]
+
+    def failures(self, results) -> Dict[Any, Exception]:
+        """
+        :param results: result of each check, in the order of `checks`
+        :return: the exception to be raised for each key having a group
+            with a failed check
+        """
+        failed = {}
+        results = iter(results)
+        for key, checks in self.groups:
+            correct = sum(1 for _ in checks if next(results))
+            if correct < len(checks) and key not in failed:
+                failed[key] = InsufficientCorrectSignatures(correct,
+                                                            len(checks))
+        return failed
+
+
+def verify_sig_checks(checks: List[Tuple]) -> List[bool]:
+    """
+    Performs checks collected by `SigVerificationBatch`, serializing the
+    messages too. Checks are picklable so they can be done in other processes
+    """
+    return [vr.verify(sig, serialize_msg_for_signing(msg))
+            for vr, sig, msg in checks]
+
+
 class NaclAuthNr(ClientAuthNr):
+    # When set, signature checks requiring all signatures to be correct are
+    # added to the batch instead of being done immediately
+    sig_batch = None  # type: SigVerificationBatch
+    # key: (verifier class, identifier, verkey), value: verifier; created on
+    # first use if a subclass does not call `__init__`
+    _verifiers = None  # type: LRUCache
+
+    def __init__(self, verifier_cache_size=None):
+        self._verifiers = LRUCache(
+            verifier_cache_size or getConfig().CLIENT_VERIFIER_CACHE_SIZE)
+
+    def _get_verifier(self, verifier: Verifier, verkey, identifier):
+        if self._verifiers is None:
+            self._verifiers = LRUCache(getConfig().CLIENT_VERIFIER_CACHE_SIZE)
+        key = (verifier, identifier, verkey)
+        vr = self._verifiers.get(key)
+        if vr is None:
+            vr = verifier(verkey, identifier=identifier)
+            self._verifiers.put(key, vr)
+        return vr
 
     def authenticate_multi(self, msg: Dict, signatures: Dict[str, str],
                            threshold: int=None, verifier: Verifier=DidVerifier):
         num_sigs = len(signatures)
+        defer = False
         if threshold is not None:
             if num_sigs < threshold:
                 raise InsufficientSignatures(num_sigs, threshold)
         else:
             threshold = num_sigs
+            defer = self.sig_batch is not None
         correct_sigs_from = []
+        deferred = []
         for idr, sig in signatures.items():
             try:
                 sig = base58.b58decode(sig)
             except Exception as ex:
                 raise InvalidSignatureFormat from ex
 
-            ser = self.serializeForSig(msg, identifier=idr)
             verkey = self.getVerkey(idr)
 
             if verkey is None:
                 raise CouldNotAuthenticate(
                     'Can not find verkey for {}'.format(idr))
 
-            vr = verifier(verkey, identifier=idr)
-            if vr.verify(sig, ser):
-                correct_sigs_from.append(idr)
-                if len(correct_sigs_from) == threshold:
-                    break
+            vr = self._get_verifier(verifier, verkey, idr)
+            if defer:
+                deferred.append((vr, sig, self.msgForSig(msg, identifier=idr)))
+            elif not vr.verify(sig, self.serializeForSig(msg, identifier=idr)):
+                continue
+            correct_sigs_from.append(idr)
+            if len(correct_sigs_from) == threshold:
+                break
         else:
             raise InsufficientCorrectSignatures(len(correct_sigs_from),
                                                 threshold)
+        if deferred:
+            self.sig_batch.add(deferred)
         return correct_sigs_from
 
     @abstractmethod
@@ -120,9 +195,16 @@ class NaclAuthNr(ClientAuthNr):
     def getVerkey(self, identifier):
         pass
 
+    def msgForSig(self, msg, identifier=None):
+        """
+        Returns the message whose serialization is signed by `identifier`
+        """
+        return msg
+
     def serializeForSig(self, msg, identifier=None, topLevelKeysToIgnore=None):
         return serialize_msg_for_signing(
-            msg, topLevelKeysToIgnore=topLevelKeysToIgnore)
+            self.msgForSig(msg, identifier=identifier),
+            topLevelKeysToIgnore=topLevelKeysToIgnore)
 
 
 class SimpleAuthNr(NaclAuthNr):
@@ -131,10 +213,24 @@ class SimpleAuthNr(NaclAuthNr):
     secure system.
     """
 
-    def __init__(self, state=None):
+    # key: some identifier, value: verification key read from the
+    # uncommitted state, entries are dropped by `on_verkey_changed`; created
+    # on first use if a subclass does not call `__init__`
+    _state_verkeys = None  # type: LRUCache
+
+    def __init__(self, state=None, verkey_cache_size=None):
+        NaclAuthNr.__init__(self)
         # key: some identifier, value: verification key
         self.clients = {}  # type: Dict[str, Dict]
         self.state = state
+        self._state_verkeys = LRUCache(
+            verkey_cache_size or getConfig().CLIENT_VERKEY_CACHE_SIZE)
+
+    def _state_verkey_cache(self) -> LRUCache:
+        if self._state_verkeys is None:
+            self._state_verkeys = LRUCache(
+                getConfig().CLIENT_VERKEY_CACHE_SIZE)
+        return self._state_verkeys
 
     def addIdr(self, identifier, verkey, role=None):
         if identifier in self.clients:
@@ -147,17 +243,33 @@ class SimpleAuthNr(NaclAuthNr):
 
     def getVerkey(self, identifier):
         nym = self.clients.get(identifier)
+        if nym:
+            return nym.get(VERKEY)
+        cache = self._state_verkey_cache()
+        if identifier in cache:
+            return cache.get(identifier)
+        # Querying uncommitted identities since a batch might contain
+        # both identity creation request and a request by that newly
+        # created identity, also its possible to have multiple uncommitted
+        # batches in progress and identity creation request might
+        # still be in an earlier uncommited batch
+        nym = DomainRequestHandler.getNymDetails(
+            self.state, identifier, isCommitted=False)
         if not nym:
-            # Querying uncommitted identities since a batch might contain
-            # both identity creation request and a request by that newly
-            # created identity, also its possible to have multiple uncommitted
-            # batches in progress and identity creation request might
-            # still be in an earlier uncommited batch
-            nym = DomainRequestHandler.getNymDetails(
-                self.state, identifier, isCommitted=False)
-            if not nym:
-                raise UnknownIdentifier(identifier)
-        return nym.get(VERKEY)
+            raise UnknownIdentifier(identifier)
+        verkey = nym.get(VERKEY)
+        cache.put(identifier, verkey)
+        return verkey
+
+    def on_verkey_changed(self, identifier=None):
+        """
+        Drops cached verkey of the identifier, or all cached verkeys if the
+        identifier is None
+        """
+        if identifier is None:
+            self._state_verkey_cache().clear()
+        else:
+            self._state_verkey_cache().pop(identifier)
 
     def authenticate(self,
                      msg: Dict,
@@ -245,11 +357,15 @@ class CoreAuthMixin:
         return self.authenticate_multi(to_serialize,
                                        signatures=signatures, verifier=verifier)
 
-    def serializeForSig(self, msg, identifier=None, topLevelKeysToIgnore=None):
+    def msgForSig(self, msg, identifier=None):
         if not msg.get(f.IDENTIFIER.nm):
             msg = {**msg, f.IDENTIFIER.nm: identifier}
+        return msg
+
+    def serializeForSig(self, msg, identifier=None, topLevelKeysToIgnore=None):
         return serialize_msg_for_signing(
-            msg, topLevelKeysToIgnore=topLevelKeysToIgnore)
+            self.msgForSig(msg, identifier=identifier),
+            topLevelKeysToIgnore=topLevelKeysToIgnore)
 
 
 class CoreAuthNr(CoreAuthMixin, SimpleAuthNr):
@@ -0,0 +1,140 @@
+from concurrent.futures import Future, ThreadPoolExecutor, \
+    ProcessPoolExecutor
+from hashlib import sha256
+from typing import Callable, List, Mapping, Tuple
+
+from common.serializers.serialization import serialize_msg_for_signing
+from plenum.common.exceptions import BlowUp
+from plenum.common.request import Request
+from plenum.server.client_authn import SigVerificationBatch, verify_sig_checks
+from plenum.server.req_authenticator import ReqAuthenticator
+from stp_core.common.log import getlogger
+
+logger = getlogger()
+
+
+def request_digests(signing_states: List[Mapping]) -> List[str]:
+    return [sha256(serialize_msg_for_signing(state)).hexdigest()
+            for state in signing_states]
+
+
+class ClientSigVerifier:
+    """
+    Verification stage for client messages. Messages received during one
+    pass over the client stack are collected with `add` and their signatures
+    are verified together on `process`, spread over a pool of worker threads
+    (libsodium releases the GIL while verifying) or worker processes. With
+    processes, serialization of the signed messages and request digests are
+    done by the workers too. Messages are then passed on in the order they
+    were received.
+    """
+
+    def __init__(self,
+                 authenticator: ReqAuthenticator,
+                 verify_signature: Callable,
+                 on_verified: Callable,
+                 on_invalid: Callable,
+                 workers: int = 1,
+                 use_processes: bool = False):
+        """
+        :param authenticator: authenticator used by `verify_signature`
+        :param verify_signature: callable raising an exception if the
+            message can not be authenticated
+        :param on_verified: called with (message, sender) of each message
+            having correct signatures
+        :param on_invalid: called with (exception, (message, sender)) of
+            each message failing the verification
+        :param workers: number of threads (or processes) verifying
+            signatures, signatures are verified in the calling thread if it
+            is not more than 1
+        :param use_processes: whether workers are processes
+        """
+        self._authenticator = authenticator
+        self._verify_signature = verify_signature
+        self._on_verified = on_verified
+        self._on_invalid = on_invalid
+        self._workers = workers
+        self._use_processes = use_processes
+        self._executor = None
+        if workers > 1:
+            self._executor = ProcessPoolExecutor(workers) if use_processes \
+                else ThreadPoolExecutor(workers)
+        self._pending = []  # type: List[Tuple]
+
+    def add(self, msg, frm):
+        self._pending.append((msg, frm))
+
+    def __len__(self):
+        return len(self._pending)
+
+    def process(self) -> int:
+        """
+        Verifies signatures of all pending messages, including the ones added
+        while processing (e.g. messages of a batch)
+
+        :return: number of messages processed
+        """
+        count = 0
+        while self._pending:
+            pending, self._pending = self._pending, []
+            count += len(pending)
+            self._process(pending)
+        return count
+
+    def _process(self, pending: List[Tuple]):
+        batch = SigVerificationBatch()
+        failed = {}
+        with self._authenticator.deferred_verification(batch):
+            for i, (msg, _) in enumerate(pending):
+                batch.key = i
+                try:
+                    self._verify_signature(msg)
+                except BlowUp:
+                    raise
+                except Exception as ex:
+                    failed[i] = ex
+        results = self._submit(verify_sig_checks, batch.checks)
+        requests, digests = self._submit_digests(pending)
+        for i, ex in batch.failures(self._gather(results)).items():
+            failed.setdefault(i, ex)
+        for (msg, _), digest in zip(requests, self._gather(digests)):
+            msg._digest = digest
+        for i, wrappedMsg in enumerate(pending):
+            if i in failed:
+                self._on_invalid(failed[i], wrappedMsg)
+            else:
+                self._on_verified(*wrappedMsg)
+
+    def _submit_digests(self, pending: List[Tuple]):
+        # Digests are computed in advance only if it can be done by worker
+        # processes and only for requests which use the default digest
+        if not self._use_processes or self._executor is None:
+            return [], []
+        requests = [(msg, frm) for msg, frm in pending
+                    if isinstance(msg, Request) and
+                    type(msg).getDigest is Request.getDigest and
+                    msg._digest is None]
+        states = [msg.signingState() for msg, _ in requests]
+        return requests, self._submit(request_digests, states)
+
+    def _submit(self, func, items: List) -> List[Future]:
+        """
+        Applies `func`, taking and returning a list, to `items` split in
+        chunks among the workers
+        """
+        if self._executor is None or len(items) < 2:
+            future = Future()
+            future.set_result(func(items))
+            return [future]
+        chunk_size = -(-len(items) // self._workers)
+        return [self._executor.submit(func, items[i:i + chunk_size])
+                for i in range(0, len(items), chunk_size)]
+
+    @staticmethod
+    def _gather(futures: List[Future]) -> List:
+        return [result for future in futures for result in future.result()]
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
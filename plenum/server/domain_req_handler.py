@@ -1,5 +1,6 @@
 from binascii import hexlify
 from hashlib import sha256
+from typing import List, Callable, Optional
 
 from common.serializers.serialization import domain_state_serializer, \
     proof_nodes_serializer, state_roots_serializer
@@ -22,11 +23,18 @@ class DomainRequestHandler(LedgerRequestHandler):
     stateSerializer = domain_state_serializer
     write_types = {NYM, }
 
-    def __init__(self, ledger, state, config, reqProcessors, bls_store, ts_store=None):
+    def __init__(self, ledger, state, config, reqProcessors, bls_store,
+                 ts_store=None, role_index=None):
         super().__init__(ledger, state, ts_store=ts_store)
         self.config = config
         self.reqProcessors = reqProcessors
         self.bls_store = bls_store
+        self.role_index = role_index
+        if self.role_index is not None:
+            self._catchup_role_index()
+        # Called with a nym whenever its state entry is updated or with None
+        # when uncommitted updates of any nyms are reverted
+        self._nym_change_listeners = []  # type: List[Callable[[Optional[str]], None]]
 
     def doStaticValidation(self, request: Request):
         pass
@@ -67,6 +75,34 @@ class DomainRequestHandler(LedgerRequestHandler):
     def updateState(self, txns, isCommitted=False):
         for txn in txns:
             self._updateStateWithSingleTxn(txn, isCommitted=isCommitted)
+            self._update_role_index_seq_no(txn, isCommitted=isCommitted)
+
+    def commit(self, txnCount, stateRoot, txnRoot, ppTime) -> List:
+        committedTxns = super().commit(txnCount, stateRoot, txnRoot, ppTime)
+        if self.role_index is not None:
+            self.role_index.on_batch_committed()
+        return committedTxns
+
+    def onBatchCreated(self, state_root):
+        if self.role_index is not None:
+            self.role_index.on_batch_created(state_root)
+
+    def onBatchRejected(self):
+        if self.role_index is not None:
+            self.role_index.on_batch_rejected()
+        self._notify_nym_changed(None)
+
+    def onBatchDiscarded(self):
+        if self.role_index is not None:
+            self.role_index.on_batch_discarded()
+        self._notify_nym_changed(None)
+
+    def subscribe_to_nym_changes(self, listener: Callable[[Optional[str]], None]):
+        self._nym_change_listeners.append(listener)
+
+    def _notify_nym_changed(self, nym):
+        for listener in self._nym_change_listeners:
+            listener(nym)
 
     def gen_txn_path(self, txn):
         typ = get_type(txn)
@@ -89,10 +125,10 @@ class DomainRequestHandler(LedgerRequestHandler):
     def countStewards(self) -> int:
         """
         Count the number of stewards added to the pool transaction store
-        Note: This is inefficient, a production use case of this function
-        should require an efficient storage mechanism
+        Note: Without a role index this scans the whole ledger
         """
-        # THIS SHOULD NOT BE DONE FOR PRODUCTION
+        if self.role_index is not None:
+            return self.role_index.count(STEWARD, is_committed=False)
         return sum(1 for _, txn in self.ledger.getAllTxn() if
                    (get_type(txn) == NYM) and (get_payload_data(txn).get(ROLE) == STEWARD))
 
@@ -101,6 +137,36 @@ class DomainRequestHandler(LedgerRequestHandler):
         by other stewards"""
         return self.countStewards() > config.stewardThreshold
 
+    def _is_role_indexed(self, txn, isCommitted) -> bool:
+        # Committed txns are replayed from the ledger when the state is
+        # recreated, the index may already contain them
+        seq_no = get_seq_no(txn)
+        return isCommitted and seq_no is not None and \
+            seq_no <= self.role_index.last_seq_no(is_committed=True)
+
+    def _update_role_index_seq_no(self, txn, isCommitted):
+        seq_no = get_seq_no(txn)
+        if self.role_index is None or seq_no is None or \
+                self._is_role_indexed(txn, isCommitted):
+            return
+        self.role_index.set_last_seq_no(seq_no, is_committed=isCommitted)
+
+    def _catchup_role_index(self):
+        """
+        Adds to the role index committed transactions which are not in it yet,
+        rebuilding the whole index from the ledger if it is missing
+        """
+        last_seq_no = self.role_index.last_seq_no(is_committed=True)
+        if last_seq_no >= self.ledger.size:
+            return
+        logger.info('Updating role index from ledger starting from seqNo '
+                    '{}'.format(last_seq_no + 1))
+        for seq_no, txn in self.ledger.getAllTxn(frm=last_seq_no + 1):
+            txn_data = get_payload_data(txn)
+            if get_type(txn) == NYM and ROLE in txn_data:
+                self.role_index.add(txn_data[ROLE], is_committed=True)
+        self.role_index.set_last_seq_no(self.ledger.size, is_committed=True)
+
     def updateNym(self, nym, txn, isCommitted=True):
         existingData = self.getNymDetails(self.state, nym,
                                           isCommitted=isCommitted)
@@ -118,6 +184,9 @@ class DomainRequestHandler(LedgerRequestHandler):
 
         if ROLE in txn_data:
             newData[ROLE] = txn_data[ROLE]
+            if self.role_index is not None and \
+                    not self._is_role_indexed(txn, isCommitted):
+                self.role_index.add(txn_data[ROLE], is_committed=isCommitted)
         if VERKEY in txn_data:
             newData[VERKEY] = txn_data[VERKEY]
         newData[F.seqNo.name] = get_seq_no(txn)
@@ -126,6 +195,7 @@ class DomainRequestHandler(LedgerRequestHandler):
         val = self.stateSerializer.serialize(existingData)
         key = self.nym_to_state_key(nym)
         self.state.set(key, val)
+        self._notify_nym_changed(nym)
         return existingData
 
     def hasNym(self, nym, isCommitted: bool=True):
@@ -1,7 +1,8 @@
 import time
 from collections import deque
 from functools import wraps
-from typing import Callable
+from heapq import heappush, heappop, heapify
+from typing import Callable, Optional
 
 from stp_core.common.log import getlogger
 from stp_core.common.util import get_func_name
@@ -14,11 +15,23 @@ class HasActionQueue:
         # holds a deque of Callables; use functools.partial if the callable
         # needs arguments
         self.actionQueue = deque()
-        self.aqStash = deque()
+        # heap of (time, action id, action) of actions scheduled to run later,
+        # cancelled actions are left in the heap and skipped when due
+        self.aqStash = []
         self.aqNextCheck = float('inf')  # next time to check
         self.aid = 0  # action id
         self.repeatingActions = set()
+        # ids of not yet executed and not cancelled events of each action
         self.scheduled = dict()
+        # action of each not yet executed and not cancelled event by its id
+        self._pending_actions = dict()
+
+    @property
+    def pending_actions_count(self) -> int:
+        """
+        Number of scheduled events which are neither executed nor cancelled
+        """
+        return len(self._pending_actions)
 
     def _schedule(self, action: Callable, seconds: int=0) -> int:
         """
@@ -35,15 +48,14 @@ class HasActionQueue:
             logger.trace("{} scheduling action {} with id {} to run in {} "
                          "seconds".format(self, get_func_name(action),
                                           self.aid, seconds))
-            self.aqStash.append((nxt, (action, self.aid)))
+            heappush(self.aqStash, (nxt, self.aid, action))
         else:
             logger.trace("{} scheduling action {} with id {} to run now".
                          format(self, get_func_name(action), self.aid))
             self.actionQueue.append((action, self.aid))
 
-        if action not in self.scheduled:
-            self.scheduled[action] = []
-        self.scheduled[action].append(self.aid)
+        self.scheduled.setdefault(action, set()).add(self.aid)
+        self._pending_actions[self.aid] = action
 
         return self.aid
 
@@ -57,19 +69,36 @@ class HasActionQueue:
                 scheduled event with the aid is cancelled.
         """
         if action is not None:
-            if action in self.scheduled:
+            aids = self.scheduled.pop(action, None)
+            if aids is not None:
                 logger.trace("{} cancelling all events for action {}, ids: {}"
-                             "".format(self, action, self.scheduled[action]))
-                self.scheduled[action].clear()
+                             "".format(self, action, aids))
+                for aid in aids:
+                    del self._pending_actions[aid]
         elif aid is not None:
-            for action, aids in self.scheduled.items():
-                try:
-                    aids.remove(aid)
-                except ValueError:
-                    pass
-                else:
-                    logger.trace("{} cancelled action {} with id {}".format(self, action, aid))
-                    break
+            action = self._remove_pending(aid)
+            if action is not None:
+                logger.trace("{} cancelled action {} with id {}".format(self, action, aid))
+        self._compact_stash()
+
+    def _remove_pending(self, aid: int) -> Optional[Callable]:
+        action = self._pending_actions.pop(aid, None)
+        if action is not None:
+            aids = self.scheduled[action]
+            aids.discard(aid)
+            if not aids:
+                del self.scheduled[action]
+        return action
+
+    def _compact_stash(self):
+        # Cancelled events are removed from the stash only when they make
+        # up most of it, so cancellation does not need to search the heap
+        if len(self.aqStash) > 2 * len(self._pending_actions) + 64:
+            self.aqStash[:] = [d for d in self.aqStash
+                               if d[1] in self._pending_actions]
+            heapify(self.aqStash)
+            self.aqNextCheck = self.aqStash[0][0] if self.aqStash \
+                else float('inf')
 
     def _serviceActions(self) -> int:
         """
@@ -80,21 +109,20 @@ class HasActionQueue:
         if self.aqStash:
             tm = time.perf_counter()
             if tm > self.aqNextCheck:
-                earliest = float('inf')
-                for d in list(self.aqStash):
-                    nxt, action = d
-                    if tm > nxt:
-                        self.actionQueue.appendleft(action)
-                        self.aqStash.remove(d)
-                    if nxt < earliest:
-                        earliest = nxt
-                self.aqNextCheck = earliest
+                due = []
+                while self.aqStash and tm > self.aqStash[0][0]:
+                    _, aid, action = heappop(self.aqStash)
+                    if aid in self._pending_actions:
+                        due.append((action, aid))
+                # Actions which are due run before the ones scheduled to run
+                # now, in the order of their time
+                self.actionQueue.extendleft(reversed(due))
+                self.aqNextCheck = self.aqStash[0][0] if self.aqStash \
+                    else float('inf')
         count = len(self.actionQueue)
         while self.actionQueue:
             action, aid = self.actionQueue.popleft()
-            assert action in self.scheduled
-            if aid in self.scheduled[action]:
-                self.scheduled[action].remove(aid)
+            if self._remove_pending(aid) is not None:
                 logger.trace("{} running action {} with id {}".
                              format(self, get_func_name(action), aid))
                 action()
@@ -103,6 +131,16 @@ class HasActionQueue:
                              format(self, get_func_name(action), aid))
         return count
 
+    def _clear_actions(self):
+        """
+        Drop all scheduled events without running them
+        """
+        self.actionQueue.clear()
+        self.aqStash.clear()
+        self.aqNextCheck = float('inf')
+        self.scheduled.clear()
+        self._pending_actions.clear()
+
     def startRepeating(self, action: Callable, seconds: int):
         @wraps(action)
         def wrapper():
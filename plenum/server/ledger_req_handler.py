@@ -77,6 +77,15 @@ class LedgerRequestHandler(RequestHandler, metaclass=ABCMeta):
     def onBatchRejected(self):
         pass
 
+    def onBatchDiscarded(self):
+        """
+        Requests of a batch were applied and reverted before the batch was
+        created, so there is no created batch to reject. Calls
+        `onBatchRejected` by default, handlers which track created batches
+        have to override it
+        """
+        self.onBatchRejected()
+
     @abstractmethod
     def doStaticValidation(self, request: Request):
         pass
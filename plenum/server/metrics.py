@@ -0,0 +1,357 @@
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+from plenum.common.config_util import getConfig
+
+
+class ThroughputMeasurement:
+    """
+    Measure throughput params
+    """
+
+    def __init__(self, window_size=15, min_cnt=16, first_ts=time.perf_counter()):
+        self.reqs_in_window = 0
+        self.throughput = 0
+        self.window_size = window_size
+        self.min_cnt = min_cnt
+        self.first_ts = first_ts
+        self.window_start_ts = self.first_ts
+        self.alpha = 2 / (self.min_cnt + 1)
+
+    def add_request(self, ordered_ts):
+        self.update_time(ordered_ts)
+        self.reqs_in_window += 1
+
+    def _accumulate(self, old_accum, next_val):
+        """
+        Implement exponential moving average
+        """
+        return old_accum * (1 - self.alpha) + next_val * self.alpha
+
+    def update_time(self, current_ts):
+        while current_ts >= self.window_start_ts + self.window_size:
+            self.throughput = self._accumulate(self.throughput, self.reqs_in_window / self.window_size)
+            self.window_start_ts = self.window_start_ts + self.window_size
+            self.reqs_in_window = 0
+
+    def get_throughput(self, request_time):
+        if request_time < self.first_ts + (self.window_size * self.min_cnt):
+            return None
+        self.update_time(request_time)
+        return self.throughput
+
+
+class LatencyMeasurement:
+    """
+    Measure latency params
+    """
+
+    def __init__(self, min_latency_count=10):
+        self.min_latency_count = min_latency_count
+        # map of client identifier and (total_reqs, avg_latency) tuple
+        self.avg_latencies = {}    # type: Dict(str, (int, float))
+        # This parameter defines coefficient alpha, which represents the degree of weighting decrease.
+        self.alpha = 1 / (self.min_latency_count + 1)
+
+    def add_duration(self, identifier, duration):
+        total_reqs, curr_avg_lat = self.avg_latencies.get(identifier, (0, .0))
+        total_reqs += 1
+        self.avg_latencies[identifier] = (total_reqs,
+                                          self._accumulate(curr_avg_lat,
+                                                           duration))
+
+    def _accumulate(self, old_accum, next_val):
+        """
+        Implement exponential moving average
+        """
+        return old_accum * (1 - self.alpha) + next_val * self.alpha
+
+    def get_avg_latency(self, identifier):
+        if identifier not in self.avg_latencies:
+            return None
+        total_reqs, curr_avg_lat = self.avg_latencies[identifier]
+        if total_reqs < self.min_latency_count:
+            return None
+
+        return curr_avg_lat
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in seconds. Like in HDR histograms, each power of
+    two above `lowest` is split into `sub_buckets` buckets of equal width,
+    so a latency is kept with a relative error of at most 1 / `sub_buckets`.
+    Latencies above `highest` are counted in the last bucket. Only counts
+    of non empty buckets are kept, so the memory used is bounded by the
+    number of buckets and does not depend on the number of latencies.
+    """
+
+    def __init__(self, lowest=1e-4, highest=1e4, sub_buckets=16):
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        self._max_index = self._index(highest)
+        self.counts = {}  # type: Dict[int, int]
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, value) -> int:
+        if value < self.lowest:
+            return 0
+        # value / lowest == m * 2 ** e, where 0.5 <= m < 1 and e >= 1
+        m, e = math.frexp(value / self.lowest)
+        return (e - 1) * self.sub_buckets + \
+            int((2 * m - 1) * self.sub_buckets) + 1
+
+    def _upper_bound(self, index) -> float:
+        if index == 0:
+            return self.lowest
+        e, sub = divmod(index - 1, self.sub_buckets)
+        return self.lowest * 2 ** e * (1 + (sub + 1) / self.sub_buckets)
+
+    def record(self, value, count=1):
+        idx = min(self._index(value), self._max_index)
+        self.counts[idx] = self.counts.get(idx, 0) + count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        for idx, count in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, q) -> float:
+        """
+        Returns the upper bound of the bucket with the latency below which
+        `q` percents of latencies are
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return min(self._upper_bound(idx), self.max)
+        return self.max
+
+    def summary(self, percentiles=(50, 90, 99)) -> Dict[str, float]:
+        summary = {'count': self.count, 'mean': self.mean, 'max': self.max}
+        for q in percentiles:
+            summary['p{}'.format(q)] = self.percentile(q)
+        return summary
+
+
+class WindowedHistogram:
+    """
+    Latency histogram of the last `window_size` seconds, kept as histograms
+    of `buckets` consecutive periods
+    """
+
+    def __init__(self, window_size, buckets=6, **histogram_params):
+        self.window_size = window_size
+        self.bucket_size = window_size / buckets
+        self._histogram_params = histogram_params
+        # of (start of the period, histogram of the period)
+        self._histograms = deque()
+
+    def record(self, value, now=None):
+        now = time.perf_counter() if now is None else now
+        start = now - now % self.bucket_size
+        if not self._histograms or self._histograms[-1][0] != start:
+            self._histograms.append(
+                (start, LatencyHistogram(**self._histogram_params)))
+            self._trim(now)
+        self._histograms[-1][1].record(value)
+
+    def _trim(self, now):
+        while self._histograms and \
+                self._histograms[0][0] + self.bucket_size <= \
+                now - self.window_size:
+            self._histograms.popleft()
+
+    def histogram(self, now=None) -> LatencyHistogram:
+        now = time.perf_counter() if now is None else now
+        self._trim(now)
+        histogram = LatencyHistogram(**self._histogram_params)
+        for _, h in self._histograms:
+            histogram.merge(h)
+        return histogram
+
+
+class WindowedCounter:
+    """
+    Number, sum and maximum of values added in the last `window_size`
+    seconds, kept for `buckets` consecutive periods. Used both for counters
+    of events and for samples of gauges like queue depths.
+    """
+
+    def __init__(self, window_size, buckets=6):
+        self.window_size = window_size
+        self.bucket_size = window_size / buckets
+        # of [start of the period, count, sum, max]
+        self._buckets = deque()
+        self.last = 0
+
+    def add(self, value=1, now=None):
+        now = time.perf_counter() if now is None else now
+        start = now - now % self.bucket_size
+        if not self._buckets or self._buckets[-1][0] != start:
+            self._buckets.append([start, 0, 0, value])
+            self._trim(now)
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += value
+        if value > bucket[3]:
+            bucket[3] = value
+        self.last = value
+
+    def _trim(self, now):
+        while self._buckets and \
+                self._buckets[0][0] + self.bucket_size <= \
+                now - self.window_size:
+            self._buckets.popleft()
+
+    def stats(self, now=None) -> Dict[str, float]:
+        now = time.perf_counter() if now is None else now
+        self._trim(now)
+        count = sum(b[1] for b in self._buckets)
+        total = sum(b[2] for b in self._buckets)
+        return {
+            'count': count,
+            'sum': total,
+            'max': max((b[3] for b in self._buckets), default=0),
+            'last': self.last,
+            'rate': total / self.window_size,
+        }
+
+
+class NodeMetrics:
+    """
+    Metrics of a node in one place: throughput and average latency per
+    client measured for each protocol instance which `Monitor` uses to
+    find out if master is degraded, latency histograms of each instance,
+    of clients and of 3 phase commit phases, and counters of events and
+    samples of queue depths over time.
+    """
+
+    # 3PC phases: from PRE-PREPARE to quorum of PREPAREs and from quorum of
+    # PREPAREs to quorum of COMMITs (ordering)
+    PREPARE_PHASE = 'prepare'
+    COMMIT_PHASE = 'commit'
+
+    ORDERED_REQUESTS = 'ordered_requests'
+    ORDERED_BATCHES = 'ordered_batches'
+    CATCHUP_TXNS = 'catchup_txns'
+    QUEUE_DEPTH_PREFIX = 'queue_depth.'
+
+    def __init__(self, config=None):
+        self.config = config or getConfig()
+        window = self.config.METRICS_WINDOW_SIZE
+        self.window_size = window
+        self.throughputs = []  # type: List[ThroughputMeasurement]
+        self.client_avg_latencies = []  # type: List[LatencyMeasurement]
+        self.ordering_latencies = []  # type: List[WindowedHistogram]
+        # Latencies of requests of each client ordered by master, only the
+        # clients whose requests were ordered last are kept
+        self.client_latencies = OrderedDict()  # type: Dict[str, LatencyHistogram]
+        self.phase_latencies = {
+            self.PREPARE_PHASE: WindowedHistogram(window),
+            self.COMMIT_PHASE: WindowedHistogram(window),
+        }
+        self.counters = {}  # type: Dict[str, WindowedCounter]
+
+    def _new_throughput(self):
+        return ThroughputMeasurement(
+            window_size=self.config.ThroughputInnerWindowSize,
+            min_cnt=self.config.ThroughputMinActivityThreshold,
+            first_ts=time.perf_counter())
+
+    def _new_client_avg_latency(self):
+        return LatencyMeasurement(
+            min_latency_count=self.config.MIN_LATENCY_COUNT)
+
+    def add_instance(self):
+        self.throughputs.append(self._new_throughput())
+        self.client_avg_latencies.append(self._new_client_avg_latency())
+        self.ordering_latencies.append(WindowedHistogram(self.window_size))
+
+    def remove_instance(self, inst_id: int):
+        del self.throughputs[inst_id]
+        del self.client_avg_latencies[inst_id]
+        del self.ordering_latencies[inst_id]
+
+    def reset(self, num_instances: int):
+        """
+        Resets measurements used to find out if master is degraded
+        """
+        for i in range(num_instances):
+            self.throughputs[i] = self._new_throughput()
+            self.client_avg_latencies[i] = self._new_client_avg_latency()
+
+    def request_ordered(self, inst_id: int, identifier: Optional[str],
+                        duration: float, now: float, by_master: bool):
+        self.throughputs[inst_id].add_request(now)
+        self.ordering_latencies[inst_id].record(duration, now)
+        if identifier is not None:
+            self.client_avg_latencies[inst_id].add_duration(identifier,
+                                                            duration)
+            if by_master:
+                self._client_latency(identifier).record(duration)
+        if by_master:
+            self.count(self.ORDERED_REQUESTS, now=now)
+
+    def _client_latency(self, identifier: str) -> LatencyHistogram:
+        histogram = self.client_latencies.pop(identifier, None)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            if len(self.client_latencies) >= self.config.METRICS_MAX_CLIENTS:
+                self.client_latencies.popitem(last=False)
+        self.client_latencies[identifier] = histogram
+        return histogram
+
+    def phase_completed(self, phase: str, duration: float, now=None):
+        self.phase_latencies[phase].record(duration, now)
+
+    def count(self, name: str, value=1, now=None):
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = WindowedCounter(self.window_size)
+        counter.add(value, now)
+
+    def sample_queue_depths(self, depths: Dict[str, int], now=None):
+        now = time.perf_counter() if now is None else now
+        for name, depth in depths.items():
+            self.count(self.QUEUE_DEPTH_PREFIX + name, depth, now)
+
+    def summary(self, now=None) -> Dict:
+        """
+        Latency percentiles and counters of the last `METRICS_WINDOW_SIZE`
+        seconds
+        """
+        now = time.perf_counter() if now is None else now
+        return {
+            'window': self.window_size,
+            'ordering_latency': {
+                inst_id: h.histogram(now).summary()
+                for inst_id, h in enumerate(self.ordering_latencies)},
+            'phase_latency': {
+                phase: h.histogram(now).summary()
+                for phase, h in self.phase_latencies.items()},
+            'counters': {name: counter.stats(now)
+                         for name, counter in self.counters.items()},
+        }
+
+    def client_summary(self, identifier: str) -> Optional[Dict[str, float]]:
+        histogram = self.client_latencies.get(identifier)
+        return histogram.summary() if histogram is not None else None
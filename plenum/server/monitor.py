@@ -1,7 +1,8 @@
 import time
+from collections import OrderedDict, deque
 from datetime import datetime
 from statistics import mean
-from typing import Dict, Iterable, Optional
+from typing import Callable, Dict, Iterable, Optional
 from typing import List
 from typing import Tuple
 
@@ -18,6 +19,8 @@ from plenum.common.types import EVENT_REQ_ORDERED, EVENT_NODE_STARTED, \
 from plenum.server.blacklister import Blacklister
 from plenum.server.has_action_queue import HasActionQueue
 from plenum.server.instances import Instances
+from plenum.server.metrics import NodeMetrics, ThroughputMeasurement, \
+    LatencyMeasurement
 from plenum.server.notifier_plugin_manager import notifierPluginTriggerEvents, \
     PluginManager
 from plenum.server.plugin.has_plugin_loader_helper import PluginLoaderHelper
@@ -26,81 +29,46 @@ pluginManager = PluginManager()
 logger = getlogger()
 
 
-class ThroughputMeasurement:
+class LatencyWindow:
     """
-    Measure throughput params
+    Latencies of requests ordered in the last `window_size` seconds with
+    their running total
     """
 
-    def __init__(self, window_size=15, min_cnt=16, first_ts=time.perf_counter()):
-        self.reqs_in_window = 0
-        self.throughput = 0
+    def __init__(self, window_size):
         self.window_size = window_size
-        self.min_cnt = min_cnt
-        self.first_ts = first_ts
-        self.window_start_ts = self.first_ts
-        self.alpha = 2 / (self.min_cnt + 1)
+        self._latencies = deque()  # of (ordered time, latency)
+        self._total = 0
 
-    def add_request(self, ordered_ts):
-        self.update_time(ordered_ts)
-        self.reqs_in_window += 1
+    def add(self, timestamp, latency):
+        self._latencies.append((timestamp, latency))
+        self._total += latency
+        self.trim(timestamp)
 
-    def _accumulate(self, old_accum, next_val):
-        """
-        Implement exponential moving average
-        """
-        return old_accum * (1 - self.alpha) + next_val * self.alpha
+    def trim(self, now):
+        while self._latencies and \
+                now - self._latencies[0][0] > self.window_size:
+            self._total -= self._latencies.popleft()[1]
+        if not self._latencies:
+            # Drop the error accumulated by the running total
+            self._total = 0
 
-    def update_time(self, current_ts):
-        while current_ts >= self.window_start_ts + self.window_size:
-            self.throughput = self._accumulate(self.throughput, self.reqs_in_window / self.window_size)
-            self.window_start_ts = self.window_start_ts + self.window_size
-            self.reqs_in_window = 0
-
-    def get_throughput(self, request_time):
-        if request_time < self.first_ts + (self.window_size * self.min_cnt):
-            return None
-        self.update_time(request_time)
-        return self.throughput
+    def avg(self, now) -> float:
+        self.trim(now)
+        return self._total / len(self._latencies) if self._latencies else 0
 
+    def __len__(self):
+        return len(self._latencies)
 
-class LatencyMeasurement:
-    """
-    Measure latency params
-    """
-
-    def __init__(self, min_latency_count=10):
-        self.min_latency_count = min_latency_count
-        # map of client identifier and (total_reqs, avg_latency) tuple
-        self.avg_latencies = {}    # type: Dict(str, (int, float))
-        # This parameter defines coefficient alpha, which represents the degree of weighting decrease.
-        self.alpha = 1 / (self.min_latency_count + 1)
-
-    def add_duration(self, identifier, duration):
-        total_reqs, curr_avg_lat = self.avg_latencies.get(identifier, (0, .0))
-        total_reqs += 1
-        self.avg_latencies[identifier] = (total_reqs,
-                                          self._accumulate(curr_avg_lat,
-                                                           duration))
-
-    def _accumulate(self, old_accum, next_val):
-        """
-        Implement exponential moving average
-        """
-        return old_accum * (1 - self.alpha) + next_val * self.alpha
-
-    def get_avg_latency(self, identifier):
-        if identifier not in self.avg_latencies:
-            return None
-        total_reqs, curr_avg_lat = self.avg_latencies[identifier]
-        if total_reqs < self.min_latency_count:
-            return None
-
-        return curr_avg_lat
+    def __iter__(self):
+        return iter(self._latencies)
 
 
 class RequestTimeTracker:
     """
-    Request time tracking utility
+    Request time tracking utility. Requests not ordered by master are kept
+    in the order they started in, separately for requests which were and
+    were not handled as unordered for too long
     """
 
     class Request:
@@ -134,37 +102,59 @@ class RequestTimeTracker:
     def __init__(self, instance_count):
         self.instance_count = instance_count
         self._requests = {}
+        # keys of requests not ordered by master by their state, values are
+        # not used, dicts keep the keys in the order the requests started
+        self._unhandled_unordered = OrderedDict()
+        self._handled_unordered = OrderedDict()
 
     def __contains__(self, item):
         return item in self._requests
 
     def start(self, key, timestamp):
+        self._forget_unordered(key)
         self._requests[key] = RequestTimeTracker.Request(timestamp, self.instance_count)
+        self._unhandled_unordered[key] = None
 
     def order(self, instId, key, timestamp):
         req = self._requests[key]
         tto = timestamp - req.timestamp
         req.order(instId)
+        if req.is_ordered:
+            self._forget_unordered(key)
         if req.is_ordered_by_all:
             del self._requests[key]
         return tto
 
     def handle(self, key):
         self._requests[key].handled = True
+        if key in self._unhandled_unordered:
+            del self._unhandled_unordered[key]
+            self._handled_unordered[key] = None
 
     def reset(self):
         self._requests.clear()
+        self._unhandled_unordered.clear()
+        self._handled_unordered.clear()
+
+    def started(self, key):
+        return self._requests[key].timestamp
+
+    def is_handled_unordered(self, key) -> bool:
+        return key in self._handled_unordered
 
     def unordered(self):
         return ((key, req.timestamp) for key, req in self._requests.items() if not req.is_ordered)
 
     def handled_unordered(self):
-        return ((key, req.timestamp) for key, req in self._requests.items()
-                if not req.is_ordered and req.is_handled)
+        return ((key, self._requests[key].timestamp)
+                for key in self._handled_unordered)
 
     def unhandled_unordered(self):
-        return ((key, req.timestamp) for key, req in self._requests.items()
-                if not req.is_ordered and not req.is_handled)
+        """
+        Yields requests in the order they started
+        """
+        return ((key, self._requests[key].timestamp)
+                for key in self._unhandled_unordered)
 
     def add_instance(self):
         self.instance_count += 1
@@ -176,6 +166,17 @@ class RequestTimeTracker:
         for req in reqs_to_del:
             del self._requests[req]
         self.instance_count -= 1
+        # Master could have been removed, so states of requests are found again
+        self._unhandled_unordered = OrderedDict(
+            (key, None) for key, req in self._requests.items()
+            if not req.is_ordered and not req.is_handled)
+        self._handled_unordered = OrderedDict(
+            (key, None) for key, req in self._requests.items()
+            if not req.is_ordered and req.is_handled)
+
+    def _forget_unordered(self, key):
+        self._unhandled_unordered.pop(key, None)
+        self._handled_unordered.pop(key, None)
 
 
 class Monitor(HasActionQueue, PluginLoaderHelper):
@@ -192,7 +193,9 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
                  blacklister: Blacklister, nodeInfo: Dict,
                  notifierEventTriggeringConfig: Dict,
                  pluginPaths: Iterable[str] = None,
-                 notifierEventsEnabled: bool = True):
+                 notifierEventsEnabled: bool = True,
+                 queueDepths: Callable[[], Dict[str, int]] = None,
+                 nodeMetrics: NodeMetrics = None):
         self.name = name
         self.instances = instances
         self.nodestack = nodestack
@@ -200,6 +203,9 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         self.nodeInfo = nodeInfo
         self.notifierEventTriggeringConfig = notifierEventTriggeringConfig
         self.notifierEventsEnabled = notifierEventsEnabled
+        # Returns numbers of messages and requests waiting in queues of the
+        # node, by queue name
+        self.queueDepths = queueDepths
 
         self.Delta = Delta
         self.Lambda = Lambda
@@ -209,15 +215,17 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
 
         self.config = getConfig()
 
+        # Throughputs and latencies measured here are kept in node metrics
+        self.nodeMetrics = nodeMetrics or NodeMetrics(self.config)
+
         # Number of ordered requests by each replica. The value at index `i` in
         # the list is a tuple of the number of ordered requests by replica and
         # the time taken to order those requests by the replica of the `i`th
         # protocol instance
         self.numOrderedRequests = []  # type: List[Tuple[int, int]]
-
-        # List of throughputs for replicas. Index is a instId and value is a instance of
-        # ThroughputMeasurement class and provide throughputs evaluating mechanism
-        self.throughputs = []   # type: List[ThroughputMeasurement]
+        # The least number of ordered requests by a replica and the number
+        # of replicas which ordered it
+        self._min_ordered = (0, 0)
 
         # Utility object for tracking requests order start and end
         # TODO: Has very similar cleanup logic to propagator.Requests
@@ -232,11 +240,6 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         # latencies was too high
         self.masterReqLatencyTooHigh = False
 
-        # Request latency(time taken to be ordered) for the client. The value
-        # at index `i` in the list is the LatencyMeasurement object which accumulate
-        # average latency and total request for each client.
-        self.clientAvgReqLatencies = []  # type: List[LatencyMeasurement]
-
         # TODO: Set this if this monitor belongs to a node which has primary
         # of master. Will be used to set `totalRequests`
         self.hasMasterPrimary = None
@@ -249,18 +252,19 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         # Times of requests ordered by master in last
         # `ThroughputWindowSize` seconds. `ThroughputWindowSize` is
         # defined in config
-        self.orderedRequestsInLast = []
+        self.orderedRequestsInLast = deque()
 
         # Times and latencies (as a tuple) of requests ordered by master in last
         # `LatencyWindowSize` seconds. `LatencyWindowSize` is
         # defined in config
-        self.latenciesByMasterInLast = []
+        self.latenciesByMasterInLast = LatencyWindow(
+            self.config.LatencyWindowSize)
 
         # Times and latencies (as a tuple) of requests ordered by backups in last
         # `LatencyWindowSize` seconds. `LatencyWindowSize` is
         # defined in config. Dictionary where key corresponds to instance id and
         #  value is a tuple of ordering time and latency of a request
-        self.latenciesByBackupsInLast = {}
+        self.latenciesByBackupsInLast = {}  # type: Dict[int, LatencyWindow]
 
         # attention: handlers will work over unordered request only once
         self.unordered_requests_handlers = []  # type: List[Callable]
@@ -289,6 +293,10 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
 
         self.startRepeating(self.check_unordered, self.config.UnorderedCheckFreq)
 
+        if self.queueDepths is not None:
+            self.startRepeating(self.sampleQueueDepths,
+                                self.config.METRICS_SAMPLING_FREQ)
+
         if 'disable_view_change' in self.config.unsafe:
             self.isMasterDegraded = lambda: False
         if 'disable_monitor' in self.config.unsafe:
@@ -299,6 +307,21 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
     def __repr__(self):
         return self.name
 
+    @property
+    def throughputs(self) -> List[ThroughputMeasurement]:
+        """
+        Throughputs of replicas, index is an instId
+        """
+        return self.nodeMetrics.throughputs
+
+    @property
+    def clientAvgReqLatencies(self) -> List[LatencyMeasurement]:
+        """
+        Request latencies (time taken to be ordered) for the clients, index
+        is an instId
+        """
+        return self.nodeMetrics.client_avg_latencies
+
     def metrics(self):
         """
         Calculate and return the metrics.
@@ -323,6 +346,8 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
             ("total requests", self.totalRequests),
             ("avg backup throughput", backupThrp),
             ("master throughput ratio", r)]
+        if self.queueDepths is not None:
+            m.append(("queue depths", self.queueDepths()))
         return m
 
     @property
@@ -346,18 +371,13 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         logger.debug("{}'s Monitor being reset".format(self))
         num_instances = len(self.instances.started)
         self.numOrderedRequests = [(0, 0)] * num_instances
+        self._update_min_ordered()
         self.requestTracker.reset()
         self.masterReqLatencies = {}
         self.masterReqLatencyTooHigh = False
         self.totalViewChanges += 1
         self.lastKnownTraffic = self.calculateTraffic()
-        for i in range(num_instances):
-            rm = ThroughputMeasurement(window_size=self.config.ThroughputInnerWindowSize,
-                                       min_cnt=self.config.ThroughputMinActivityThreshold,
-                                       first_ts=time.perf_counter())
-            self.throughputs[i] = rm
-            lm = LatencyMeasurement(min_latency_count=self.config.MIN_LATENCY_COUNT)
-            self.clientAvgReqLatencies[i] = lm
+        self.nodeMetrics.reset(num_instances)
 
     def addInstance(self):
         """
@@ -366,13 +386,8 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         self.instances.add()
         self.requestTracker.add_instance()
         self.numOrderedRequests.append((0, 0))
-        rm = ThroughputMeasurement(window_size=self.config.ThroughputInnerWindowSize,
-                                   min_cnt=self.config.ThroughputMinActivityThreshold,
-                                   first_ts=time.perf_counter())
-
-        self.throughputs.append(rm)
-        lm = LatencyMeasurement(min_latency_count=self.config.MIN_LATENCY_COUNT)
-        self.clientAvgReqLatencies.append(lm)
+        self._update_min_ordered()
+        self.nodeMetrics.add_instance()
 
     def removeInstance(self, index=None):
         if self.instances.count > 0:
@@ -381,8 +396,8 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
             self.instances.remove(index)
             self.requestTracker.remove_instance(index)
             del self.numOrderedRequests[index]
-            del self.clientAvgReqLatencies[index]
-            del self.throughputs[index]
+            self._update_min_ordered()
+            self.nodeMetrics.remove_instance(index)
 
     def requestOrdered(self, reqIdrs: List[Tuple[str, int]], instId: int,
                        requests, byMaster: bool = False) -> Dict:
@@ -398,26 +413,27 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
                 logger.debug("Got untracked ordered request with digest {}".
                              format(key))
                 continue
-            for reqId, started in self.requestTracker.handled_unordered():
-                if reqId == key:
-                    logger.info('Consensus for ReqId: {} was achieved by {}:{} in {} seconds.'
-                                .format(reqId, self.name, instId, now - started))
-                    continue
+            if self.requestTracker.is_handled_unordered(key):
+                logger.info('Consensus for ReqId: {} was achieved by {}:{} in {} seconds.'
+                            .format(key, self.name, instId,
+                                    now - self.requestTracker.started(key)))
             duration = self.requestTracker.order(instId, key, now)
-            self.throughputs[instId].add_request(now)
+            identifier = requests[key].request.identifier \
+                if key in requests else None
+            self.nodeMetrics.request_ordered(instId, identifier, duration,
+                                             now, byMaster)
             if byMaster:
                 # TODO for now, view_change procedure can take more that 15 minutes
                 # (5 minutes for catchup and 10 minutes for primary's answer).
                 # Therefore, view_change triggering by max latency is not indicative now.
                 # self.masterReqLatencies[key] = duration
                 self.orderedRequestsInLast.append(now)
-                self.latenciesByMasterInLast.append((now, duration))
+                self.latenciesByMasterInLast.add(now, duration)
             else:
-                self.latenciesByBackupsInLast.setdefault(instId, []).append((now, duration))
-
-            if key in requests:
-                identifier = requests[key].request.identifier
-                self.clientAvgReqLatencies[instId].add_duration(identifier, duration)
+                if instId not in self.latenciesByBackupsInLast:
+                    self.latenciesByBackupsInLast[instId] = LatencyWindow(
+                        self.config.LatencyWindowSize)
+                self.latenciesByBackupsInLast[instId].add(now, duration)
 
             durations[key] = duration
 
@@ -425,10 +441,18 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         orderedNow = len(durations)
         self.numOrderedRequests[instId] = (reqs + orderedNow,
                                            tm + sum(durations.values()))
-
-        # TODO: Inefficient, as on every request a minimum of a large list is
-        # calculated
-        if min(r[0] for r in self.numOrderedRequests) == (reqs + orderedNow):
+        if orderedNow:
+            if byMaster:
+                self.nodeMetrics.count(NodeMetrics.ORDERED_BATCHES, now=now)
+            self._trim_ordered_requests(now)
+            min_ordered, at_min = self._min_ordered
+            if reqs == min_ordered:
+                if at_min > 1:
+                    self._min_ordered = (min_ordered, at_min - 1)
+                else:
+                    self._update_min_ordered()
+
+        if self._min_ordered[0] == (reqs + orderedNow):
             # If these requests is ordered by the last instance then increment
             # total requests, but why is this important, why cant is ordering
             # by master not enough?
@@ -439,6 +463,20 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
 
         return durations
 
+    def _update_min_ordered(self):
+        counts = [r[0] for r in self.numOrderedRequests]
+        min_ordered = min(counts) if counts else 0
+        self._min_ordered = (min_ordered, counts.count(min_ordered))
+
+    def _trim_ordered_requests(self, now):
+        while self.orderedRequestsInLast and \
+                (now - self.orderedRequestsInLast[0]) > \
+                self.config.ThroughputWindowSize:
+            self.orderedRequestsInLast.popleft()
+
+    def sampleQueueDepths(self):
+        self.nodeMetrics.sample_queue_depths(self.queueDepths())
+
     def requestUnOrdered(self, key: str):
         """
         Record the time at which request ordering started.
@@ -447,8 +485,12 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
 
     def check_unordered(self):
         now = time.perf_counter()
-        new_unordereds = [(req, now - started) for req, started in self.requestTracker.unhandled_unordered()
-                          if now - started > self.config.UnorderedCheckFreq]
+        new_unordereds = []
+        for req, started in self.requestTracker.unhandled_unordered():
+            # Requests are in the order they started
+            if now - started <= self.config.UnorderedCheckFreq:
+                break
+            new_unordereds.append((req, now - started))
         if len(new_unordereds) == 0:
             return
         for handler in self.unordered_requests_handlers:
@@ -674,12 +716,7 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
     @property
     def highResThroughput(self):
         # TODO:KS Move these computations as well to plenum-stats project
-        now = time.perf_counter()
-        while self.orderedRequestsInLast and \
-                (now - self.orderedRequestsInLast[0]) > \
-                self.config.ThroughputWindowSize:
-            self.orderedRequestsInLast = self.orderedRequestsInLast[1:]
-
+        self._trim_ordered_requests(time.perf_counter())
         return len(self.orderedRequestsInLast) / self.config.ThroughputWindowSize
 
     def sendThroughput(self):
@@ -700,29 +737,13 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
 
     @property
     def masterLatency(self):
-        now = time.perf_counter()
-        while self.latenciesByMasterInLast and \
-                (now - self.latenciesByMasterInLast[0][0]) > \
-                self.config.LatencyWindowSize:
-            self.latenciesByMasterInLast = self.latenciesByMasterInLast[1:]
-        return (sum(l[1] for l in self.latenciesByMasterInLast) /
-                len(self.latenciesByMasterInLast)) if \
-            len(self.latenciesByMasterInLast) > 0 else 0
+        return self.latenciesByMasterInLast.avg(time.perf_counter())
 
     @property
     def avgBackupLatency(self):
         now = time.perf_counter()
-        backupLatencies = []
-        for instId, latencies in self.latenciesByBackupsInLast.items():
-            while latencies and \
-                    (now - latencies[0][0]) > \
-                    self.config.LatencyWindowSize:
-                latencies = latencies[1:]
-            backupLatencies.append(
-                (sum(l[1] for l in latencies) / len(latencies)) if
-                len(latencies) > 0 else 0)
-            self.latenciesByBackupsInLast[instId] = latencies
-
+        backupLatencies = [latencies.avg(now) for latencies
+                           in self.latenciesByBackupsInLast.values()]
         return self.mean(backupLatencies)
 
     def sendLatencies(self):
@@ -10,6 +10,8 @@ from typing import Dict, Any, Mapping, Iterable, List, Optional, Set, Tuple, Cal
 from intervaltree import IntervalTree
 
 from common.exceptions import LogicError
+from common.instrumentation import Instrumentation, InstrumentationExporter
+from common.serializers.serialization import serialize_msg_for_signing
 from crypto.bls.bls_key_manager import LoadBLSKeyError
 from plenum.server.inconsistency_watchers import NetworkInconsistencyWatcher
 from state.pruning_state import PruningState
@@ -71,6 +73,7 @@ from plenum.common.verifier import DidVerifier
 from plenum.common.config_helper import PNodeConfigHelper
 
 from plenum.persistence.req_id_to_txn import ReqIdrToTxn
+from plenum.persistence.role_index import RoleIndex
 from plenum.persistence.storage import Storage, initStorage
 from plenum.bls.bls_bft_factory import create_default_bls_bft_factory
 from plenum.bls.bls_crypto_factory import create_default_bls_crypto_factory
@@ -83,11 +86,14 @@ from plenum.server.action_req_handler import ActionReqHandler
 from plenum.server.blacklister import Blacklister
 from plenum.server.blacklister import SimpleBlacklister
 from plenum.server.client_authn import ClientAuthNr, SimpleAuthNr, CoreAuthNr
+from plenum.server.admission_control import AdmissionControl
+from plenum.server.client_sig_verifier import ClientSigVerifier
 from plenum.server.config_req_handler import ConfigReqHandler
 from plenum.server.domain_req_handler import DomainRequestHandler
 from plenum.server.has_action_queue import HasActionQueue
 from plenum.server.instances import Instances
 from plenum.server.message_req_processor import MessageReqProcessor
+from plenum.server.metrics import NodeMetrics
 from plenum.server.monitor import Monitor
 from plenum.server.notifier_plugin_manager import notifierPluginTriggerEvents, \
     PluginManager
@@ -126,6 +132,9 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
     # which those ledgers will be synced. Think carefully before changing the
     # order.
     ledger_ids = [POOL_LEDGER_ID, CONFIG_LEDGER_ID, DOMAIN_LEDGER_ID]
+    # Ids of ledgers whose transactions an overridden
+    # `update_txn_with_extra_data` adds data to, None for all ledgers
+    ledgers_with_extra_data = None
     _wallet_class = Wallet
 
     def __init__(self,
@@ -156,6 +165,13 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self.created = time.time()
         self.name = name
         self.config = config or getConfig()
+        # Each node has its own instrumentation, enabled before replicas,
+        # ledgers and stacks are created since they are instrumented on
+        # creation
+        self.instrumentation = Instrumentation()
+        if self.config.INSTRUMENTATION_ENABLED:
+            self.instrumentation.enable()
+        self._instrumentation_exporter = None
 
         self.config_helper = config_helper or PNodeConfigHelper(self.name, self.config)
 
@@ -192,6 +208,9 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         # Now it used in domainLedger
         self.stateTsDbStorage = None
 
+        # Number of NYM txns assigning each role, used in NYM validation
+        self.roleIndex = None
+
         self.register_state(DOMAIN_LEDGER_ID, self.loadDomainState())
 
         self.initPoolManager(ha, cliname, cliha)
@@ -206,6 +225,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self.initDomainState()
 
         self.clientAuthNr = clientAuthNr or self.defaultAuthNr()
+        self.subscribe_authnr_to_nym_changes()
+        self.clientSigVerifier = self._create_client_sig_verifier()
 
         self.addGenesisNyms()
 
@@ -237,7 +258,15 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
         HasActionQueue.__init__(self)
 
-        Propagator.__init__(self)
+        self.admission_control = AdmissionControl(
+            max_requests=self.config.ADMISSION_MAX_REQUESTS,
+            max_bytes=self.config.ADMISSION_MAX_REQUESTS_BYTES,
+            min_client_quota=self.config.ADMISSION_MIN_CLIENT_QUOTA)
+
+        # Requests the node stops keeping without replying to them are
+        # released by admission control as well
+        Propagator.__init__(
+            self, on_request_removed=self.admission_control.release)
 
         MessageReqProcessor.__init__(self)
 
@@ -269,6 +298,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
         self.instances = Instances()
         # QUESTION: Why does the monitor need blacklister?
+        self.metrics = NodeMetrics(self.config)
         self.monitor = Monitor(self.name,
                                Delta=self.config.DELTA,
                                Lambda=self.config.LAMBDA,
@@ -279,7 +309,9 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                                nodeInfo=self.nodeInfo,
                                notifierEventTriggeringConfig=self.config.notifierEventTriggeringConfig,
                                pluginPaths=pluginPaths,
-                               notifierEventsEnabled=self.config.SpikeEventsEnabled)
+                               notifierEventsEnabled=self.config.SpikeEventsEnabled,
+                               queueDepths=self.queue_depths,
+                               nodeMetrics=self.metrics)
 
         self.replicas = self.create_replicas()
 
@@ -300,6 +332,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
         # do it after all states and BLS stores are created
         self.adjustReplicas()
+        self._instrument_prod()
 
         self.perfCheckFreq = self.config.PerfCheckFreq
         self.nodeRequestSpikeMonitorData = {
@@ -456,7 +489,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             self.configLedger,
             preCatchupStartClbk=self.preConfigLedgerCatchup,
             postCatchupCompleteClbk=self.postConfigLedgerCaughtUp,
-            postTxnAddedToLedgerClbk=self.postTxnFromCatchupAddedToLedger)
+            postTxnAddedToLedgerClbk=self.postTxnFromCatchupAddedToLedger,
+            postTxnsAddedToLedgerClbk=self.postTxnsFromCatchupAddedToLedger)
         self.on_new_ledger_added(CONFIG_LEDGER_ID)
 
     def setup_config_req_handler(self):
@@ -479,7 +513,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                 self.config.configStateStorage,
                 self.dataLocation,
                 self.config.configStateDbName,
-                db_config=self.config.db_state_config)
+                db_config=self.config.db_state_config),
+            node_cache_size=self.config.stateNodeCacheSize
         )
 
     def initConfigState(self):
@@ -643,7 +678,18 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                                     self.config,
                                     self.reqProcessors,
                                     self.bls_bft.bls_store,
-                                    self.getStateTsDbStorage())
+                                    self.getStateTsDbStorage(),
+                                    self.getRoleIndex())
+
+    def getRoleIndex(self):
+        if self.roleIndex is None:
+            self.roleIndex = RoleIndex(
+                initKeyValueStorage(self.config.roleIndexStorage,
+                                    self.dataLocation,
+                                    self.config.roleIndexDbName,
+                                    db_config=self.config.db_role_index_config)
+            )
+        return self.roleIndex
 
     def getStateTsDbStorage(self):
         if self.stateTsDbStorage is None:
@@ -775,7 +821,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                 self.poolLedger,
                 preCatchupStartClbk=self.prePoolLedgerCatchup,
                 postCatchupCompleteClbk=self.postPoolLedgerCaughtUp,
-                postTxnAddedToLedgerClbk=self.postTxnFromCatchupAddedToLedger)
+                postTxnAddedToLedgerClbk=self.postTxnFromCatchupAddedToLedger,
+                postTxnsAddedToLedgerClbk=self.postTxnsFromCatchupAddedToLedger)
             self.on_new_ledger_added(POOL_LEDGER_ID)
 
     def _add_domain_ledger(self):
@@ -784,7 +831,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             self.domainLedger,
             preCatchupStartClbk=self.preDomainLedgerCatchup,
             postCatchupCompleteClbk=self.postDomainLedgerCaughtUp,
-            postTxnAddedToLedgerClbk=self.postTxnFromCatchupAddedToLedger)
+            postTxnAddedToLedgerClbk=self.postTxnFromCatchupAddedToLedger,
+            postTxnsAddedToLedgerClbk=self.postTxnsFromCatchupAddedToLedger)
         self.on_new_ledger_added(DOMAIN_LEDGER_ID)
 
     def getHashStore(self, name) -> HashStore:
@@ -807,10 +855,12 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self._add_domain_ledger()
 
     def on_new_ledger_added(self, ledger_id):
+        self._instrument(self.getLedger(ledger_id))
         # If a ledger was added after a replicas were created
         self.replicas.register_new_ledger(ledger_id)
 
     def register_state(self, ledger_id, state):
+        self._instrument(state)
         self.states[ledger_id] = state
 
     def register_req_handler(self, req_handler: RequestHandler,
@@ -851,7 +901,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                 self.config.domainStateStorage,
                 self.dataLocation,
                 self.config.domainStateDbName,
-                db_config=self.config.db_state_config)
+                db_config=self.config.db_state_config),
+            node_cache_size=self.config.stateNodeCacheSize
         )
 
     def _create_bls_bft(self):
@@ -918,6 +969,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
             self.nodestack.start()
             self.clientstack.start()
+            self._start_instrumentation_exporter()
 
             self.view_changer = self.newViewChanger()
             self.elector = self.newPrimaryDecider()
@@ -1012,8 +1064,15 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             except Exception as ex:
                 logger.exception('{} got exception while stopping ledger: {}'.format(self, ex))
 
+        self.replicas.stop()
         self.nodestack.stop()
         self.clientstack.stop()
+        if self.clientSigVerifier is not None:
+            self.clientSigVerifier.stop()
+        if self._instrumentation_exporter is not None:
+            self._instrumentation_exporter.stop()
+            self._instrumentation_exporter = None
+        self.instrumentation.disable()
 
         self.closeAllKVStores()
 
@@ -1033,6 +1092,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             self.bls_bft.bls_store.close()
         if self.stateTsDbStorage:
             self.stateTsDbStorage.close()
+        if self.roleIndex:
+            self.roleIndex.close()
 
     def reset(self):
         logger.info("{} reseting...".format(self), extra={"cli": False})
@@ -1044,8 +1105,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self.nodestack.conns.clear()
         # TODO: Should `self.clientstack.conns` be cleared too
         # self.clientstack.conns.clear()
-        self.aqStash.clear()
-        self.actionQueue.clear()
+        self._clear_actions()
         self.elector = None
         self.view_changer = None
 
@@ -1110,6 +1170,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         if self.view_changer.view_change_in_progress:
             return 0
         c = await self.clientstack.service(limit)
+        if self.clientSigVerifier is not None:
+            self.clientSigVerifier.process()
         await self.processClientInBox()
         return c
 
@@ -1667,18 +1729,48 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         :param wrappedMsg: a message from a client
         """
         try:
-            vmsg = self.validateClientMsg(wrappedMsg)
-            if vmsg:
-                self.unpackClientMsg(*vmsg)
+            if self.clientSigVerifier is not None:
+                # Signature is verified later along with signatures of
+                # other messages received in the same pass
+                vmsg = self.prepareClientMsg(wrappedMsg)
+                if vmsg:
+                    self.clientSigVerifier.add(*vmsg)
+            else:
+                vmsg = self.validateClientMsg(wrappedMsg)
+                if vmsg:
+                    self.unpackClientMsg(*vmsg)
         except BlowUp:
             raise
         except Exception as ex:
-            msg, frm = wrappedMsg
-            friendly = friendlyEx(ex)
-            if isinstance(ex, SuspiciousClient):
-                self.reportSuspiciousClient(frm, friendly)
+            self.handleClientMsgError(ex, wrappedMsg)
 
-            self.handleInvalidClientMsg(ex, wrappedMsg)
+    def handleVerifiedClientMsg(self, cMsg, frm):
+        """
+        Process a client message whose signature was verified by
+        `clientSigVerifier`
+        """
+        try:
+            if isinstance(cMsg, Request):
+                logger.debug("{} authenticated {} signature on request {}".
+                             format(self, cMsg.all_identifiers, cMsg.reqId),
+                             extra={"cli": True,
+                                    "tags": ["node-msg-processing"]})
+            self.execute_hook(NodeHooks.POST_SIG_VERIFICATION, cMsg)
+            logger.trace("{} received CLIENT message: {}".
+                         format(self.clientstack.name, cMsg))
+            self.unpackClientMsg(cMsg, frm)
+        except BlowUp:
+            raise
+        except Exception as ex:
+            self.handleClientMsgError(ex, (cMsg, frm))
+
+    def handleClientMsgError(self, ex, wrappedMsg):
+        msg, frm = wrappedMsg
+        friendly = friendlyEx(ex)
+        if isinstance(ex, SuspiciousClient):
+            self.reportSuspiciousClient(frm, friendly)
+
+        self.handleInvalidClientMsg(ex, wrappedMsg)
 
     def handleInvalidClientMsg(self, ex, wrappedMsg):
         msg, frm = wrappedMsg
@@ -1723,6 +1815,30 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         :param wrappedMsg: a message from a client
         :return: Tuple of clientMessage and client address
         """
+        vmsg = self.prepareClientMsg(wrappedMsg)
+        if vmsg is None:
+            return None
+        cMsg, frm = vmsg
+        self.verifySignature(cMsg)
+        self.execute_hook(NodeHooks.POST_SIG_VERIFICATION, cMsg)
+        # Suspicions should only be raised when lot of sig failures are
+        # observed
+        # try:
+        #     self.verifySignature(cMsg)
+        # except UnknownIdentifier as ex:
+        #     raise
+        # except Exception as ex:
+        #     raise SuspiciousClient from ex
+        logger.trace("{} received CLIENT message: {}".
+                     format(self.clientstack.name, cMsg))
+        return cMsg, frm
+
+    def prepareClientMsg(self, wrappedMsg):
+        """
+        Validate a message sent by a client, except for its signature.
+        :param wrappedMsg: a message from a client
+        :return: Tuple of clientMessage and client address
+        """
         msg, frm = wrappedMsg
         if self.isClientBlacklisted(frm):
             self.discard(msg[:256], "received from blacklisted client {}".format(frm), logger.display)
@@ -1753,20 +1869,13 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
         if needStaticValidation:
             self.doStaticValidation(cMsg)
+            # Requests are rejected before verifying their signatures if the
+            # node is overloaded, their size is checked once they are verified
+            if self._is_write_request(cMsg) and \
+                    self._reject_if_overloaded(cMsg, frm, new_only=True):
+                return None
 
         self.execute_hook(NodeHooks.PRE_SIG_VERIFICATION, cMsg)
-        self.verifySignature(cMsg)
-        self.execute_hook(NodeHooks.POST_SIG_VERIFICATION, cMsg)
-        # Suspicions should only be raised when lot of sig failures are
-        # observed
-        # try:
-        #     self.verifySignature(cMsg)
-        # except UnknownIdentifier as ex:
-        #     raise
-        # except Exception as ex:
-        #     raise SuspiciousClient from ex
-        logger.trace("{} received CLIENT message: {}".
-                     format(self.clientstack.name, cMsg))
         return cMsg, frm
 
     def unpackClientMsg(self, msg, frm):
@@ -1865,21 +1974,46 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self._update_txn_seq_range_to_3phase_after_catchup(ledger_id, last_caughtup_3pc)
 
     def postTxnFromCatchupAddedToLedger(self, ledger_id: int, txn: Any):
-        rh = self.postRecvTxnFromCatchup(ledger_id, txn)
-        if rh:
-            rh.updateState([txn], isCommitted=True)
-            state = self.getState(ledger_id)
-            state.commit(rootHash=state.headHash)
-            if ledger_id == DOMAIN_LEDGER_ID and rh.ts_store:
-                rh.ts_store.set(get_txn_time(txn),
-                                state.headHash)
-        self.updateSeqNoMap([txn], ledger_id)
-        self._clear_req_key_for_txn(ledger_id, txn)
+        self.postTxnsFromCatchupAddedToLedger(ledger_id, [txn])
+
+    def postTxnsFromCatchupAddedToLedger(self, ledger_id: int, txns: List):
+        """
+        Apply transactions added to the ledger during catchup to the state.
+        The state is committed after each transaction but is written to the
+        storage once for all of them, as are the state timestamps. A rebuild
+        checkpoint is written before applying them, so if the node stops
+        meanwhile, the state is recreated from the ledger on the next start.
+        """
+        self.metrics.count(NodeMetrics.CATCHUP_TXNS, len(txns))
+        rh = self.get_req_handler(ledger_id)
+        state = self.getState(ledger_id) if rh else None
+        # The transactions are the last ones in the ledger
+        last_seq_no = self.getLedger(ledger_id).size
+        if state is not None:
+            state.set_rebuild_checkpoint(last_seq_no - len(txns))
+        timestamps = []
+        for txn in txns:
+            self.postRecvTxnFromCatchup(ledger_id, txn)
+            if state is not None:
+                rh.updateState([txn], isCommitted=True)
+                state.commit(rootHash=state.headHash, flush=False)
+                if ledger_id == DOMAIN_LEDGER_ID and rh.ts_store:
+                    timestamps.append((get_txn_time(txn), state.headHash))
+        if state is not None:
+            if timestamps:
+                rh.ts_store.set_batch(timestamps)
+            state.commit_rebuilt(last_seq_no)
+            state.finish_rebuild()
+        self.updateSeqNoMap(txns, ledger_id)
+        for txn in txns:
+            self._clear_req_key_for_txn(ledger_id, txn)
 
     def _clear_req_key_for_txn(self, ledger_id, txn):
         req_key = get_digest(txn)
         if req_key is not None:
             self.master_replica.discard_req_key(ledger_id, req_key)
+            # The request is not replied to by this node
+            self.admission_control.release(req_key)
 
     def postRecvTxnFromCatchup(self, ledgerId: int, txn: Any):
         if ledgerId == POOL_LEDGER_ID:
@@ -2181,6 +2315,11 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
             # If the node is not already processing the request
             if not self.isProcessingReq(request.key):
+                if request.key not in self.requests:
+                    size = self._request_size(request)
+                    if self._reject_if_overloaded(request, frm, size):
+                        return
+                    self.admission_control.admit(request.key, frm, size)
                 self.startedProcessingReq(request.key, frm)
                 # forced request should be processed before consensus
                 self.handle_request_if_forced(request)
@@ -2249,7 +2388,10 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                      format(self.name, msg))
 
         reqDict = msg.request
-        request = self.client_request_class(**reqDict)
+        # PROPAGATEs of a request already received from other nodes reuse
+        # the stored request instead of creating it and its digest again
+        request = self.requests.stored_request(reqDict) or \
+            self.client_request_class(**reqDict)
 
         clientName = msg.senderClient
 
@@ -2285,6 +2427,56 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
     def doneProcessingReq(self, key):
         self.requestSender.pop(key)
+        self.admission_control.release(key)
+
+    def _is_write_request(self, request: Request) -> bool:
+        txn_type = request.operation.get(TXN_TYPE)
+        return txn_type != GET_TXN and not self.is_action(txn_type) and \
+            not self.is_query(txn_type) and self.can_write_txn(txn_type)
+
+    def _request_size(self, request: Request) -> int:
+        if not self.admission_control.max_bytes:
+            return 0
+        return len(serialize_msg_for_signing(request.as_dict))
+
+    def _reject_if_overloaded(self, request: Request, frm, size=0,
+                              new_only=False) -> bool:
+        """
+        Sends REQNACK to the client if a new request can not be admitted
+
+        :param new_only: do not reject the request if the node already has
+            it; checked only when the request can not be admitted, since it
+            needs the digest of the request
+        """
+        reason = self.admission_control.check(frm, size)
+        if reason is None:
+            return False
+        if new_only and (self.isProcessingReq(request.key) or
+                         request.key in self.requests):
+            return False
+        self.admission_control.reject()
+        logger.debug("{} rejecting request {} from {} since {}".
+                     format(self, request.key, frm, reason))
+        self.send_nack_to_client(
+            (request.identifier, request.reqId),
+            'node is overloaded: {}, try again later'.format(reason), frm)
+        return True
+
+    def queue_depths(self) -> Dict[str, int]:
+        """
+        Numbers of messages and requests waiting in queues of the node
+        """
+        depths = {
+            'client_inbox': len(self.clientInBox),
+            'node_inbox': len(self.nodeInBox),
+            'requests': len(self.requests),
+            'action_queue': self.pending_actions_count,
+            'replica_request_queues': sum(
+                len(q) for r in self.replicas
+                for q in getattr(r, 'requestQueues', {}).values()),
+        }
+        depths.update(self.admission_control.stats())
+        return depths
 
     def is_sender_known_for_req(self, key):
         return self.requestSender.get(key) is not None
@@ -2644,7 +2836,15 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         if not isinstance(req, Mapping):
             req = msg.as_dict
 
-        identifiers = self.authNr(req).authenticate(req)
+        authnr = self.authNr(req)
+        identifiers = authnr.authenticate(req)
+        if isinstance(authnr, ReqAuthenticator) and \
+                authnr.verification_deferred:
+            # Logged by `handleVerifiedClientMsg` once the checks are done
+            logger.trace("{} queued {} signature on {} request {} for "
+                         "verification".format(self, identifiers, typ,
+                                               req['reqId']))
+            return
         logger.debug("{} authenticated {} signature on {} request {}".
                      format(self, identifiers, typ, req['reqId']),
                      extra={"cli": True,
@@ -2806,21 +3006,29 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             logger.debug('{} did not know how to handle for ledger {}'.format(self, ledger_id))
         self.execute_hook(NodeHooks.POST_BATCH_CREATED, ledger_id, state_root)
 
-    def onBatchRejected(self, ledger_id):
+    def onBatchRejected(self, ledger_id, batch_created=True):
         """
         A batch of requests has been rejected, if stateRoot is None, reject
         the current batch.
         :param ledger_id:
-        :param stateRoot: state root after the batch was created
+        :param batch_created: False if requests of the batch were applied
+        but the batch was not created, i.e. `onBatchCreated` was not called
+        for it, so the last created batch must be kept
         :return:
         """
+        handler = None
         if ledger_id == POOL_LEDGER_ID:
             if isinstance(self.poolManager, TxnPoolManager):
-                self.get_req_handler(POOL_LEDGER_ID).onBatchRejected()
+                handler = self.get_req_handler(POOL_LEDGER_ID)
         elif self.get_req_handler(ledger_id):
-            self.get_req_handler(ledger_id).onBatchRejected()
+            handler = self.get_req_handler(ledger_id)
         else:
             logger.debug('{} did not know how to handle for ledger {}'.format(self, ledger_id))
+        if handler is not None:
+            if batch_created:
+                handler.onBatchRejected()
+            else:
+                handler.onBatchDiscarded()
         self.execute_hook(NodeHooks.POST_BATCH_REJECTED, ledger_id)
 
     def sendRepliesToClients(self, committedTxns, ppTime):
@@ -2866,15 +3074,40 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
     def initStateFromLedger(self, state: State, ledger: Ledger, reqHandler):
         """
         If the trie is empty then initialize it by applying
-        txns from ledger.
-        """
-        if state.isEmpty:
+        txns from ledger. The state is written once per
+        STATE_REBUILD_CHUNK_SIZE txns along with a checkpoint, so
+        if the node stops before the state is recreated, it
+        continues from the checkpoint on the next start.
+        """
+        checkpoint = state.rebuild_checkpoint
+        if checkpoint is not None:
+            logger.info('{} continues recreating state from ledger after '
+                        'txn {}'.format(self, checkpoint))
+        elif state.isEmpty:
             logger.info('{} found state to be empty, recreating from '
                         'ledger'.format(self))
-            for seq_no, txn in ledger.getAllTxn():
+            checkpoint = 0
+        else:
+            return
+
+        chunk_size = self.config.STATE_REBUILD_CHUNK_SIZE
+        seq_no = checkpoint
+        if checkpoint < ledger.size:
+            for seq_no, txn in ledger.getAllTxn(checkpoint + 1):
                 txn = self.update_txn_with_extra_data(txn)
                 reqHandler.updateState([txn, ], isCommitted=True)
-                state.commit(rootHash=state.headHash)
+                # Committed in memory since applying the next txns
+                # can read the committed state
+                state.commit(rootHash=state.headHash, flush=False)
+                if seq_no % chunk_size == 0:
+                    state.commit_rebuilt(seq_no)
+                    logger.info('{} recreated state from {} of {} txns of '
+                                'ledger'.format(self, seq_no, ledger.size))
+        if seq_no > checkpoint:
+            state.commit_rebuilt(seq_no)
+            logger.info('{} recreated state from {} txns of ledger'.
+                        format(self, seq_no))
+        state.finish_rebuild()
 
     def initDomainState(self):
         self.initStateFromLedger(self.states[DOMAIN_LEDGER_ID],
@@ -2886,6 +3119,76 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             if get_type(txn) == NYM:
                 self.addNewRole(txn)
 
+    def subscribe_authnr_to_nym_changes(self):
+        # Verkeys cached by the core authenticator must follow the state
+        core_authnr = self.clientAuthNr.core_authenticator
+        if isinstance(core_authnr, SimpleAuthNr):
+            self.get_req_handler(DOMAIN_LEDGER_ID).subscribe_to_nym_changes(
+                core_authnr.on_verkey_changed)
+
+    def _create_client_sig_verifier(self):
+        processes = self.config.CLIENT_SIG_VERIFICATION_PROCESSES
+        workers = processes or self.config.CLIENT_SIG_VERIFICATION_WORKERS
+        if not workers or not isinstance(self.clientAuthNr, ReqAuthenticator):
+            return None
+        return ClientSigVerifier(self.clientAuthNr,
+                                 verify_signature=self.verifySignature,
+                                 on_verified=self.handleVerifiedClientMsg,
+                                 on_invalid=self.handleClientMsgError,
+                                 workers=workers,
+                                 use_processes=bool(processes))
+
+    def _instrument_prod(self):
+        """
+        Measures the steps of `prod` if instrumentation is enabled, the
+        steps are left untouched otherwise
+        """
+        if not self.instrumentation.enabled:
+            return
+        self.serviceReplicas = self.instrumentation.timed(
+            'node_service_replicas', self.serviceReplicas)
+        self.serviceNodeMsgs = self.instrumentation.timed(
+            'node_service_node_msgs', self.serviceNodeMsgs)
+        self.serviceClientMsgs = self.instrumentation.timed(
+            'node_service_client_msgs', self.serviceClientMsgs)
+        self.nodestack.flushOutBoxes = self.instrumentation.timed(
+            'node_flush_out_boxes', self.nodestack.flushOutBoxes)
+        self._instrument(self.nodestack)
+        self._instrument(self.clientstack)
+
+    def _instrument(self, obj):
+        """
+        Let a ledger, state or stack of the node update the metrics of the
+        node's instrumentation
+        """
+        if self.instrumentation.enabled:
+            obj.instrumentation = self.instrumentation
+
+    def _start_instrumentation_exporter(self):
+        if self.config.INSTRUMENTATION_ENABLED:
+            # It is disabled when the node stops
+            self.instrumentation.enable()
+        if not self.instrumentation.enabled or \
+                self._instrumentation_exporter is not None:
+            return
+        if self.config.INSTRUMENTATION_UNIX_SOCKET:
+            address = self.config.INSTRUMENTATION_UNIX_SOCKET
+        elif self.config.INSTRUMENTATION_PORT:
+            address = (self.config.INSTRUMENTATION_HOST,
+                       self.config.INSTRUMENTATION_PORT)
+        else:
+            return
+        try:
+            self._instrumentation_exporter = InstrumentationExporter(
+                address, self.instrumentation)
+        except OSError as ex:
+            logger.warning('{} could not serve instrumentation metrics on {}: '
+                           '{}'.format(self, address, ex))
+            return
+        self._instrumentation_exporter.start()
+        logger.info('{} serves instrumentation metrics on {}'.
+                    format(self, address))
+
     def init_core_authenticator(self):
         state = self.getState(DOMAIN_LEDGER_ID)
         return CoreAuthNr(state=state)
@@ -3104,6 +3407,21 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         # All the data of any transaction is stored in the ledger
         return txn
 
+    def has_txns_with_extra_data(self, ledger_id) -> bool:
+        """
+        Whether transactions of the ledger can have extra data added by
+        `update_txn_with_extra_data`, if not they can be sent to other nodes
+        as they are stored in the ledger. Subclasses adding extra data to
+        some ledgers only list them in `ledgers_with_extra_data`.
+        :param ledger_id:
+        :return:
+        """
+        if type(self).update_txn_with_extra_data is \
+                Node.update_txn_with_extra_data:
+            return False
+        return self.ledgers_with_extra_data is None or \
+            ledger_id in self.ledgers_with_extra_data
+
     def transform_txn_for_ledger(self, txn):
         txn_type = get_type(txn)
         return self.get_req_handler(txn_type=txn_type).\
@@ -3125,6 +3443,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             "--------------------------------------------------------",
             "node inbox size         : {}".format(len(self.nodeInBox)),
             "client inbox size       : {}".format(len(self.clientInBox)),
+            "admitted requests       : {}".format(
+                self.admission_control.requests_count),
             "age (seconds)           : {}".format(time.time() - self.created),
             "next check for reconnect: {}".format(time.perf_counter() -
                                                   self.nodestack.nextCheck),
@@ -3140,6 +3460,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                                                      id(self.actionQueue)),
             "action queue stash      : {} {}".format(len(self.aqStash),
                                                      id(self.aqStash)),
+            "pending actions         : {}".format(self.pending_actions_count),
         ]
 
         logger.info("\n".join(lines), extra={"cli": False})
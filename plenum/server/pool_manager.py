@@ -140,7 +140,8 @@ class TxnPoolManager(PoolManager, TxnStackManager):
                 self.config.poolStateStorage,
                 self.node.dataLocation,
                 self.config.poolStateDbName,
-                db_config=self.config.db_state_config)
+                db_config=self.config.db_state_config),
+            node_cache_size=self.config.stateNodeCacheSize
         )
 
     def initPoolState(self):
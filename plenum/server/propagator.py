@@ -1,6 +1,6 @@
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict
 
-from typing import Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 from orderedset import OrderedSet
 from plenum.common.constants import PROPAGATE, THREE_PC_PREFIX
@@ -13,30 +13,85 @@ from stp_core.common.log import getlogger
 logger = getlogger()
 
 
+class NodeIndices:
+    """
+    Indices of node names used as positions of bits in `Votes`, assigned
+    in the order the names are seen
+    """
+
+    def __init__(self):
+        self.indices = {}
+        self.names = []
+        # bits of names which are `str`, see `ReqState.req_with_acceptable_quorum`
+        self.str_names_mask = 0
+
+    def index(self, name) -> int:
+        idx = self.indices.get(name)
+        if idx is None:
+            idx = self.indices[name] = len(self.names)
+            self.names.append(name)
+            if isinstance(name, str):
+                self.str_names_mask |= 1 << idx
+        return idx
+
+
+class Votes:
+    """
+    Set of names of nodes stored as a bitset over their indices
+    """
+
+    __slots__ = ('_node_indices', 'bits')
+
+    def __init__(self, node_indices: NodeIndices):
+        self._node_indices = node_indices
+        self.bits = 0
+
+    def add(self, name):
+        self.bits |= 1 << self._node_indices.index(name)
+
+    def count(self, mask: int = -1) -> int:
+        return bin(self.bits & mask).count('1')
+
+    def __contains__(self, name):
+        idx = self._node_indices.indices.get(name)
+        return idx is not None and bool(self.bits >> idx & 1)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        names = self._node_indices.names
+        return (names[i] for i in range(self.bits.bit_length())
+                if self.bits >> i & 1)
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, list(self))
+
+
 class ReqState:
     """
     Object to store the state of the request.
     """
 
-    def __init__(self, request: Request):
+    def __init__(self, request: Request, node_indices: NodeIndices = None):
         self.request = request
         self.forwarded = False
         # forwardedTo helps in finding to how many replicas has this request
         # been forwarded to, helps in garbage collection
         self.forwardedTo = 0
-        self.propagates = {}
+        # names of nodes which sent PROPAGATEs, the request is the same for
+        # all of them since it is stored by its digest
+        self.propagates = Votes(node_indices or NodeIndices())
         self.finalised = None
         self.executed = False
 
     def req_with_acceptable_quorum(self, quorum: Quorum):
-        digests = defaultdict(set)
         # this is workaround because we are getting a propagate from
         # somebody with non-str (byte) name
-        for sender, req in filter(lambda x: isinstance(
-                x[0], str), self.propagates.items()):
-            digests[req.digest].add(sender)
-            if quorum.is_reached(len(digests[req.digest])):
-                return req
+        votes = self.propagates.count(
+            self.propagates._node_indices.str_names_mask)
+        if quorum.is_reached(votes):
+            return self.request
 
     def set_finalised(self, req):
         # TODO: make it much explicitly and simpler
@@ -56,15 +111,43 @@ class Requests(OrderedDict):
     request is popped out
     """
 
+    def __init__(self, on_removed: Optional[Callable[[str], None]] = None):
+        """
+        :param on_removed: called with the key of each request removed once
+            it is executed and freed
+        """
+        super().__init__()
+        self._node_indices = NodeIndices()
+        self._on_removed = on_removed
+        # keys of stored requests by their identifier and request id, used
+        # to find a stored request equal to a propagated one without
+        # creating a request object and computing its digest
+        self._keys_by_req_id = {}
+
     def add(self, req: Request):
         """
         Add the specified request to this request store.
         """
         key = req.key
         if key not in self:
-            self[key] = ReqState(req)
+            self[key] = ReqState(req, self._node_indices)
+            self._keys_by_req_id[self._req_id_of(req.as_dict)] = key
         return self[key]
 
+    def stored_request(self, req_dict: dict):
+        """
+        Returns the stored request if it is the same as the given request
+        received as a dict, otherwise None
+        """
+        key = self._keys_by_req_id.get(self._req_id_of(req_dict))
+        state = self.get(key) if key is not None else None
+        if state is not None and state.request.as_dict == req_dict:
+            return state.request
+
+    @staticmethod
+    def _req_id_of(req_dict: dict):
+        return req_dict.get(f.IDENTIFIER.nm), req_dict.get(f.REQ_ID.nm)
+
     def forwarded(self, req: Request) -> bool:
         """
         Returns whether the request has been forwarded or not
@@ -91,7 +174,7 @@ class Requests(OrderedDict):
         :param sender: the name of the node sending the msg
         """
         data = self.add(req)
-        data.propagates[sender] = req
+        data.propagates.add(sender)
 
     def votes(self, req) -> int:
         """
@@ -138,7 +221,13 @@ class Requests(OrderedDict):
 
     def _clean(self, state):
         if state.executed and state.forwardedTo <= 0:
-            self.pop(state.request.key, None)
+            key = state.request.key
+            self.pop(key, None)
+            req_id = self._req_id_of(state.request.as_dict)
+            if self._keys_by_req_id.get(req_id) == key:
+                del self._keys_by_req_id[req_id]
+            if self._on_removed is not None:
+                self._on_removed(key)
 
     def has_propagated(self, req: Request, sender: str) -> bool:
         """
@@ -157,8 +246,8 @@ class Requests(OrderedDict):
 class Propagator:
     MAX_REQUESTED_KEYS_TO_KEEP = 1000
 
-    def __init__(self):
-        self.requests = Requests()
+    def __init__(self, on_request_removed=None):
+        self.requests = Requests(on_removed=on_request_removed)
         self.requested_propagates_for = OrderedSet()
 
     # noinspection PyUnresolvedReferences
@@ -2,7 +2,8 @@ import time
 from collections import deque, OrderedDict
 from enum import unique, IntEnum
 from hashlib import sha256
-from typing import List, Dict, Optional, Any, Set, Tuple, Callable
+from typing import List, Dict, Optional, Any, Set, Tuple, Callable, \
+    TYPE_CHECKING
 
 import math
 
@@ -29,13 +30,17 @@ from plenum.common.util import updateNamedTuple, compare_3PC_keys, max_3PC_key,
     mostCommonElement, SortedDict, firstKey
 from plenum.config import CHK_FREQ
 from plenum.server.has_action_queue import HasActionQueue
+from plenum.server.metrics import NodeMetrics
 from plenum.server.models import Commits, Prepares
 from plenum.server.router import Router
 from plenum.server.suspicion_codes import Suspicions
 from sortedcontainers import SortedList
 from stp_core.common.log import getlogger
 
-import plenum.server.node
+if TYPE_CHECKING:
+    # The node module imports this one, so it is imported for type hints
+    # only to let replica processes import replicas on their own
+    import plenum.server.node
 
 LOG_TAGS = {
     'PREPREPARE': {"tags": ["node-preprepare"]},
@@ -131,16 +136,30 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
             (ThreePCState, self.process3PhaseState),
         )
 
+        # Stand-ins for the node may have no instrumentation
+        instrumentation = getattr(node, 'instrumentation', None)
+        process_pre_prepare = self.processPrePrepare
+        process_prepare = self.processPrepare
+        process_commit = self.processCommit
+        if instrumentation is not None:
+            process_pre_prepare = instrumentation.timed(
+                'replica_process_preprepare', process_pre_prepare)
+            process_prepare = instrumentation.timed(
+                'replica_process_prepare', process_prepare)
+            process_commit = instrumentation.timed(
+                'replica_process_commit', process_commit)
         self.threePhaseRouter = Replica3PRouter(
             self,
-            (PrePrepare, self.processPrePrepare),
-            (Prepare, self.processPrepare),
-            (Commit, self.processCommit)
+            (PrePrepare, process_pre_prepare),
+            (Prepare, process_prepare),
+            (Commit, process_commit)
         )
 
         self.node = node
         self.instId = instId
         self.name = self.generateName(node.name, self.instId)
+        # Metrics of the node latencies of 3PC phases are recorded to
+        self._metrics = getattr(node, 'metrics', None)
         self.logger = getlogger(self.name)
 
         self.outBox = deque()
@@ -217,6 +236,10 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
         self.prePrepares = SortedDict(lambda k: (k[0], k[1]))
         # type: Dict[Tuple[int, int], PrePrepare]
 
+        # Times batches entered their current 3PC phase by 3PC key, kept by
+        # master only
+        self._3pc_phase_started = {}  # type: Dict[Tuple[int, int], float]
+
         # Dictionary of received Prepare requests. Key of dictionary is a 2
         # element tuple with elements viewNo, seqNo and value is a 2 element
         # tuple containing request digest and set of sender node names(sender
@@ -827,6 +850,7 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
 
     def sendPrePrepare(self, ppReq: PrePrepare):
         self.sentPrePrepares[ppReq.viewNo, ppReq.ppSeqNo] = ppReq
+        self._start_3pc_phase((ppReq.viewNo, ppReq.ppSeqNo))
         self.send(ppReq, TPCStat.PrePrepareSent)
 
     def readyFor3PC(self, key: ReqKey):
@@ -1139,6 +1163,7 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
         """
         key_3pc = (p.viewNo, p.ppSeqNo)
         self.logger.debug("{} Sending COMMIT{} at {}".format(self, key_3pc, time.perf_counter()))
+        self._complete_3pc_phase(key_3pc, NodeMetrics.PREPARE_PHASE)
 
         params = [
             self.instId, p.viewNo, p.ppSeqNo
@@ -1197,16 +1222,17 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
 
         return self.last_ordered_3pc
 
-    def revert(self, ledgerId, stateRootHash, reqCount):
+    def revert(self, ledgerId, stateRootHash, reqCount, batch_created=True):
         # A batch should only be reverted if all batches that came after it
-        # have been reverted
+        # have been reverted. `batch_created` is False if the batch is
+        # reverted while its PRE-PREPARE is applied, before it is created
         ledger = self.node.getLedger(ledgerId)
         state = self.node.getState(ledgerId)
         self.logger.info('{} reverting {} txns and state root from {} to {} for'
                          ' ledger {}'.format(self, reqCount, state.headHash, stateRootHash, ledgerId))
         state.revertToHead(stateRootHash)
         ledger.discardTxns(reqCount)
-        self.node.onBatchRejected(ledgerId)
+        self.node.onBatchRejected(ledgerId, batch_created=batch_created)
 
     def _apply_pre_prepare(self, pre_prepare: PrePrepare, sender: str) -> Optional[int]:
         """
@@ -1240,7 +1266,8 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
         def revert():
             self.revert(pre_prepare.ledgerId,
                         old_state_root,
-                        len(valid_reqs))
+                        len(valid_reqs),
+                        batch_created=False)
 
         if len(valid_reqs) != pre_prepare.discarded:
             if self.isMaster:
@@ -1334,6 +1361,7 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
         """
         key = (pp.viewNo, pp.ppSeqNo)
         self.prePrepares[key] = pp
+        self._start_3pc_phase(key)
         self.lastPrePrepareSeqNo = pp.ppSeqNo
         self.last_accepted_pre_prepare_time = pp.ppTime
         self.dequeue_prepares(*key)
@@ -1466,6 +1494,20 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
                 return commit
         return None
 
+    @property
+    def stashed_checkpoints_count(self) -> int:
+        return len(self.stashedRecvdCheckpoints)
+
+    @property
+    def last_pre_prepare_pending_prev_pp(self) -> Optional[tuple]:
+        """
+        The last PRE-PREPARE (with its sender) stashed till the previous
+        PRE-PREPAREs come, None if there are none
+        """
+        if not self.prePreparesPendingPrevPP:
+            return None
+        return self.prePreparesPendingPrevPP.peekitem()[1]
+
     @property
     def lastPrePrepare(self):
         last_3pc = (0, 0)
@@ -1692,6 +1734,23 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
         return self.getPrePrepare(*key) and self.prepares.hasQuorum(
             ThreePhaseKey(*key), self.quorums.prepare.value)
 
+    def _start_3pc_phase(self, key):
+        if self.isMaster and self._metrics is not None:
+            self._3pc_phase_started[key] = time.perf_counter()
+
+    def _complete_3pc_phase(self, key, phase: str, last=False):
+        """
+        Records latency of the batch in the phase it completed and starts
+        the next phase
+        """
+        started = self._3pc_phase_started.pop(key, None)
+        if started is None:
+            return
+        now = time.perf_counter()
+        self._metrics.phase_completed(phase, now - started, now)
+        if not last:
+            self._3pc_phase_started[key] = now
+
     def doOrder(self, commit: Commit):
         key = (commit.viewNo, commit.ppSeqNo)
         self.logger.debug("{} ordering COMMIT {}".format(self, key))
@@ -1706,6 +1765,7 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
             )
 
         self.addToOrdered(*key)
+        self._complete_3pc_phase(key, NodeMetrics.COMMIT_PHASE, last=True)
         ordered = Ordered(self.instId,
                           pp.viewNo,
                           pp.reqIdr[:pp.discarded],
@@ -1986,6 +2046,7 @@ class Replica(HasActionQueue, MessageProcessor, HookManager):
             self.requested_prepares,
             self.requested_commits,
             self.pre_prepares_stashed_for_incorrect_time,
+            self._3pc_phase_started,
         )
         for request_key in tpcKeys:
             for coll in to_clean_up:
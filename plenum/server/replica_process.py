@@ -0,0 +1,780 @@
+import inspect
+import multiprocessing
+import os
+import pickle
+import signal
+import sys
+import time
+from collections import deque
+from multiprocessing.reduction import ForkingPickler
+from typing import Optional
+
+from crypto.bls.bls_bft import BlsBft
+from crypto.bls.bls_bft_replica import BlsBftReplica
+from crypto.bls.bls_key_manager import LoadBLSKeyError
+from crypto.bls.bls_key_register import BlsKeyRegister
+from plenum.bls.bls_bft_replica_plenum import BlsBftReplicaPlenum
+from plenum.bls.bls_crypto_factory import create_default_bls_crypto_factory
+from plenum.common.constants import DOMAIN_LEDGER_ID
+from plenum.common.messages.node_messages import PrePrepare, Prepare, \
+    Commit
+from plenum.common.request import ReqKey
+from plenum.common.util import get_utc_epoch
+from plenum.server.propagator import Requests
+from plenum.server.quorums import Quorums
+from plenum.server.replica import Replica
+from stp_core.common.log import getlogger
+
+logger = getlogger()
+
+# Kinds of items sent to a replica process
+MESSAGE = 'msg'
+REQUEST = 'req'
+NODE_STATE = 'node'
+SEQ_NOS = 'seq_nos'
+CALL = 'call'
+SET = 'set'
+
+# Replica attributes the node reads, sent by the replica process whenever
+# they change, so reading them does not need a round trip
+SNAPSHOT_ATTRS = ('primaryName', 'isPrimary', 'hasPrimary',
+                  'last_ordered_3pc', 'h', 'H', 'lastPrePrepareSeqNo',
+                  'last_prepared_before_view_change',
+                  'stashed_checkpoints_count',
+                  'last_pre_prepare_pending_prev_pp')
+
+# Replica attributes the node sets
+SETTABLE_ATTRS = ('primaryName', 'last_ordered_3pc', 'h',
+                  'lastPrePrepareSeqNo', 'last_prepared_before_view_change')
+
+# Replica methods the node calls without using what they return
+ONE_WAY_CALLS = ('on_view_change_start', 'on_propagate_primary_done',
+                 'register_ledger', 'process_requested_pre_prepare',
+                 'process_requested_prepare', 'process_requested_commit')
+
+
+def replica_snapshot(replica: Replica) -> dict:
+    return {attr: getattr(replica, attr) for attr in SNAPSHOT_ATTRS}
+
+
+def initial_snapshot(config) -> dict:
+    """
+    Snapshot of a replica which has just been created, used till its
+    process sends the first one
+    """
+    return {
+        'primaryName': None,
+        'isPrimary': None,
+        'hasPrimary': False,
+        'last_ordered_3pc': (0, 0),
+        'h': 0,
+        'H': config.LOG_SIZE,
+        'lastPrePrepareSeqNo': 0,
+        'last_prepared_before_view_change': None,
+        'stashed_checkpoints_count': 0,
+        'last_pre_prepare_pending_prev_pp': None,
+    }
+
+
+class HostedRequests(Requests):
+    """
+    Requests of a replica running in a separate process, remembers keys of
+    the requests the replica freed so the node can free them as well
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.freed = []
+
+    def free(self, request_key):
+        super().free(request_key)
+        self.freed.append(request_key)
+
+
+class SeqNos(dict):
+    """
+    Sequence numbers of ordered requests looked up in the node's seqNoDB
+    """
+
+    def get(self, key):
+        return super().get(key, (None, None))
+
+
+class ReplicaProcessError(Exception):
+    """
+    A replica process died or did not handle what it was passed in time
+    """
+
+
+class ConfigSnapshot:
+    """
+    Copy of the config settings which can be pickled, config modules
+    cannot be passed to a spawned process
+    """
+
+    def __init__(self, config):
+        for name, value in vars(config).items():
+            if name.startswith('_'):
+                continue
+            try:
+                pickle.dumps(value)
+            except Exception:
+                continue
+            setattr(self, name, value)
+
+
+class HostedBlsKeyRegister(BlsKeyRegister):
+    """
+    BLS keys of the nodes for the committed pool state, sent by the node
+    whenever the pool state changes
+    """
+
+    def __init__(self):
+        self._pool_root_hash = None
+        self._keys = {}
+
+    def update(self, pool_root_hash, keys: dict):
+        self._pool_root_hash = pool_root_hash
+        self._keys = keys
+
+    def get_pool_root_hash_committed(self):
+        return self._pool_root_hash
+
+    def get_key_by_name(self, node_name, pool_state_root_hash=None):
+        if pool_state_root_hash and \
+                pool_state_root_hash != self._pool_root_hash:
+            return None
+        return self._keys.get(node_name)
+
+
+class HostedBlsStore:
+    """
+    Multi-signatures are stored by the master replica only, the ones
+    a backup replica gets are not used
+    """
+
+    def put(self, multi_sig):
+        pass
+
+    def get(self, state_root_hash):
+        return None
+
+
+class ReplicaHost:
+    """
+    Stand-in for the node in a replica process. Keeps a copy of the node
+    state replicas use, and queues calls replicas make to the node to be
+    made in the node process.
+    """
+
+    def __init__(self, name: str, node_state: dict, last_timestamp=None,
+                 bls_keys_dir: str = None):
+        self.name = name
+        self.requests = HostedRequests()
+        self.seqNoDB = SeqNos()
+        self.last_timestamp = last_timestamp
+        self.calls = []
+        self.totalNodes = None
+        self._ledger_ids_for_requests = {}
+        self._bls_keys_dir = bls_keys_dir
+        self._bls_crypto_factory = None
+        self.bls_pk = None
+        self.bls_bft = BlsBft(bls_crypto_signer=None,
+                              bls_crypto_verifier=None,
+                              bls_key_register=HostedBlsKeyRegister(),
+                              bls_store=HostedBlsStore())
+        self.update(node_state)
+
+    def create_bls_bft_replica(self) -> BlsBftReplica:
+        """
+        Create the BLS part of the replica, crypto objects cannot be pickled
+        so this is done in the replica process
+        """
+        self._bls_crypto_factory = \
+            create_default_bls_crypto_factory(self._bls_keys_dir)
+        self.bls_bft.bls_crypto_verifier = \
+            self._bls_crypto_factory.create_bls_crypto_verifier()
+        self._load_bls_signer()
+        return BlsBftReplicaPlenum(self.name, self.bls_bft, False)
+
+    def _load_bls_signer(self):
+        self.bls_bft.bls_crypto_signer = None
+        if self.bls_pk is None:
+            return
+        try:
+            signer = self._bls_crypto_factory.\
+                create_bls_crypto_signer_from_saved_keys()
+        except LoadBLSKeyError:
+            return
+        # The node uses the keys only if they match its NODE txn
+        if signer.pk == self.bls_pk:
+            self.bls_bft.bls_crypto_signer = signer
+
+    def update(self, node_state: dict):
+        self.viewNo = node_state['viewNo']
+        self.f = node_state['f']
+        self.isParticipating = node_state['isParticipating']
+        self.ledger_ids = node_state['ledger_ids']
+        self.nodestack = _Namespace(connecteds=node_state['connecteds'])
+        self.master_replica = _Namespace(
+            last_ordered_3pc=node_state['master_last_ordered_3pc'])
+        if node_state['totalNodes'] != self.totalNodes:
+            self.totalNodes = node_state['totalNodes']
+            self.quorums = Quorums(self.totalNodes)
+        bls_pk, pool_root_hash, bls_keys = node_state['bls']
+        self.bls_bft.bls_key_register.update(pool_root_hash, bls_keys)
+        if bls_pk != self.bls_pk:
+            self.bls_pk = bls_pk
+            if self._bls_crypto_factory is not None:
+                self._load_bls_signer()
+
+    def add_request(self, request, ledger_id):
+        """
+        Add a request finalised by the node, it is freed once the replica
+        frees it
+        """
+        self.requests.add(request)
+        self.requests.set_finalised(request)
+        self.requests.mark_as_forwarded(request, 1)
+        self.requests[request.key].executed = True
+        self._ledger_ids_for_requests[request.key] = ledger_id
+
+    def take_freed(self):
+        freed, self.requests.freed = self.requests.freed, []
+        for key in freed:
+            self._ledger_ids_for_requests.pop(key, None)
+        return freed
+
+    def take_calls(self):
+        calls, self.calls = self.calls, []
+        return calls
+
+    def ledger_id_for_request(self, request):
+        return self._ledger_ids_for_requests[request.key]
+
+    def utc_epoch(self) -> int:
+        return get_utc_epoch()
+
+    def reportSuspiciousNodeEx(self, ex):
+        # Suspicion codes cannot be pickled, so the node gets the values
+        self.calls.append(('reportSuspiciousNode',
+                           (ex.node, ex.reason, ex.code, ex.offendingMsg)))
+
+    def request_propagates(self, req_keys):
+        self.calls.append(('request_propagates', (req_keys,)))
+
+    def request_msg(self, typ, params, frm=None):
+        self.calls.append(('request_msg', (typ, params, frm)))
+
+    def start_catchup(self):
+        self.calls.append(('start_catchup', ()))
+
+
+class HostedReplica(Replica):
+    def _get_last_timestamp_from_state(self, ledger_id):
+        if ledger_id == DOMAIN_LEDGER_ID:
+            return self.node.last_timestamp
+
+
+class _Namespace:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def run_replica(conn, host: ReplicaHost, inst_id: int, config,
+                bls_bft_replica: BlsBftReplica = None):
+    """
+    Main loop of a replica process. Items received from the node are
+    handled in order, then the replica services its queues and sends
+    its output, calls to the node, its changed state and the number of
+    items handled so far back to the node. Errors of the replica are logged
+    and the loop goes on, it ends when the node stops the process or closes
+    its end of the pipe.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if bls_bft_replica is None:
+        bls_bft_replica = host.create_bls_bft_replica()
+    replica = HostedReplica(host, inst_id, config, False, bls_bft_replica)
+    snapshot = None
+    processed = 0
+    handled = 0
+    acked = None
+    timeout = config.REPLICA_PROCESS_POLL_TIMEOUT
+
+    def packet():
+        nonlocal snapshot, processed
+        reply = dict(out=list(replica.outBox), calls=host.take_calls(),
+                     freed=host.take_freed(), processed=processed,
+                     handled=handled)
+        replica.outBox.clear()
+        processed = 0
+        current = replica_snapshot(replica)
+        if current != snapshot:
+            snapshot = reply['state'] = current
+        return reply
+
+    def handle(item):
+        kind = item[0]
+        if kind == MESSAGE:
+            replica.inBox.append(item[1])
+        elif kind == REQUEST:
+            host.add_request(*item[1:])
+        elif kind == NODE_STATE:
+            host.update(item[1])
+        elif kind == SEQ_NOS:
+            host.seqNoDB.update(item[1])
+        elif kind == CALL:
+            name, args, kwargs = item[1:]
+            getattr(replica, name)(*args, **kwargs)
+        elif kind == SET:
+            setattr(replica, item[1], item[2])
+
+    while True:
+        try:
+            if conn.poll(timeout):
+                while conn.poll():
+                    item = conn.recv()
+                    try:
+                        handle(item)
+                    except (EOFError, OSError):
+                        raise
+                    except Exception:
+                        logger.exception('{} failed to handle {}'.
+                                         format(replica, item))
+                    handled += 1
+            try:
+                processed += replica.serviceQueues()
+            except Exception:
+                logger.exception('{} failed to service its queues'.
+                                 format(replica))
+            reply = packet()
+            # The first packet tells the node the process has started
+            if reply['out'] or reply['calls'] or reply['freed'] or \
+                    reply['processed'] or 'state' in reply or \
+                    handled != acked:
+                conn.send(reply)
+                acked = handled
+        except (EOFError, OSError):
+            # The node closed its end of the pipe, the replica is stopped
+            return
+
+
+class ReplicaProcess:
+    """
+    Replica of a backup protocol instance running in a separate process.
+    The node never waits for the process: messages for the replica and
+    calls the node makes to it are passed to the process when its queues are
+    serviced, and its output (including `Ordered`) is put in `outBox` as it
+    comes. Replica attributes the node reads are served from a snapshot the
+    process keeps up to date, values the node sets or changes by its calls
+    are seen right away. 3PC messages the replica sent are kept from its
+    output to serve MESSAGE_REQUESTs. Other replica attributes are not
+    available in the node process.
+
+    The process is started with REPLICA_PROCESS_START_METHOD, not forked,
+    since the node process has threads. If the process dies, does not start
+    or does not handle what it is passed in time it is started again,
+    keeping the primary, watermarks and last ordered batch of the replica.
+    Items are written to the process only while less than
+    REPLICA_PROCESS_MAX_PENDING_BYTES of them are not handled yet, so
+    writing to the pipe never waits for the process. A stopped process is
+    reaped when replicas are serviced later.
+    """
+    _own_attrs = {'name', 'instId', 'isMaster', 'config', 'logger', 'inBox',
+                  'outBox', 'sentPrePrepares', '_node', '_conn', '_process',
+                  '_snapshot', '_overrides', '_commands', '_node_state',
+                  '_forwarded', '_bls_bft_replica', '_bls_keys',
+                  '_sent_prepares', '_sent_commits', '_sent_gc_till',
+                  '_discard_output_till', '_sent', '_handled', '_started',
+                  '_deadline', '_pending_sizes', '_pending_bytes'}
+
+    # Stopped processes not reaped yet, with the time to kill them at
+    _stopping = []
+
+    def __init__(self, node, instId: int, config,
+                 bls_bft_replica: BlsBftReplica = None):
+        """
+        :param bls_bft_replica: BLS part of the replica, it has to be
+            picklable; by default it is created in the process
+        """
+        self._node = node
+        self.name = Replica.generateName(node.name, instId)
+        self.instId = instId
+        self.isMaster = False
+        self.config = config
+        self.logger = getlogger(self.name)
+        self.inBox = deque()
+        self.outBox = deque()
+        # Items for the process made by calls of the node, each one with
+        # the snapshot values it changes and whether it drops the output
+        # the process sent before handling it
+        self._commands = deque()
+        # Snapshot values changed by the node which the process has not
+        # reported yet, with the number of the item changing them
+        self._overrides = {}
+        self._snapshot = initial_snapshot(config)
+        # 3PC messages sent by the replica by their 3PC keys
+        self.sentPrePrepares = {}
+        self._sent_prepares = {}
+        self._sent_commits = {}
+        self._sent_gc_till = None
+        # Keys of requests passed to the process and not freed by it yet
+        self._forwarded = set()
+        self._bls_bft_replica = bls_bft_replica
+        self._bls_keys = (None, {})
+        self._start()
+
+    def __repr__(self):
+        return self.name
+
+    def __getattr__(self, name):
+        # Called only for attributes this object does not have itself
+        if name.startswith('__') or name in self._own_attrs:
+            raise AttributeError(name)
+        if name in SNAPSHOT_ATTRS:
+            return self._state(name)
+        if name in ONE_WAY_CALLS:
+            return lambda *args, **kwargs: \
+                self._queue((CALL, name, args, kwargs))
+        if isinstance(inspect.getattr_static(Replica, name, None),
+                      staticmethod):
+            return getattr(Replica, name)
+        raise AttributeError('{} of {} is not available in the node process'.
+                             format(name, self))
+
+    def __setattr__(self, name, value):
+        if name in self._own_attrs:
+            object.__setattr__(self, name, value)
+        elif name in SETTABLE_ATTRS:
+            overrides = {name: value}
+            if name == 'h':
+                overrides['H'] = value + self.config.LOG_SIZE
+            self._queue((SET, name, value), overrides)
+        else:
+            raise AttributeError('{} of {} cannot be set in the node process'.
+                                 format(name, self))
+
+    @property
+    def viewNo(self):
+        return self._node.viewNo
+
+    def _state(self, name):
+        if name in self._overrides:
+            return self._overrides[name][0]
+        if name in ('isPrimary', 'hasPrimary') and \
+                'primaryName' in self._overrides:
+            primary_name = self._overrides['primaryName'][0]
+            if name == 'hasPrimary':
+                return primary_name is not None
+            return primary_name == self.name \
+                if primary_name is not None else None
+        return self._snapshot[name]
+
+    def _queue(self, item, overrides: dict = None,
+               discard_output: bool = False):
+        overrides = overrides or {}
+        self._commands.append((item, overrides, discard_output))
+        for attr, value in overrides.items():
+            self._overrides[attr] = (value, None)
+
+    def _start(self):
+        self._node_state = self._current_node_state()
+        bls_keys_dir = os.path.join(self._node.keys_dir, self._node.name) \
+            if self._node.bls_bft is not None else None
+        host = ReplicaHost(self._node.name, self._node_state,
+                           self._last_timestamp(), bls_keys_dir)
+        context = multiprocessing.get_context(
+            self.config.REPLICA_PROCESS_START_METHOD)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=run_replica,
+            args=(child_conn, host, self.instId, ConfigSnapshot(self.config),
+                  self._bls_bft_replica),
+            name=self.name, daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._sent = 0
+        self._handled = 0
+        # Sizes of the items sent and not handled by the process yet
+        self._pending_sizes = deque()
+        self._pending_bytes = 0
+        self._discard_output_till = 0
+        # The process sends a packet once it has started
+        self._started = False
+        self._deadline = time.perf_counter() + \
+            self.config.REPLICA_PROCESS_START_TIMEOUT
+
+    def _restart(self, reason):
+        self.logger.error('{} replica process failed: {!r}, starting it again'.
+                          format(self, reason))
+        restored = {attr: self._state(attr)
+                    for attr in ('primaryName', 'h', 'last_ordered_3pc')}
+        restored.update((attr, value)
+                        for attr, (value, _) in self._overrides.items()
+                        if attr in SETTABLE_ATTRS)
+        self.stop()
+        # Requests passed to the failed process are not freed by it anymore
+        for key in self._forwarded:
+            self._node.requests.free(key)
+        self._forwarded.clear()
+        self._start()
+        # Values are set in the new process before the calls still queued
+        self._overrides.clear()
+        queued = list(self._commands)
+        self._commands.clear()
+        for attr, value in restored.items():
+            if attr == 'primaryName' and value is None:
+                continue
+            setattr(self, attr, value)
+        for command in queued:
+            self._queue(*command)
+
+    def serviceQueues(self, limit: int = None) -> int:
+        """
+        Pass the calls made by the node and up to `limit` messages from the
+        inBox to the replica process and take the output of the replica
+
+        :return: the number of messages processed by the replica
+        """
+        packets = []
+        failure = None
+        self.reap_stopped()
+        try:
+            if self._can_send():
+                self._send_node_state()
+            while self._commands and self._can_send():
+                item, overrides, discard_output = self._commands[0]
+                seq_no = self._send(item)
+                self._commands.popleft()
+                for attr, value in overrides.items():
+                    self._overrides[attr] = (value, seq_no)
+                if discard_output:
+                    self._discard_output_till = seq_no
+            while self.inBox and (limit is None or limit > 0) and \
+                    self._can_send():
+                self._pass(self.inBox.popleft())
+                if limit is not None:
+                    limit -= 1
+            while self._conn.poll():
+                packets.append(self._conn.recv())
+        except (EOFError, OSError) as ex:
+            failure = ex
+        processed = sum(self._apply(packet) for packet in packets)
+        if failure is None:
+            failure = self._overdue()
+        if failure is not None:
+            self._restart(failure)
+        return processed
+
+    def _send(self, item) -> int:
+        """
+        Send an item to the process
+
+        :return: the number of the item
+        """
+        if self._started and self._handled == self._sent:
+            self._deadline = time.perf_counter() + \
+                self.config.REPLICA_PROCESS_REPLY_TIMEOUT
+        data = bytes(ForkingPickler.dumps(item))
+        self._conn.send_bytes(data)
+        self._sent += 1
+        self._pending_sizes.append(len(data))
+        self._pending_bytes += len(data)
+        return self._sent
+
+    def _can_send(self) -> bool:
+        # At least one item is sent however big it is
+        return self._pending_bytes == 0 or \
+            self._pending_bytes < self.config.REPLICA_PROCESS_MAX_PENDING_BYTES
+
+    def _overdue(self) -> Optional[ReplicaProcessError]:
+        if self._started and self._handled == self._sent:
+            return None
+        if time.perf_counter() < self._deadline:
+            return None
+        if not self._started:
+            return ReplicaProcessError('process did not start in {} sec'.
+                                       format(self.config.
+                                              REPLICA_PROCESS_START_TIMEOUT))
+        return ReplicaProcessError('{} items not handled in {} sec'.
+                                   format(self._sent - self._handled,
+                                          self.config.
+                                          REPLICA_PROCESS_REPLY_TIMEOUT))
+
+    def _pass(self, msg):
+        if isinstance(msg, ReqKey):
+            state = self._node.requests.get(msg.digest)
+            if state is None or not state.finalised:
+                self.logger.debug('{} not passing {} since the request is '
+                                  'not finalised'.format(self, msg))
+                return
+            request = state.finalised
+            self._send((REQUEST, request,
+                        self._node.ledger_id_for_request(request)))
+            self._forwarded.add(msg.digest)
+        self._send((MESSAGE, msg))
+
+    def _current_node_state(self) -> dict:
+        node = self._node
+        return {
+            'viewNo': node.viewNo,
+            'f': node.f,
+            'totalNodes': node.totalNodes,
+            'isParticipating': node.isParticipating,
+            'ledger_ids': list(node.ledger_ids),
+            'connecteds': set(node.nodestack.connecteds),
+            'master_last_ordered_3pc': node.master_replica.last_ordered_3pc,
+            'bls': self._current_bls_state(),
+        }
+
+    def _current_bls_state(self) -> tuple:
+        bls_bft = self._node.bls_bft
+        if bls_bft is None:
+            return None, None, {}
+        signer = bls_bft.bls_crypto_signer
+        register = bls_bft.bls_key_register
+        pool_root_hash = register.get_pool_root_hash_committed()
+        if self._bls_keys[0] != pool_root_hash:
+            self._bls_keys = (pool_root_hash,
+                              {name: register.get_key_by_name(name,
+                                                              pool_root_hash)
+                               for name in self._node.nodeReg})
+        return (signer.pk if signer is not None else None,) + self._bls_keys
+
+    def _send_node_state(self):
+        state = self._current_node_state()
+        if state != self._node_state:
+            self._send((NODE_STATE, state))
+            self._node_state = state
+
+    def _last_timestamp(self) -> Optional[int]:
+        req_handler = self._node.ledger_to_req_handler.get(DOMAIN_LEDGER_ID)
+        if req_handler is None or not req_handler.ts_store:
+            return None
+        last_timestamp = req_handler.ts_store.get_last_key()
+        return int(last_timestamp.decode()) if last_timestamp else None
+
+    def _apply(self, packet: dict) -> int:
+        if not self._started or packet['handled'] > self._handled:
+            self._deadline = time.perf_counter() + \
+                self.config.REPLICA_PROCESS_REPLY_TIMEOUT
+        self._started = True
+        for _ in range(packet['handled'] - self._handled):
+            self._pending_bytes -= self._pending_sizes.popleft()
+        self._handled = packet['handled']
+        # Output sent before the outBox was cleared by the node is dropped
+        if self._handled >= self._discard_output_till:
+            self._keep_sent(packet['out'])
+            self.outBox.extend(packet['out'])
+        if 'state' in packet:
+            self._snapshot = packet['state']
+            self._gc_sent()
+        for attr, (_, seq_no) in list(self._overrides.items()):
+            if seq_no is not None and seq_no <= self._handled:
+                del self._overrides[attr]
+        for name, args in packet['calls']:
+            getattr(self._node, name)(*args)
+        for key in packet['freed']:
+            self._forwarded.discard(key)
+            self._node.requests.free(key)
+        return packet['processed']
+
+    def _keep_sent(self, out):
+        for msg in out:
+            if isinstance(msg, PrePrepare):
+                sent = self.sentPrePrepares
+            elif isinstance(msg, Prepare):
+                sent = self._sent_prepares
+            elif isinstance(msg, Commit):
+                sent = self._sent_commits
+            else:
+                continue
+            sent[(msg.viewNo, msg.ppSeqNo)] = msg
+
+    def _gc_sent(self):
+        """
+        Forget 3PC messages of previous views and ones below the low
+        watermark, they are not requested anymore
+        """
+        till = (self.viewNo, self._snapshot['h'])
+        if till == self._sent_gc_till:
+            return
+        self._sent_gc_till = till
+        for sent in (self.sentPrePrepares, self._sent_prepares,
+                     self._sent_commits):
+            for key in [key for key in sent
+                        if key[0] < till[0] or key[1] <= till[1]]:
+                del sent[key]
+
+    def _clear_sent(self):
+        self.sentPrePrepares.clear()
+        self._sent_prepares.clear()
+        self._sent_commits.clear()
+
+    def get_sent_prepare(self, viewNo, ppSeqNo):
+        return self._sent_prepares.get((viewNo, ppSeqNo))
+
+    def get_sent_commit(self, viewNo, ppSeqNo):
+        return self._sent_commits.get((viewNo, ppSeqNo))
+
+    def primaryChanged(self, primaryName):
+        self._queue((CALL, 'primaryChanged', (primaryName,), {}),
+                    {'primaryName': primaryName})
+
+    def _remove_ordered_from_queue(self, last_caught_up_3PC=None):
+        # The process sends all its output each time it services its
+        # queues, so `Ordered` it made are in the outBox already
+        return Replica._remove_ordered_from_queue(self, last_caught_up_3PC)
+
+    def catchup_clear_for_backup(self):
+        if self.isPrimary:
+            self._queue((CALL, 'catchup_clear_for_backup', (), {}))
+            return
+        self._queue((CALL, 'catchup_clear_for_backup', (), {}),
+                    {'last_ordered_3pc': (self.viewNo, 0),
+                     'h': 0, 'H': sys.maxsize},
+                    discard_output=True)
+        self.outBox.clear()
+        self._clear_sent()
+
+    def clear_requests_and_fix_last_ordered(self):
+        self._queue((SEQ_NOS, {key: self._node.seqNoDB.get(key)
+                               for key in self._forwarded}))
+        self._queue((CALL, 'clear_requests_and_fix_last_ordered', (), {}))
+
+    def stop(self):
+        """
+        Stop the process without waiting for it, it is reaped by
+        `reap_stopped`
+        """
+        # The process exits when it sees the pipe closed
+        self._conn.close()
+        if self._process.is_alive():
+            self._process.terminate()
+            self._stopping.append(
+                (self._process, time.perf_counter() +
+                 self.config.REPLICA_PROCESS_STOP_TIMEOUT))
+
+    @classmethod
+    def reap_stopped(cls, wait: bool = False):
+        """
+        Reap stopped processes which have exited, killing the ones which
+        did not exit in REPLICA_PROCESS_STOP_TIMEOUT
+
+        :param wait: wait for all stopped processes to exit
+        """
+        stopping = []
+        for process, kill_at in cls._stopping:
+            if wait:
+                process.join(max(kill_at - time.perf_counter(), 0))
+            # Checking if the process is alive reaps it if it has exited
+            if not process.is_alive():
+                continue
+            if time.perf_counter() >= kill_at:
+                # A hanging process may not handle SIGTERM
+                os.kill(process.pid, signal.SIGKILL)
+                if wait:
+                    process.join()
+                    continue
+            stopping.append((process, kill_at))
+        cls._stopping[:] = stopping
@@ -8,6 +8,7 @@ from plenum.bls.bls_bft_factory import create_default_bls_bft_factory
 from plenum.common.constants import BLS_PREFIX
 from plenum.server.monitor import Monitor
 from plenum.server.replica import Replica
+from plenum.server.replica_process import ReplicaProcess
 from stp_core.common.log import getlogger
 
 logger = getlogger()
@@ -50,11 +51,22 @@ class Replicas:
         self._replicas = self._replicas[:-1]
         self._messages_to_replicas = self._messages_to_replicas[:-1]
         self._monitor.removeInstance()
+        if isinstance(replica, ReplicaProcess):
+            replica.stop()
         logger.display("{} removed replica {} from instance {}".
                        format(self._node.name, replica, replica.instId),
                        extra={"tags": ["node-replica"]})
         return self.num_replicas
 
+    def stop(self):
+        """
+        Stop replicas running in separate processes
+        """
+        for replica in self._replicas:
+            if isinstance(replica, ReplicaProcess):
+                replica.stop()
+        ReplicaProcess.reap_stopped(wait=True)
+
     # TODO unit test
     @property
     def some_replica_is_primary(self) -> bool:
@@ -72,6 +84,8 @@ class Replicas:
     def service_inboxes(self, limit: int = None):
         number_of_processed_messages = \
             sum(replica.serviceQueues(limit) for replica in self._replicas)
+        # Processes of removed replicas are reaped here as well
+        ReplicaProcess.reap_stopped()
         return number_of_processed_messages
 
     def pass_message(self, message, instance_id=None):
@@ -111,6 +125,10 @@ class Replicas:
         """
         Create a new replica with the specified parameters.
         """
+        if not is_master and self._config is not None and \
+                self._config.BACKUP_REPLICAS_IN_PROCESSES:
+            # BLS of the replica is created in its process
+            return ReplicaProcess(self._node, instance_id, self._config)
         return self._replica_class(self._node, instance_id, self._config, is_master, bls_bft)
 
     def _create_bls_bft_replica(self, is_master):
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from copy import deepcopy
 from typing import Optional
 
@@ -5,7 +6,8 @@ from plenum.common.constants import TXN_TYPE
 from common.error import error
 from plenum.common.exceptions import NoAuthenticatorFound
 from plenum.common.types import OPERATION
-from plenum.server.client_authn import ClientAuthNr
+from plenum.server.client_authn import ClientAuthNr, NaclAuthNr, \
+    SigVerificationBatch
 
 
 class ReqAuthenticator:
@@ -13,6 +15,9 @@ class ReqAuthenticator:
     Maintains a list of authenticators. The first authenticator in the list
     of authenticators is the core authenticator
     """
+    # Batch signature checks are added to instead of being done
+    _sig_batch = None  # type: Optional[SigVerificationBatch]
+
     def __init__(self):
         self._authenticators = []
 
@@ -53,3 +58,29 @@ class ReqAuthenticator:
         for authnr in self._authenticators:
             if isinstance(authnr, authnr_type):
                 return authnr
+
+    @contextmanager
+    def deferred_verification(self, batch: SigVerificationBatch):
+        """
+        Makes the registered nacl based authenticators add signature checks
+        to `batch` instead of doing them, until the context is exited
+        """
+        authnrs = [a for a in self._authenticators
+                   if isinstance(a, NaclAuthNr)]
+        for authnr in authnrs:
+            authnr.sig_batch = batch
+        self._sig_batch = batch
+        try:
+            yield batch
+        finally:
+            self._sig_batch = None
+            for authnr in authnrs:
+                authnr.sig_batch = None
+
+    @property
+    def verification_deferred(self) -> bool:
+        """
+        Whether signature checks are added to a batch, so a request
+        authenticated meanwhile can still fail the checks
+        """
+        return self._sig_batch is not None
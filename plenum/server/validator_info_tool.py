@@ -353,10 +353,10 @@ class ValidatorNodeInfoTool:
             replica_stat["Watermarks"] = "{}:{}".format(replica.h, replica.H)
             replica_stat["Last_ordered_3PC"] = self._prepare_for_json(replica.last_ordered_3pc)
             stashed_txns = {}
-            stashed_txns["Stashed_checkpoints"] = self._prepare_for_json(len(replica.stashedRecvdCheckpoints))
-            if replica.prePreparesPendingPrevPP:
+            stashed_txns["Stashed_checkpoints"] = self._prepare_for_json(replica.stashed_checkpoints_count)
+            if replica.last_pre_prepare_pending_prev_pp is not None:
                 stashed_txns["Min_stashed_PrePrepare"] = self._prepare_for_json(
-                    [pp for pp in replica.prePreparesPendingPrevPP.itervalues()][-1])
+                    replica.last_pre_prepare_pending_prev_pp)
             replica_stat["Stashed_txns"] = stashed_txns
             res[replica.name] = self._prepare_for_json(replica_stat)
         return res
@@ -381,6 +381,8 @@ class ValidatorNodeInfoTool:
                     'pool': self.__pool_ledger_size,
                 },
                 'uptime': self.__uptime,
+                'latencies': self._prepare_for_json(
+                    self._node.metrics.summary()),
             })
         return metrics
 
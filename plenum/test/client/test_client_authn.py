@@ -3,7 +3,7 @@ import pytest
 from plenum.common.exceptions import InvalidSignature, CouldNotAuthenticate, \
     InsufficientCorrectSignatures
 from plenum.common.signer_simple import SimpleSigner
-from plenum.server.client_authn import SimpleAuthNr
+from plenum.server.client_authn import NaclAuthNr, SimpleAuthNr
 
 idr = '5G72199XZB7wREviUbQma7'
 msg_str = "42 (forty-two) is the natural number that succeeds 41 and precedes 43."
@@ -72,3 +72,21 @@ def testReconstitutedClientCreatesTheSameSig(cli, sig, msg):
     cli2 = SimpleSigner(idr, seed=cli.seed)
     sig2 = cli2.sign(msg)
     assert sig == sig2
+
+
+def test_authenticator_not_calling_base_init(cli, msg, sig):
+    class LedgerAuthenticator(NaclAuthNr):
+        # Like authenticators reading verkeys from a ledger, which do not
+        # call `__init__` of `NaclAuthNr`
+        def __init__(self, verkeys):
+            self.verkeys = verkeys
+
+        def addIdr(self, identifier, verkey, role=None):
+            self.verkeys[identifier] = verkey
+
+        def getVerkey(self, identifier):
+            return self.verkeys.get(identifier)
+
+    authnr = LedgerAuthenticator({cli.identifier: cli.verkey})
+    assert authnr.authenticate_multi(msg, {idr: sig}) == [idr]
+    assert authnr.authenticate_multi(msg, {idr: sig}) == [idr]
@@ -0,0 +1,128 @@
+import pytest
+
+from plenum.common.exceptions import InsufficientCorrectSignatures, \
+    UnknownIdentifier
+from plenum.common.signer_simple import SimpleSigner
+from plenum.common.types import f
+from plenum.common.request import Request
+from plenum.server.client_authn import CoreAuthNr, SigVerificationBatch, \
+    verify_sig_checks
+from plenum.server.client_sig_verifier import ClientSigVerifier
+from plenum.server.req_authenticator import ReqAuthenticator
+from state.pruning_state import PruningState
+from storage.kv_in_memory import KeyValueStorageInMemory
+
+
+@pytest.fixture(scope="module")
+def signers():
+    return [SimpleSigner() for _ in range(3)]
+
+
+@pytest.fixture(scope="module")
+def authnr(signers):
+    core_authnr = CoreAuthNr(state=PruningState(KeyValueStorageInMemory()))
+    for signer in signers:
+        core_authnr.addIdr(signer.identifier, signer.verkey)
+    authnr = ReqAuthenticator()
+    authnr.register_authenticator(core_authnr)
+    return authnr
+
+
+def signed_msg(signer, req_id, corrupt=False):
+    msg = {f.IDENTIFIER.nm: signer.identifier, f.REQ_ID.nm: req_id,
+           'operation': {'type': '1'}}
+    msg[f.SIG.nm] = signer.sign(msg)
+    if corrupt:
+        msg[f.REQ_ID.nm] += 1
+    return msg
+
+
+def test_checks_are_deferred_while_batch_is_set(authnr, signers):
+    good = signed_msg(signers[0], 1)
+    bad = signed_msg(signers[1], 2, corrupt=True)
+    batch = SigVerificationBatch()
+    assert not authnr.verification_deferred
+    with authnr.deferred_verification(batch):
+        assert authnr.verification_deferred
+        batch.key = 'good'
+        assert authnr.authenticate(good) == {signers[0].identifier}
+        batch.key = 'bad'
+        # bad signature is not detected until the batch is verified
+        assert authnr.authenticate(bad) == {signers[1].identifier}
+    assert authnr.core_authenticator.sig_batch is None
+    assert not authnr.verification_deferred
+    with pytest.raises(InsufficientCorrectSignatures):
+        authnr.authenticate(bad)
+
+    results = verify_sig_checks(batch.checks)
+    assert results == [True, False]
+    failures = batch.failures(results)
+    assert list(failures) == ['bad']
+    assert isinstance(failures['bad'], InsufficientCorrectSignatures)
+
+
+@pytest.mark.parametrize('workers, use_processes',
+                         [(1, False), (3, False), (2, True)])
+def test_messages_passed_on_in_order(authnr, signers, workers, use_processes):
+    verified = []
+    invalid = []
+    verifier = ClientSigVerifier(
+        authnr,
+        verify_signature=authnr.authenticate,
+        on_verified=lambda msg, frm: verified.append(frm),
+        on_invalid=lambda ex, wrappedMsg: invalid.append((wrappedMsg[1],
+                                                          type(ex))),
+        workers=workers,
+        use_processes=use_processes)
+    unknown = SimpleSigner()
+    for i in range(10):
+        verifier.add(signed_msg(signers[i % 3], i, corrupt=(i % 4 == 1)), i)
+    verifier.add(signed_msg(unknown, 10), 10)
+    assert len(verifier) == 11
+
+    assert verifier.process() == 11
+    assert len(verifier) == 0
+    assert verified == [0, 2, 3, 4, 6, 7, 8]
+    assert invalid == [(1, InsufficientCorrectSignatures),
+                       (5, InsufficientCorrectSignatures),
+                       (9, InsufficientCorrectSignatures),
+                       (10, UnknownIdentifier)]
+    verifier.stop()
+
+
+def test_messages_added_while_processing_are_processed(authnr, signers):
+    verified = []
+
+    def on_verified(msg, frm):
+        verified.append(frm)
+        if frm == 'outer':
+            verifier.add(signed_msg(signers[0], 2), 'inner')
+
+    verifier = ClientSigVerifier(authnr,
+                                 verify_signature=authnr.authenticate,
+                                 on_verified=on_verified,
+                                 on_invalid=None)
+    verifier.add(signed_msg(signers[0], 1), 'outer')
+    assert verifier.process() == 2
+    assert verified == ['outer', 'inner']
+
+
+def test_request_digests_computed_by_worker_processes(authnr, signers):
+    verified = []
+    verifier = ClientSigVerifier(
+        authnr,
+        verify_signature=lambda req: authnr.authenticate(req.as_dict),
+        on_verified=lambda msg, frm: verified.append(msg),
+        on_invalid=None,
+        workers=2,
+        use_processes=True)
+    requests = [Request(**signed_msg(signers[i % 3], i)) for i in range(4)]
+    for req in requests:
+        verifier.add(req, 'client')
+    verifier.process()
+    verifier.stop()
+
+    assert verified == requests
+    for req in requests:
+        assert req._digest is not None
+        assert req._digest == req.getDigest()
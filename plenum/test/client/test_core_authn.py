@@ -1,11 +1,17 @@
 import pytest
 
-from plenum.common.constants import GET_TXN, NODE, NYM
+from plenum.common.constants import GET_TXN, NODE, NYM, TARGET_NYM, VERKEY
 from plenum.common.exceptions import CouldNotAuthenticate, \
-    InsufficientSignatures, InsufficientCorrectSignatures, MissingSignature
+    InsufficientSignatures, InsufficientCorrectSignatures, MissingSignature, \
+    UnknownIdentifier
 from plenum.common.signer_simple import SimpleSigner
+from plenum.common.txn_util import init_empty_txn, set_payload_data, \
+    append_payload_metadata
 from plenum.common.types import f
 from plenum.server.client_authn import CoreAuthNr
+from plenum.server.domain_req_handler import DomainRequestHandler
+from state.pruning_state import PruningState
+from storage.kv_in_memory import KeyValueStorageInMemory
 
 idr = '5G72199XZB7wREviUbQma7'
 msg_str = "42 (forty-two) is the natural number that succeeds 41 and precedes 43."
@@ -150,3 +156,44 @@ def test_txn_types(sa):
     assert not sa.is_query(NODE)
     assert sa.is_write(NYM)
     assert not sa.is_query(NYM)
+
+
+def test_verifier_is_reused(sa, signer, msg, sig):
+    sa.authenticate(msg, idr, sig)
+    verifiers = len(sa._verifiers)
+    hits = sa._verifiers.hits
+    sa.authenticate(msg, idr, sig)
+    assert len(sa._verifiers) == verifiers
+    assert sa._verifiers.hits == hits + 1
+
+
+def test_cached_verkey_follows_nym_changes(msg):
+    state = PruningState(KeyValueStorageInMemory())
+    req_handler = DomainRequestHandler(None, state, None, [], None)
+    authnr = CoreAuthNr(state=state)
+    req_handler.subscribe_to_nym_changes(authnr.on_verkey_changed)
+
+    old_signer = SimpleSigner()
+    new_signer = SimpleSigner()
+    nym = old_signer.identifier
+
+    def update_verkey(verkey):
+        txn = init_empty_txn(NYM)
+        set_payload_data(txn, {TARGET_NYM: nym, VERKEY: verkey})
+        append_payload_metadata(txn, frm=nym)
+        req_handler.updateNym(nym, txn, isCommitted=False)
+
+    update_verkey(old_signer.verkey)
+    assert authnr.getVerkey(nym) == old_signer.verkey
+    assert authnr.authenticate(msg, nym, old_signer.sign(msg))
+
+    update_verkey(new_signer.verkey)
+    assert authnr.getVerkey(nym) == new_signer.verkey
+    assert authnr.authenticate(msg, nym, new_signer.sign(msg))
+    with pytest.raises(InsufficientCorrectSignatures):
+        authnr.authenticate(msg, nym, old_signer.sign(msg))
+
+    state.revertToHead(state.committedHeadHash)
+    req_handler.onBatchRejected()
+    with pytest.raises(UnknownIdentifier):
+        authnr.getVerkey(nym)
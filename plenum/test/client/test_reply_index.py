@@ -0,0 +1,146 @@
+import pytest
+
+from plenum.client.client import Client
+from plenum.client.reply_index import ReplyIndex
+from plenum.test.testing_utils import FakeSomething
+
+KEY = ('4QxzWk3ajdnEA37NdNU5Kt', 1)
+OTHER_KEY = ('4QxzWk3ajdnEA37NdNU5Kt', 2)
+
+
+def test_messages_indexed_by_request_and_sender():
+    index = ReplyIndex(max_confirmed=10, max_pending=10)
+    assert index.add_reply(KEY, 'Alpha', {'result': 1}) == 1
+    assert index.add_reply(KEY, 'Beta', {'result': 1}) == 2
+    # Same node sending the reply again
+    assert index.add_reply(KEY, 'Beta', {'result': 1}) == 2
+    index.add_reply(OTHER_KEY, 'Alpha', {'result': 2})
+    index.add_ack(KEY, 'Alpha')
+    index.add_nack(OTHER_KEY, 'Beta', 'bad request')
+    index.add_reject(OTHER_KEY, 'Gamma', 'invalid')
+
+    assert index.replies(KEY) == {'Alpha': {'result': 1},
+                                  'Beta': {'result': 1}}
+    assert index.replies(OTHER_KEY) == {'Alpha': {'result': 2}}
+    assert index.acks(KEY) == {'Alpha'}
+    assert index.acks(OTHER_KEY) == set()
+    assert index.nacks(OTHER_KEY) == {'Beta': 'bad request'}
+    assert index.rejects(OTHER_KEY) == {'Gamma': 'invalid'}
+    assert index.pending_count == 2
+    assert KEY in index and OTHER_KEY in index
+    assert ('4QxzWk3ajdnEA37NdNU5Kt', 3) not in index
+
+
+def test_confirmed_request_messages_are_dropped_except_replies():
+    index = ReplyIndex(max_confirmed=10, max_pending=10)
+    index.add_reply(KEY, 'Alpha', {'result': 1})
+    index.add_ack(KEY, 'Alpha')
+    index.confirm(KEY, 1)
+
+    assert index.confirmed(KEY) == 1
+    assert index.replies(KEY) == {'Alpha': {'result': 1}}
+    assert index.acks(KEY) == set()
+    assert index.pending_count == 0
+
+    # Late replies for the confirmed request are kept with the confirmed one,
+    # other late messages are ignored
+    assert index.add_reply(KEY, 'Beta', {'result': 1}) == 2
+    index.add_ack(KEY, 'Beta')
+    assert index.replies(KEY) == {'Alpha': {'result': 1},
+                                  'Beta': {'result': 1}}
+    assert index.acks(KEY) == set()
+    assert index.pending_count == 0
+
+
+def test_confirmed_replies_are_bounded():
+    index = ReplyIndex(max_confirmed=2, max_pending=10)
+    keys = [('idr', req_id) for req_id in range(3)]
+    for key in keys:
+        index.confirm(key, key[1])
+    assert index.confirmed(keys[0]) is None
+    assert index.confirmed(keys[1]) == 1
+    assert index.confirmed(keys[2]) == 2
+    assert index.replies(keys[0]) == {}
+
+
+
+@pytest.mark.parametrize('add', ['add_nack', 'add_reject'])
+def test_failed_request_messages_are_dropped_except_nacks_and_rejects(add):
+    index = ReplyIndex(max_confirmed=10, max_pending=10)
+    index.add_reply(KEY, 'Alpha', {'result': 1})
+    index.add_ack(KEY, 'Alpha')
+    assert getattr(index, add)(KEY, 'Beta', 'invalid') == 1
+    assert getattr(index, add)(KEY, 'Gamma', 'invalid') == 2
+    index.fail(KEY)
+
+    assert index.failed(KEY)
+    assert index.pending_count == 0
+    assert index.replies(KEY) == {}
+    assert index.acks(KEY) == set()
+    failures = index.nacks(KEY) if add == 'add_nack' else index.rejects(KEY)
+    assert failures == {'Beta': 'invalid', 'Gamma': 'invalid'}
+
+    # Late nacks and rejects for the failed request are kept, other late
+    # messages are ignored
+    assert getattr(index, add)(KEY, 'Delta', 'invalid') == 3
+    index.add_reply(KEY, 'Delta', {'result': 1})
+    index.add_ack(KEY, 'Delta')
+    assert index.replies(KEY) == {}
+    assert index.acks(KEY) == set()
+    assert index.pending_count == 0
+
+
+def test_failed_requests_are_bounded():
+    index = ReplyIndex(max_confirmed=2, max_pending=10)
+    keys = [('idr', req_id) for req_id in range(3)]
+    for key in keys:
+        index.add_nack(key, 'Alpha', 'overloaded')
+        index.fail(key)
+    assert keys[0] not in index
+    assert index.nacks(keys[0]) == {}
+    assert index.nacks(keys[2]) == {'Alpha': 'overloaded'}
+
+
+def test_pending_requests_are_bounded():
+    index = ReplyIndex(max_confirmed=10, max_pending=2)
+    keys = [('idr', req_id) for req_id in range(3)]
+    index.add_ack(keys[0], 'Alpha')
+    index.add_nack(keys[1], 'Alpha', 'overloaded')
+    # Receiving a message for a request makes it the most recently used one
+    index.add_reply(keys[0], 'Beta', {'result': 0})
+    index.add_reject(keys[2], 'Alpha', 'invalid')
+
+    assert index.pending_count == 2
+    assert keys[1] not in index
+    assert index.nacks(keys[1]) == {}
+    assert index.acks(keys[0]) == {'Alpha'}
+    assert index.replies(keys[0]) == {'Beta': {'result': 0}}
+    assert index.rejects(keys[2]) == {'Alpha': 'invalid'}
+
+
+def test_client_finds_evicted_confirmed_reply_in_txn_log():
+    txns = {KEY: {'result': 1}}
+    client = FakeSomething(
+        replyIndex=ReplyIndex(max_confirmed=1, max_pending=10),
+        txnLog=FakeSomething(
+            getTxn=lambda identifier, reqId: txns.get((identifier, reqId))))
+    client.replyIndex.confirm(KEY, {'result': 1})
+    client.replyIndex.confirm(OTHER_KEY, {'result': 2})
+    assert client.replyIndex.confirmed(KEY) is None
+
+    assert Client.hasConsensus(client, *KEY) == {'result': 1}
+    assert client.replyIndex.confirmed(KEY) == {'result': 1}
+
+
+def test_client_does_not_read_txn_log_for_pending_request():
+    def get_txn(identifier, reqId):
+        raise AssertionError('txn log read')
+
+    client = FakeSomething(
+        replyIndex=ReplyIndex(max_confirmed=1, max_pending=10),
+        txnLog=FakeSomething(getTxn=get_txn),
+        getRepliesFromAllNodes=lambda identifier, reqId: {})
+    client.replyIndex.add_ack(KEY, 'Alpha')
+
+    with pytest.raises(KeyError):
+        Client.hasConsensus(client, *KEY)
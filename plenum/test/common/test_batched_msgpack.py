@@ -0,0 +1,73 @@
+import pytest
+
+from plenum.common.batched import Batched
+from plenum.common.messages.node_messages import Prepare, Checkpoint
+from plenum.test.testing_utils import FakeSomething
+from stp_zmq.zstack import ZStack
+
+
+class FakeBatchedStack(Batched):
+    serializeMsg = staticmethod(ZStack.serializeMsg)
+    serializeMsgpack = ZStack.serializeMsgpack
+    frameMsgs = ZStack.frameMsgs
+
+    def __init__(self, config):
+        Batched.__init__(self, config)
+        self.remotes = {name: FakeSomething(name=name)
+                        for name in ('Alpha', 'Beta')}
+        self.framingRemotes = {'Beta'}
+        self.msgpackRemotes = {'Beta'}
+        self.messageTimeout = None
+        self.transmitted = []
+
+    def transmit(self, msg, rid, timeout=None, serialized=False):
+        self.transmitted.append((rid, msg))
+
+
+@pytest.fixture()
+def stack():
+    return FakeBatchedStack(FakeSomething(MSG_LEN_LIMIT=10 ** 6,
+                                          BATCH_FRAMING_ENABLED=True,
+                                          NODE_STACK_SERIALIZATION='msgpack'))
+
+
+def prepare():
+    return Prepare(0, 0, 1, 1600000000, 'digest', None, None)
+
+
+def test_msgpack_sent_only_to_accepting_remotes(stack):
+    stack.send(prepare())
+    assert stack.outBoxes['Beta'][0].startswith(ZStack.msgpackPrefix)
+    assert not stack.outBoxes['Alpha'][0].startswith(ZStack.msgpackPrefix)
+    assert ZStack.deserializeMsg(stack.outBoxes['Beta'][0]) == \
+        ZStack.deserializeMsg(stack.outBoxes['Alpha'][0])
+
+
+def test_json_for_other_msgs(stack):
+    stack.send(Checkpoint(0, 0, 1, 1, 'digest'), 'Beta')
+    assert not stack.outBoxes['Beta'][0].startswith(ZStack.msgpackPrefix)
+
+
+@pytest.mark.parametrize('option, value', [('NODE_STACK_SERIALIZATION', 'json'),
+                                           ('BATCH_FRAMING_ENABLED', False)])
+def test_json_if_msgpack_not_enabled(stack, option, value):
+    setattr(stack.stp_config, option, value)
+    stack.send(prepare(), 'Beta')
+    assert not stack.outBoxes['Beta'][0].startswith(ZStack.msgpackPrefix)
+
+
+def test_json_if_remote_does_not_accept_frames(stack):
+    stack.framingRemotes.discard('Beta')
+    stack.send(prepare(), 'Beta')
+    assert not stack.outBoxes['Beta'][0].startswith(ZStack.msgpackPrefix)
+
+
+def test_frames_sent_only_to_accepting_remotes(stack):
+    stack.send(Checkpoint(0, 0, 1, 1, 'digest'))
+    stack.send(Checkpoint(0, 0, 2, 2, 'digest'))
+    stack.flushOutBoxes()
+    batches = dict(stack.transmitted)
+    assert batches['Beta'].startswith(ZStack.batchFramePrefix)
+    assert ZStack.deserializeMsg(batches['Alpha'])['op'] == 'BATCH'
+    assert [m.decode() for m in ZStack.unframeMsgs(batches['Beta'])] == \
+        ZStack.deserializeMsg(batches['Alpha'])['messages']
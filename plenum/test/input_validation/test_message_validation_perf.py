@@ -0,0 +1,86 @@
+import time
+
+import base58
+import pytest
+
+from plenum.common.constants import DOMAIN_LEDGER_ID, \
+    CURRENT_PROTOCOL_VERSION
+from plenum.common.messages.node_messages import Prepare, Commit, \
+    PrePrepare, Propagate
+from plenum.common.types import f
+
+"""
+Compares validation of messages with schemas compiled once against
+validation going through the schema for every message as it was done
+before. Timings can fail on a loaded machine, so the comparison is run
+only when a perf check is required, by setting `SkipTests` to False
+"""
+SkipTests = True
+skipper = pytest.mark.skipif(SkipTests, reason='Perf check is not required')
+
+ROOT = base58.b58encode(b'1' * 32).decode()
+REQUEST = {
+    f.IDENTIFIER.nm: '4QxzWk3ajdnEA37NdNU5Kt',
+    f.REQ_ID.nm: 1,
+    f.SIG.nm: ('2d5xFxNo3TKV8ZcjQxMLaXh7uKbN3ZL4jDZGW4DbmV1YSDtw'
+               'YFnBXNwpLRSNrTr2GJ6HrcW4Xh8sb9ckmUngRwpz'),
+    f.PROTOCOL_VERSION.nm: CURRENT_PROTOCOL_VERSION,
+    'operation': {'type': 'buy', 'amount': 1},
+}
+MESSAGES = [
+    (Prepare, {f.INST_ID.nm: 0, f.VIEW_NO.nm: 1, f.PP_SEQ_NO.nm: 10,
+               f.PP_TIME.nm: 1499906903, f.DIGEST.nm: 'digest',
+               f.STATE_ROOT.nm: ROOT, f.TXN_ROOT.nm: ROOT}),
+    (Commit, {f.INST_ID.nm: 0, f.VIEW_NO.nm: 1, f.PP_SEQ_NO.nm: 10}),
+    (PrePrepare, {f.INST_ID.nm: 0, f.VIEW_NO.nm: 1, f.PP_SEQ_NO.nm: 10,
+                  f.PP_TIME.nm: 1499906903,
+                  f.REQ_IDR.nm: ['4QxzWk3ajdnEA37NdNU5Kt1'] * 10,
+                  f.DISCARDED.nm: 0, f.DIGEST.nm: 'digest',
+                  f.LEDGER_ID.nm: DOMAIN_LEDGER_ID,
+                  f.STATE_ROOT.nm: ROOT, f.TXN_ROOT.nm: ROOT}),
+    (Propagate, {f.REQUEST.nm: REQUEST, f.SENDER_CLIENT.nm: 'client'}),
+]
+
+
+def validate_with_schema_traversal(validator, dct):
+    # Validation of fields as it was done before schemas were compiled
+    schema = validator.schema
+    schema_dct = dict(schema)
+    required_fields = filter(lambda x: not x[1].optional, schema)
+    required_field_names = map(lambda x: x[0], required_fields)
+    assert not set(required_field_names) - set(dct)
+    for k, v in dct.items():
+        if k not in schema_dct:
+            assert not validator.schema_is_strict
+        elif hasattr(schema_dct[k], 'schema'):
+            validate_with_schema_traversal(schema_dct[k], v)
+        else:
+            assert not schema_dct[k].validate(v)
+
+
+def time_per_message(validate, count=2000):
+    start = time.perf_counter()
+    for _ in range(count):
+        validate()
+    return (time.perf_counter() - start) / count
+
+
+@pytest.mark.parametrize('msg_class, fields', MESSAGES,
+                         ids=[m.__name__ for m, _ in MESSAGES])
+def test_compiled_schema_validates_same_messages(msg_class, fields):
+    msg = msg_class(**fields)
+    validate_with_schema_traversal(msg, fields)
+    assert dict(msg.items()) == fields
+
+
+@skipper
+@pytest.mark.parametrize('msg_class, fields', MESSAGES,
+                         ids=[m.__name__ for m, _ in MESSAGES])
+def test_compiled_schema_validation_is_faster(msg_class, fields):
+    msg = msg_class(**fields)
+    compiled = time_per_message(lambda: msg.validate(fields))
+    traversed = time_per_message(
+        lambda: validate_with_schema_traversal(msg, fields))
+    print('{}: {:.2f} us compiled, {:.2f} us traversing schema'.format(
+        msg_class.__name__, compiled * 1e6, traversed * 1e6))
+    assert compiled < traversed
@@ -0,0 +1,25 @@
+from plenum.server.monitor import LatencyWindow
+
+
+def test_latency_window_averages_latencies_in_window():
+    window = LatencyWindow(window_size=10)
+    assert window.avg(0) == 0
+
+    window.add(1, 2.0)
+    window.add(5, 4.0)
+    window.add(8, 6.0)
+    assert len(window) == 3
+    assert window.avg(8) == 4.0
+
+    # Latencies older than the window are dropped
+    assert window.avg(12) == 5.0
+    assert list(window) == [(5, 4.0), (8, 6.0)]
+    assert window.avg(20) == 0
+    assert len(window) == 0
+
+
+def test_latency_window_is_trimmed_on_add():
+    window = LatencyWindow(window_size=10)
+    for t in range(1000):
+        window.add(t, 1.0)
+    assert len(window) == 11
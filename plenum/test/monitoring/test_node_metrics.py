@@ -0,0 +1,90 @@
+import pytest
+
+from plenum.server.metrics import LatencyHistogram, WindowedHistogram, \
+    WindowedCounter, NodeMetrics
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(sub_buckets=16)
+    for i in range(1, 1001):
+        histogram.record(i / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(0.5005)
+    assert histogram.max == 1.0
+    # Percentiles are kept with relative error of 1 / sub_buckets
+    for q in (50, 90, 99):
+        assert histogram.percentile(q) == \
+            pytest.approx(q / 100, rel=1 / 16)
+    assert histogram.percentile(100) == 1.0
+
+
+def test_latency_histogram_memory_is_bounded():
+    histogram = LatencyHistogram(lowest=1e-4, highest=1e4, sub_buckets=16)
+    for i in range(100000):
+        histogram.record(i * 0.37)
+    histogram.record(1e-9)
+    histogram.record(1e9)
+    # 27 powers of two between 1e-4 and 1e4
+    assert len(histogram.counts) <= 28 * 16 + 1
+    assert histogram.count == 100002
+
+
+def test_windowed_histogram_forgets_old_latencies():
+    windowed = WindowedHistogram(window_size=60, buckets=6)
+    windowed.record(1.0, now=0)
+    windowed.record(2.0, now=30)
+    assert windowed.histogram(now=59).count == 2
+
+    assert windowed.histogram(now=75).count == 1
+    assert windowed.histogram(now=75).max == 2.0
+    assert windowed.histogram(now=200).count == 0
+
+
+def test_windowed_counter():
+    counter = WindowedCounter(window_size=60, buckets=6)
+    for t in range(100):
+        counter.add(t % 7, now=t)
+    stats = counter.stats(now=100)
+    assert stats['count'] == 60
+    assert stats['max'] == 6
+    assert stats['last'] == 99 % 7
+    assert stats['rate'] == pytest.approx(stats['sum'] / 60)
+
+
+def test_node_metrics_per_instance_and_client(tconf):
+    metrics = NodeMetrics(tconf)
+    metrics.add_instance()
+    metrics.add_instance()
+
+    for i in range(20):
+        metrics.request_ordered(0, 'cli', 0.5, now=i, by_master=True)
+        metrics.request_ordered(1, 'cli', 0.2, now=i, by_master=False)
+    metrics.phase_completed(NodeMetrics.PREPARE_PHASE, 0.1, now=1)
+    metrics.count(NodeMetrics.CATCHUP_TXNS, 5, now=1)
+    metrics.sample_queue_depths({'client_inbox': 3}, now=1)
+
+    assert metrics.client_avg_latencies[0].get_avg_latency('cli') > \
+        metrics.client_avg_latencies[1].get_avg_latency('cli')
+    assert metrics.client_summary('cli')['count'] == 20
+    summary = metrics.summary(now=20)
+    assert summary['ordering_latency'][0]['p99'] == pytest.approx(0.5)
+    assert summary['ordering_latency'][1]['p99'] == pytest.approx(0.2)
+    assert summary['phase_latency'][NodeMetrics.PREPARE_PHASE]['count'] == 1
+    assert summary['counters'][NodeMetrics.ORDERED_REQUESTS]['sum'] == 20
+    assert summary['counters'][NodeMetrics.CATCHUP_TXNS]['sum'] == 5
+    assert summary['counters']['queue_depth.client_inbox']['last'] == 3
+
+    metrics.remove_instance(0)
+    assert len(metrics.throughputs) == 1
+    assert metrics.summary(now=20)['ordering_latency'][0]['p99'] == \
+        pytest.approx(0.2)
+
+
+def test_node_metrics_keep_latencies_of_recent_clients(tconf, monkeypatch):
+    monkeypatch.setattr(tconf, 'METRICS_MAX_CLIENTS', 3)
+    metrics = NodeMetrics(tconf)
+    metrics.add_instance()
+    for cli in ('cli1', 'cli2', 'cli3', 'cli1', 'cli4'):
+        metrics.request_ordered(0, cli, 0.5, now=0, by_master=True)
+    assert list(metrics.client_latencies) == ['cli3', 'cli1', 'cli4']
@@ -97,3 +97,31 @@ def test_request_tracker_performs_garbage_collection_on_remove_instance():
 
     req_tracker.remove_instance(2)
     assert digest not in req_tracker
+
+
+def test_request_tracker_keeps_unordered_requests_by_state_in_start_order():
+    req_tracker = RequestTimeTracker(INSTANCE_COUNT)
+    for i, digest in enumerate(["d1", "d2", "d3", "d4"]):
+        req_tracker.start(digest, 1.0 + i)
+
+    req_tracker.handle("d3")
+    req_tracker.handle("d1")
+    assert list(req_tracker.unhandled_unordered()) == [("d2", 2.0), ("d4", 4.0)]
+    assert list(req_tracker.handled_unordered()) == [("d3", 3.0), ("d1", 1.0)]
+    assert req_tracker.is_handled_unordered("d1")
+    assert not req_tracker.is_handled_unordered("d2")
+
+    req_tracker.order(0, "d1", 5.0)
+    req_tracker.order(0, "d2", 5.0)
+    req_tracker.order(1, "d4", 5.0)
+    assert list(req_tracker.unhandled_unordered()) == [("d4", 4.0)]
+    assert list(req_tracker.handled_unordered()) == [("d3", 3.0)]
+    assert not req_tracker.is_handled_unordered("d1")
+
+    # States of requests follow the instance becoming master
+    req_tracker.remove_instance(0)
+    assert list(req_tracker.unhandled_unordered()) == [("d2", 2.0)]
+    assert list(req_tracker.handled_unordered()) == [("d1", 1.0), ("d3", 3.0)]
+
+    req_tracker.reset()
+    assert not list(req_tracker.handled_unordered())
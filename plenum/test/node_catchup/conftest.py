@@ -95,7 +95,6 @@ def sdk_new_node_caught_up(txnPoolNodeSet,
 
     for li in new_node.ledgerManager.ledgerRegistry.values():
         assert not li.receivedCatchUpReplies
-        assert not li.recvdCatchupRepliesFrm
 
     return new_node
 
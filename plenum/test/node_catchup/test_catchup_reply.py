@@ -1,55 +1,97 @@
-def test_catchup_reply_merge(txnPoolNodeSet):
+from plenum.common.constants import DOMAIN_LEDGER_ID
+from plenum.common.ledger_info import CatchupRepliesBuffer
+from plenum.common.messages.node_messages import CatchupRep
+
+
+def add_reply(buffer, frm, seq_nos, txn=None):
+    txns = [(i, txn or {'seq': i, 'frm': frm}) for i in seq_nos]
+    rep = CatchupRep(DOMAIN_LEDGER_ID, {str(s): t for s, t in txns}, [])
+    buffer.add(frm, rep, txns)
+
+
+def test_catchup_reply_merge():
     """
-    Testing LedgerManager's `_get_merged_catchup_txns`
+    Testing merging of transactions in `CatchupRepliesBuffer`
     """
-    ledger_manager = txnPoolNodeSet[0].ledgerManager
-
     # Without overlap
-    existing_txns = [(i, {}) for i in range(1, 11)]
-    new_txns = [(i, {}) for i in range(11, 16)]
-    merged = ledger_manager._get_merged_catchup_txns(existing_txns, new_txns)
-    assert [(i, {}) for i in range(1, 16)] == merged
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 11))
+    add_reply(buffer, 'Beta', range(11, 16))
+    assert [s for s, _ in buffer] == list(range(1, 16))
 
-    # With partial overlap
-    existing_txns = [(i, {}) for i in range(1, 13)]
-    new_txns = [(i, {}) for i in range(11, 16)]
-    merged = ledger_manager._get_merged_catchup_txns(existing_txns, new_txns)
-    assert [(i, {}) for i in range(1, 16)] == merged
+    # With partial overlap, already received transactions are kept
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 13))
+    add_reply(buffer, 'Beta', range(11, 16))
+    assert [s for s, _ in buffer] == list(range(1, 16))
+    assert [t['frm'] for _, t in buffer.txns(11, 13)] == ['Alpha', 'Alpha', 'Beta']
 
     # With complete overlap
-    existing_txns = [(i, {}) for i in range(1, 21)]
-    new_txns = [(i, {}) for i in range(11, 16)]
-    merged = ledger_manager._get_merged_catchup_txns(existing_txns, new_txns)
-    assert [(i, {}) for i in range(1, 21)] == merged
-
-    # existing_txns has a gap and new_txns overlap partially with an interval
-    # in existing_txns
-    existing_txns = [(i, {}) for i in range(1, 11)] + [(i, {})
-                                                       for i in range(20, 41)]
-    new_txns = [(i, {}) for i in range(15, 29)]
-    merged = ledger_manager._get_merged_catchup_txns(existing_txns, new_txns)
-    assert ([(i, {}) for i in range(1, 11)] +
-            [(i, {}) for i in range(15, 41)]) == merged
-
-    # existing_txns has a gap and new_txns overlap completely with an interval
-    # in existing_txns
-    existing_txns = [(i, {}) for i in range(1, 11)] + \
-                    [(i, {}) for i in range(20, 31)] + \
-                    [(i, {}) for i in range(41, 51)]
-    new_txns = [(i, {}) for i in range(15, 33)]
-    merged = ledger_manager._get_merged_catchup_txns(existing_txns, new_txns)
-    assert ([(i, {}) for i in range(1, 11)] +
-            [(i, {}) for i in range(15, 33)] +
-            [(i, {}) for i in range(41, 51)]) == merged
-
-    # existing_txns has a gap and new_txns overlap completely with multiple
-    # intervals in existing_txns
-    existing_txns = [(i, {}) for i in range(1, 11)] + \
-                    [(i, {}) for i in range(20, 31)] + \
-                    [(i, {}) for i in range(41, 51)] + \
-                    [(i, {}) for i in range(61, 95)]
-    new_txns = [(i, {}) for i in range(15, 56)]
-    merged = ledger_manager._get_merged_catchup_txns(existing_txns, new_txns)
-    assert ([(i, {}) for i in range(1, 11)] +
-            [(i, {}) for i in range(15, 56)] +
-            [(i, {}) for i in range(61, 95)]) == merged
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 21))
+    add_reply(buffer, 'Beta', range(11, 16))
+    assert [s for s, _ in buffer] == list(range(1, 21))
+    assert {t['frm'] for _, t in buffer} == {'Alpha'}
+
+    # existing transactions have a gap and new ones overlap partially with
+    # an interval
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 11))
+    add_reply(buffer, 'Beta', range(20, 41))
+    add_reply(buffer, 'Gamma', range(15, 29))
+    assert [s for s, _ in buffer] == list(range(1, 11)) + list(range(15, 41))
+
+    # existing transactions have gaps and new ones overlap completely with
+    # an interval
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 11))
+    add_reply(buffer, 'Beta', range(20, 31))
+    add_reply(buffer, 'Gamma', range(41, 51))
+    add_reply(buffer, 'Delta', range(15, 33))
+    assert [s for s, _ in buffer] == \
+        list(range(1, 11)) + list(range(15, 33)) + list(range(41, 51))
+
+    # existing transactions have gaps and new ones overlap with multiple
+    # intervals
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 11))
+    add_reply(buffer, 'Beta', range(20, 31))
+    add_reply(buffer, 'Gamma', range(41, 51))
+    add_reply(buffer, 'Delta', range(61, 95))
+    add_reply(buffer, 'Alpha', range(15, 56))
+    assert [s for s, _ in buffer] == \
+        list(range(1, 11)) + list(range(15, 56)) + list(range(61, 95))
+    assert len(buffer) == 10 + 41 + 34
+
+
+def test_catchup_reply_lookup_and_removal():
+    buffer = CatchupRepliesBuffer()
+    add_reply(buffer, 'Alpha', range(1, 11))
+    add_reply(buffer, 'Beta', range(11, 21))
+    add_reply(buffer, 'Gamma', range(5, 16))
+
+    assert buffer.reply_with(21) is None
+    start, end, frm, _, _ = buffer.reply_with(3)
+    assert (start, end, frm) == (1, 10, 'Alpha')
+    assert buffer.reply_with(12)[2] in ('Beta', 'Gamma')
+
+    # Transactions of a reply are its own ones, not the first received
+    entry = buffer.reply_with(7)
+    txns = buffer.reply_txns(entry, 7)
+    assert [s for s, _ in txns] == list(range(7, entry[1] + 1))
+    assert {t['frm'] for _, t in txns} == {entry[2]}
+
+    buffer.remove_till(10)
+    assert [s for s, _ in buffer] == list(range(11, 21))
+    assert [e[2] for e in buffer._replies] == ['Gamma', 'Beta']
+
+    # Transactions of an invalid reply are replaced by the ones of other
+    # replies for the same range
+    gamma, beta = buffer._replies
+    buffer.remove_reply(beta)
+    assert [s for s, _ in buffer] == list(range(11, 16))
+    assert {t['frm'] for _, t in buffer} == {'Gamma'}
+    assert buffer.reply_with(11) == gamma
+
+    buffer.remove_reply(gamma)
+    assert not buffer
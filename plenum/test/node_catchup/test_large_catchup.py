@@ -1,6 +1,6 @@
 import pytest
 
-from plenum.common.messages.node_messages import CatchupRep
+from plenum.common.constants import DOMAIN_LEDGER_ID
 from plenum.common.config_helper import PNodeConfigHelper
 from plenum.test.pool_transactions.helper import \
     disconnect_node_and_ensure_disconnected
@@ -13,19 +13,11 @@ TestRunningTimeLimitSec = 125
 
 
 def decrease_max_request_size(node):
-    old = node.nodestack.prepare_for_sending
-
-    def prepare_for_sending(msg, signer, message_splitter=lambda x: None):
-        if isinstance(msg, CatchupRep):
-            node.nodestack.prepare_for_sending = old
-            part_bytes = node.nodestack.sign_and_serialize(msg, signer)
-            # Decrease at least 6 times to increase probability of
-            # unintentional shuffle
-            new_limit = len(part_bytes) // 6
-            node.nodestack.msg_len_val = MessageLenValidator(new_limit)
-        return old(msg, signer, message_splitter)
-
-    node.nodestack.prepare_for_sending = prepare_for_sending
+    # Decrease at least 6 times the size of the domain ledger catchup reply
+    # to increase probability of unintentional shuffle
+    ledger = node.getLedger(DOMAIN_LEDGER_ID)
+    txns_len = sum(len(txn) for _, txn in ledger.get_serialized_txns())
+    node.nodestack.msg_len_val = MessageLenValidator(txns_len // 6)
 
 
 @pytest.fixture(scope="module")
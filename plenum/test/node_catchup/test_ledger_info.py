@@ -1,14 +1,22 @@
+import copy
+import os
 import time
 
 import pytest
 
+from ledger.compact_merkle_tree import CompactMerkleTree
+from ledger.hash_stores.file_hash_store import FileHashStore
 from ledger.test.helper import random_txn, create_ledger
 
 # noinspection PyUnresolvedReferences
 from ledger.test.conftest import tempdir, txn_serializer, hash_serializer  # noqa
+from plenum.common.constants import DOMAIN_LEDGER_ID
+from plenum.common.ledger import Ledger
 from plenum.common.ledger_info import LedgerInfo
 from plenum.common.ledger_manager import LedgerManager
-from plenum.common.messages.node_messages import ConsistencyProof
+from plenum.common.messages.node_messages import ConsistencyProof, CatchupRep
+from plenum.common.txn_util import init_empty_txn, append_payload_metadata
+from plenum.test.testing_utils import FakeSomething
 
 
 @pytest.yield_fixture(
@@ -67,3 +75,113 @@ def test_missing_txn_request(ledger_no_genesis):
 
     ledger_info.receivedCatchUpReplies = [(i, {}) for i in range(26, 31)]
     assert LedgerManager._missing_txns(ledger_info) == (True, 5)
+
+
+def test_catchup_replies_applied_in_bulk(tdir_for_func):
+    """
+    Testing LedgerManager's `_processCatchupReplies`
+    """
+    def make_ledger(name):
+        data_dir = os.path.join(tdir_for_func, name)
+        return Ledger(
+            CompactMerkleTree(hashStore=FileHashStore(dataDir=data_dir)),
+            dataDir=data_dir)
+
+    source = make_ledger('source')
+    target = make_ledger('target')
+    txns = []
+    for i in range(30):
+        txn = init_empty_txn('buy')
+        append_payload_metadata(txn, frm='cli{}'.format(i), req_id=i + 1)
+        txns.append(txn)
+        source.add(txn)
+    target.add_txns(copy.deepcopy(txns[:10]))
+
+    added = []
+    ledger_manager = LedgerManager(FakeSomething(name='fake'),
+                                   ownedByNode=False)
+    ledger_manager.addLedger(
+        DOMAIN_LEDGER_ID, target,
+        postTxnsAddedToLedgerClbk=lambda lid, txns: added.append(len(txns)))
+    ledger_info = ledger_manager.getLedgerInfoByType(DOMAIN_LEDGER_ID)
+    ledger_info.catchUpTill = ConsistencyProof(
+        DOMAIN_LEDGER_ID, 10, 30, 1, 1,
+        target.root_hash, source.root_hash,
+        [])
+
+    def reply(start, end):
+        rep_txns = [(s, copy.deepcopy(txns[s - 1])) for s in range(start, end + 1)]
+        rep = CatchupRep(DOMAIN_LEDGER_ID,
+                         {str(s): t for s, t in rep_txns},
+                         ledger_manager._make_consistency_proof(source, end, 30))
+        return rep, rep_txns
+
+    buffer = ledger_info.receivedCatchUpReplies
+    rep, rep_txns = reply(21, 30)
+    buffer.add('Beta', rep, rep_txns)
+    assert ledger_manager._processCatchupReplies(
+        DOMAIN_LEDGER_ID, target, buffer) == 0
+    assert target.size == 10
+
+    rep, rep_txns = reply(11, 20)
+    buffer.add('Alpha', rep, rep_txns)
+    assert ledger_manager._processCatchupReplies(
+        DOMAIN_LEDGER_ID, target, buffer) == 20
+    assert added == [10, 10]
+    assert not buffer
+    assert target.size == 30
+    assert target.root_hash == source.root_hash
+
+
+@pytest.mark.parametrize('invalid', ['Alpha', 'Beta'])
+def test_only_sender_of_invalid_catchup_reply_is_blacklisted(tdir_for_func,
+                                                             invalid):
+    def make_ledger(name):
+        data_dir = os.path.join(tdir_for_func, name)
+        return Ledger(
+            CompactMerkleTree(hashStore=FileHashStore(dataDir=data_dir)),
+            dataDir=data_dir)
+
+    source = make_ledger('source')
+    target = make_ledger('target')
+    txns = []
+    for i in range(20):
+        txn = init_empty_txn('buy')
+        append_payload_metadata(txn, frm='cli{}'.format(i), req_id=i + 1)
+        txns.append(txn)
+        source.add(txn)
+    target.add_txns(copy.deepcopy(txns[:10]))
+
+    blacklisted = []
+    owner = FakeSomething(
+        name='fake',
+        blacklistNode=lambda name, reason: blacklisted.append(name),
+        transform_txn_for_ledger=lambda txn: txn)
+    ledger_manager = LedgerManager(owner, ownedByNode=True)
+    ledger_manager.addLedger(DOMAIN_LEDGER_ID, target,
+                             postTxnsAddedToLedgerClbk=lambda lid, txns: None)
+    ledger_info = ledger_manager.getLedgerInfoByType(DOMAIN_LEDGER_ID)
+    ledger_info.catchUpTill = ConsistencyProof(
+        DOMAIN_LEDGER_ID, 10, 20, 1, 1,
+        target.root_hash, source.root_hash,
+        [])
+
+    def reply(tamper=False):
+        rep_txns = [(s, copy.deepcopy(txns[s - 1])) for s in range(11, 21)]
+        if tamper:
+            append_payload_metadata(rep_txns[0][1], frm='evil', req_id=1)
+        rep = CatchupRep(DOMAIN_LEDGER_ID,
+                         {str(s): t for s, t in rep_txns},
+                         ledger_manager._make_consistency_proof(source, 20, 20))
+        return rep, rep_txns
+
+    # Both replies have the same range, the one received last is verified
+    # first with its own transactions
+    buffer = ledger_info.receivedCatchUpReplies
+    for frm in ('Alpha', 'Beta'):
+        buffer.add(frm, *reply(tamper=frm == invalid))
+    assert ledger_manager._processCatchupReplies(
+        DOMAIN_LEDGER_ID, target, buffer) == 10
+    assert blacklisted == (['Beta'] if invalid == 'Beta' else [])
+    assert not buffer
+    assert target.root_hash == source.root_hash
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from ledger.compact_merkle_tree import CompactMerkleTree
+from ledger.hash_stores.file_hash_store import FileHashStore
+from ledger.merkle_verifier import MerkleVerifier
+from plenum.common.constants import DOMAIN_LEDGER_ID, OP_FIELD_NAME, \
+    CATCHUP_REP, POOL_LEDGER_ID
+from plenum.common.ledger import Ledger
+from plenum.common.ledger_manager import LedgerManager
+from plenum.common.messages.node_messages import CatchupReq, CatchupRep
+from plenum.common.txn_util import init_empty_txn, append_payload_metadata
+from plenum.server.node import Node
+from plenum.test.testing_utils import FakeSomething
+from stp_core.validators.message_length_validator import \
+    MessageLenValidator
+from stp_zmq.zstack import ZStack
+
+TXNS_COUNT = 100
+
+
+@pytest.fixture()
+def ledger(tdir_for_func):
+    data_dir = os.path.join(tdir_for_func, 'domain')
+    ledger = Ledger(
+        CompactMerkleTree(hashStore=FileHashStore(dataDir=data_dir)),
+        dataDir=data_dir)
+    for i in range(TXNS_COUNT):
+        txn = init_empty_txn('buy')
+        append_payload_metadata(txn, frm='cli{}'.format(i), req_id=i + 1)
+        ledger.add(txn)
+    return ledger
+
+
+@pytest.fixture()
+def sent():
+    return []
+
+
+@pytest.fixture()
+def ledger_manager(ledger, sent, tconf, monkeypatch):
+    nodestack = FakeSomething(
+        msgpackPrefix=ZStack.msgpackPrefix,
+        msg_len_val=MessageLenValidator(2000),
+        isConnectedTo=lambda name: name == 'Beta',
+        getRemote=lambda name: FakeSomething(uid=1),
+        accepts_msgpack=lambda op, rid: True,
+        send_serialized=lambda parts, *rids: sent.extend(parts),
+    )
+    owner = FakeSomething(name='Alpha',
+                          nodestack=nodestack,
+                          has_txns_with_extra_data=lambda ledger_id: False)
+    monkeypatch.setattr(tconf, 'CATCHUP_TXNS_SERVED_PER_PROD', 20)
+    ledger_manager = LedgerManager(owner)
+    ledger_manager.config = tconf
+    ledger_manager.addLedger(DOMAIN_LEDGER_ID, ledger)
+    return ledger_manager
+
+
+def test_catchup_served_from_stored_txns_in_turns(ledger_manager, ledger,
+                                                  sent):
+    ledger_manager.processCatchupReq(
+        CatchupReq(DOMAIN_LEDGER_ID, 11, 90, TXNS_COUNT), 'Beta')
+    assert not sent
+
+    # Replies are sent on each call till CATCHUP_TXNS_SERVED_PER_PROD
+    # transactions are sent
+    served = 0
+    while True:
+        count = ledger_manager.service()
+        if count == 0:
+            break
+        assert count < 40
+        served += count
+    assert served == 80
+    assert len(sent) > 4
+
+    verifier = MerkleVerifier()
+    seq_no = 11
+    for frame in sent:
+        assert len(frame) <= 2000
+        msg = ZStack.deserializeMsg(frame)
+        assert msg.pop(OP_FIELD_NAME) == CATCHUP_REP
+        rep = CatchupRep(**msg)
+        txns = sorted((int(s), t) for s, t in rep.txns.items())
+        assert [s for s, _ in txns] == \
+            list(range(seq_no, seq_no + len(txns)))
+        for s, txn in txns:
+            assert ledger.txn_serializer.serialize(txn) == \
+                ledger.txn_serializer.serialize(ledger.getBySeqNo(s))
+        seq_no += len(txns)
+        assert verifier.verify_tree_consistency(
+            seq_no - 1, TXNS_COUNT,
+            ledger.tree.merkle_tree_hash(0, seq_no - 1),
+            ledger.tree.root_hash,
+            [Ledger.strToHash(p) for p in rep.consProof])
+    assert seq_no == 91
+
+
+def test_catchup_serving_stops_on_disconnection(ledger_manager, sent):
+    ledger_manager.processCatchupReq(
+        CatchupReq(DOMAIN_LEDGER_ID, 1, 50, TXNS_COUNT), 'Beta')
+    assert ledger_manager.service() > 0
+    sent_count = len(sent)
+
+    ledger_manager.owner.nodestack.isConnectedTo = lambda name: False
+    while ledger_manager.service():
+        pass
+    assert len(sent) == sent_count
+
+
+def test_ledgers_with_extra_data_of_node():
+    class ExtraDataNode(Node):
+        def update_txn_with_extra_data(self, txn):
+            return txn
+
+    class DomainExtraDataNode(ExtraDataNode):
+        ledgers_with_extra_data = {DOMAIN_LEDGER_ID}
+
+    # Nodes are not started, only the class matters
+    node = Node.__new__(Node)
+    assert not node.has_txns_with_extra_data(DOMAIN_LEDGER_ID)
+    node = ExtraDataNode.__new__(ExtraDataNode)
+    assert node.has_txns_with_extra_data(DOMAIN_LEDGER_ID)
+    assert node.has_txns_with_extra_data(POOL_LEDGER_ID)
+    node = DomainExtraDataNode.__new__(DomainExtraDataNode)
+    assert node.has_txns_with_extra_data(DOMAIN_LEDGER_ID)
+    assert not node.has_txns_with_extra_data(POOL_LEDGER_ID)
@@ -0,0 +1,130 @@
+import pytest
+
+from plenum.common.constants import NYM, ROLE, STEWARD, TARGET_NYM, TRUSTEE
+from plenum.common.txn_util import init_empty_txn, set_payload_data, \
+    append_payload_metadata, append_txn_metadata
+from plenum.persistence.role_index import RoleIndex
+from plenum.server.domain_req_handler import DomainRequestHandler
+from state.pruning_state import PruningState
+from storage.kv_in_memory import KeyValueStorageInMemory
+
+
+class FakeLedger:
+    def __init__(self, txns=()):
+        self.txns = list(txns)
+
+    @property
+    def size(self):
+        return len(self.txns)
+
+    def getAllTxn(self, frm: int = None, to: int = None):
+        frm = frm or 1
+        for seq_no, txn in enumerate(self.txns[frm - 1:], start=frm):
+            yield seq_no, txn
+
+
+def nym_txn(seq_no, role=None):
+    txn = init_empty_txn(NYM)
+    data = {TARGET_NYM: 'nym{}'.format(seq_no)}
+    if role is not None:
+        data[ROLE] = role
+    set_payload_data(txn, data)
+    append_payload_metadata(txn, frm='submitter')
+    append_txn_metadata(txn, seq_no=seq_no, txn_time=seq_no)
+    return txn
+
+
+@pytest.fixture()
+def role_index():
+    return RoleIndex(KeyValueStorageInMemory())
+
+
+def test_uncommitted_counts(role_index):
+    role_index.add(STEWARD)
+    role_index.add(STEWARD)
+    assert role_index.count(STEWARD) == 2
+    assert role_index.count(STEWARD, is_committed=True) == 0
+
+    role_index.on_batch_created(b'root1')
+    role_index.on_batch_committed()
+    assert role_index.count(STEWARD, is_committed=True) == 2
+
+
+def test_rejected_batch_not_counted(role_index):
+    role_index.add(STEWARD)
+    role_index.on_batch_created(b'root1')
+    role_index.add(STEWARD)
+    role_index.on_batch_created(b'root2')
+    assert role_index.count(STEWARD) == 2
+
+    role_index.on_batch_rejected()
+    assert role_index.count(STEWARD) == 1
+    role_index.on_batch_committed()
+    assert role_index.count(STEWARD, is_committed=True) == 1
+
+
+def test_handler_rebuilds_missing_index():
+    ledger = FakeLedger([nym_txn(1, STEWARD), nym_txn(2),
+                         nym_txn(3, TRUSTEE), nym_txn(4, STEWARD)])
+    role_index = RoleIndex(KeyValueStorageInMemory())
+    handler = DomainRequestHandler(ledger, PruningState(KeyValueStorageInMemory()),
+                                   None, [], None, role_index=role_index)
+    assert handler.countStewards() == 2
+    assert role_index.count(TRUSTEE, is_committed=True) == 1
+    assert role_index.last_seq_no(is_committed=True) == 4
+
+
+def test_handler_does_not_count_replayed_txns():
+    txns = [nym_txn(1, STEWARD), nym_txn(2, STEWARD)]
+    handler = DomainRequestHandler(FakeLedger(txns),
+                                   PruningState(KeyValueStorageInMemory()),
+                                   None, [], None,
+                                   role_index=RoleIndex(KeyValueStorageInMemory()))
+    # State recreated from the ledger
+    handler.updateState(txns, isCommitted=True)
+    assert handler.countStewards() == 2
+
+    handler.updateState([nym_txn(3, STEWARD)], isCommitted=True)
+    assert handler.countStewards() == 3
+
+
+def test_handler_count_follows_batches():
+    handler = DomainRequestHandler(FakeLedger(),
+                                   PruningState(KeyValueStorageInMemory()),
+                                   None, [], None,
+                                   role_index=RoleIndex(KeyValueStorageInMemory()))
+    handler.updateState([nym_txn(1, STEWARD)])
+    handler.onBatchCreated(b'root1')
+    handler.updateState([nym_txn(2, STEWARD)])
+    handler.onBatchCreated(b'root2')
+    assert handler.countStewards() == 2
+
+    handler.onBatchRejected()
+    assert handler.countStewards() == 1
+
+
+def test_discarded_batch_keeps_created_batches(role_index):
+    role_index.add(STEWARD)
+    role_index.on_batch_created(b'root1')
+    # PRE-PREPARE applied and reverted before its batch is created
+    role_index.add(STEWARD)
+    role_index.on_batch_discarded()
+    assert role_index.count(STEWARD) == 1
+
+    role_index.on_batch_committed()
+    assert role_index.count(STEWARD, is_committed=True) == 1
+
+
+def test_handler_count_after_discarded_batch():
+    handler = DomainRequestHandler(FakeLedger(),
+                                   PruningState(KeyValueStorageInMemory()),
+                                   None, [], None,
+                                   role_index=RoleIndex(KeyValueStorageInMemory()))
+    handler.updateState([nym_txn(1, STEWARD)])
+    handler.onBatchCreated(b'root1')
+    handler.updateState([nym_txn(2, STEWARD)])
+    handler.onBatchDiscarded()
+    assert handler.countStewards() == 1
+
+    handler.onBatchRejected()
+    assert handler.countStewards() == 0
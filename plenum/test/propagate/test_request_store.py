@@ -0,0 +1,66 @@
+from plenum.common.constants import CURRENT_PROTOCOL_VERSION
+from plenum.common.request import Request
+from plenum.server.propagator import Requests
+from plenum.server.quorums import Quorums
+
+
+def make_request(req_id=1):
+    return Request(identifier='4QxzWk3ajdnEA37NdNU5Kt', reqId=req_id,
+                   operation={'type': 'buy', 'amount': req_id},
+                   signature='sig', protocolVersion=CURRENT_PROTOCOL_VERSION)
+
+
+def test_propagates_of_same_request_share_it():
+    requests = Requests()
+    request = make_request()
+    requests.add_propagate(request, 'Alpha')
+
+    req_dict = dict(request.as_dict)
+    stored = requests.stored_request(req_dict)
+    assert stored is request
+    requests.add_propagate(stored, 'Beta')
+    requests.add_propagate(make_request(), 'Gamma')
+
+    state = requests[request.key]
+    assert state.request is request
+    assert len(state.propagates) == 3
+    assert requests.votes(request) == 3
+    assert 'Beta' in state.propagates
+    assert 'Delta' not in state.propagates
+    assert list(state.propagates) == ['Alpha', 'Beta', 'Gamma']
+    assert requests.has_propagated(request, 'Gamma')
+
+    req_dict['signature'] = 'other'
+    assert requests.stored_request(req_dict) is None
+    assert requests.stored_request(make_request(2).as_dict) is None
+
+
+def test_quorum_of_propagates():
+    requests = Requests()
+    quorum = Quorums(4).propagate
+    request = make_request()
+    requests.add_propagate(request, 'Alpha')
+    # Senders with non-str names are not counted in quorum
+    requests.add_propagate(request, b'Beta')
+    assert requests.req_with_acceptable_quorum(request, quorum) is None
+
+    requests.add_propagate(request, 'Gamma')
+    assert requests.req_with_acceptable_quorum(request, quorum) is request
+
+    # Indices of nodes are shared between requests
+    other = make_request(2)
+    requests.add_propagate(other, 'Gamma')
+    assert list(requests[other.key].propagates) == ['Gamma']
+
+
+def test_stored_request_is_forgotten_once_freed():
+    requests = Requests()
+    request = make_request()
+    requests.add_propagate(request, 'Alpha')
+    requests.mark_as_forwarded(request, 1)
+    requests.mark_as_executed(request)
+    requests.free(request.key)
+
+    assert request.key not in requests
+    assert requests.stored_request(request.as_dict) is None
+    assert not requests._keys_by_req_id
@@ -0,0 +1,102 @@
+import time
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import pytest
+
+from plenum.recorder.recorder import Recorder, BufferedRecorder
+from plenum.recorder.segment_store import RecorderSegmentStore
+
+
+@pytest.fixture()
+def db_dir(tmpdir_factory):
+    return tmpdir_factory.mktemp('').strpath
+
+
+def test_records_are_buffered_until_flush(db_dir):
+    store = RecorderSegmentStore(db_dir, 'rec', flush_size=10 ** 6,
+                                 flush_interval=10 ** 6)
+    assert RecorderSegmentStore.exists(db_dir, 'rec')
+    store.append(1, [Recorder.INCOMING_FLAG, 'm1', 'f1'])
+    store.append(1, [Recorder.INCOMING_FLAG, 'm2', 'f2'])
+    assert store._segment_file.tell() == 0
+
+    store.append(2, [Recorder.OUTGOING_FLAG, 'm3', 't1'])
+    items = list(store.iterator(include_value=True))
+    assert store._segment_file.tell() > 0
+    assert items == [
+        (b'1', json.dumps([[Recorder.INCOMING_FLAG, 'm1', 'f1'],
+                           [Recorder.INCOMING_FLAG, 'm2', 'f2']]).encode()),
+        (b'2', json.dumps([[Recorder.OUTGOING_FLAG, 'm3', 't1']]).encode())]
+    store.close()
+
+
+def test_flush_on_size(db_dir):
+    store = RecorderSegmentStore(db_dir, 'rec', flush_size=100,
+                                 flush_interval=10 ** 6)
+    for i in range(10):
+        store.append(i, [Recorder.INCOMING_FLAG, 'x' * 30, 'f'])
+    assert store._segment_file.tell() > 0
+    assert len(store._index) > 1
+    store.close()
+
+
+def test_flush_on_interval_without_appends(db_dir):
+    store = RecorderSegmentStore(db_dir, 'rec', flush_size=10 ** 6,
+                                 flush_interval=0.05)
+    recorder = BufferedRecorder(store)
+    recorder.add_incoming('m1', 'f1')
+    recorder.service()
+    assert store._segment_file.tell() == 0
+
+    time.sleep(0.06)
+    recorder.service()
+    assert store._segment_file.tell() > 0
+    recorder.stop()
+
+
+def test_iterate_from_key_across_segments(db_dir):
+    store = RecorderSegmentStore(db_dir, 'rec', flush_size=1,
+                                 segment_size=200)
+    for i in range(50):
+        store.append(i, [Recorder.INCOMING_FLAG, 'm{}'.format(i), 'f'])
+    assert len(store._segment_numbers()) > 1
+
+    keys = [int(k) for k in store.iterator(start=37, include_value=False)]
+    assert keys == list(range(37, 50))
+    store.close()
+
+    # Records and index are read back after reopening
+    store = RecorderSegmentStore(db_dir, 'rec')
+    store.append(50, [Recorder.INCOMING_FLAG, 'm50', 'f'])
+    keys = [int(k) for k in store.iterator(include_value=False)]
+    assert keys == list(range(51))
+    keys = [int(k) for k in store.iterator(start=45, include_value=False)]
+    assert keys == list(range(45, 51))
+    store.close()
+
+
+def test_buffered_recorder_plays_records(db_dir):
+    recorder = BufferedRecorder(RecorderSegmentStore(db_dir, 'rec'))
+    recorder.add_incoming('m1', 'f1')
+    time.sleep(.01)
+    recorder.add_outgoing('m2', 't1', 't2')
+    time.sleep(.01)
+    recorder.add_disconnecteds('a', 'b')
+
+    second_key = int(list(recorder.store.iterator(include_value=False))[1])
+    recorder.start_playing(start=second_key)
+    played = []
+    start = time.perf_counter()
+    while recorder.is_playing and time.perf_counter() < start + 5:
+        vals = recorder.get_next()
+        if vals:
+            played.append(vals)
+        else:
+            time.sleep(0.01)
+    assert played == [[[Recorder.OUTGOING_FLAG, 'm2', 't1', 't2']],
+                      [[Recorder.DISCONN_FLAG, 'a', 'b']]]
+    recorder.stop()
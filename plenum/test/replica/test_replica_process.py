@@ -0,0 +1,171 @@
+import os
+import signal
+import time
+
+import pytest
+
+from plenum.common.constants import DOMAIN_LEDGER_ID
+from plenum.common.messages.node_messages import PrePrepare
+from plenum.common.request import Request, ReqKey
+from plenum.server.propagator import Requests
+from plenum.server.replica_process import ReplicaProcess
+from plenum.test.testing_utils import FakeSomething
+
+whitelist = ['replica process failed']
+
+
+class FakeBlsBftReplica:
+    # Passed to the replica process, so it has to be picklable
+
+    def gc(self, *args):
+        pass
+
+    def update_pre_prepare(self, params, ledger_id):
+        return params
+
+
+@pytest.fixture()
+def node():
+    return FakeSomething(
+        name='Alpha',
+        viewNo=0,
+        f=1,
+        totalNodes=4,
+        isParticipating=True,
+        ledger_ids=[DOMAIN_LEDGER_ID],
+        nodestack=FakeSomething(connecteds={'Beta', 'Gamma', 'Delta'}),
+        master_replica=FakeSomething(last_ordered_3pc=(0, 0)),
+        requests=Requests(),
+        ledger_id_for_request=lambda req: DOMAIN_LEDGER_ID,
+        ledger_to_req_handler={},
+        bls_bft=None,
+    )
+
+
+@pytest.fixture()
+def replica(node, tconf, monkeypatch):
+    monkeypatch.setattr(tconf, 'Max3PCBatchSize', 1)
+    replica = ReplicaProcess(node, 1, tconf, FakeBlsBftReplica())
+    yield replica
+    replica.stop()
+    ReplicaProcess.reap_stopped(wait=True)
+
+
+def serviced_output(replica, timeout=30):
+    start = time.perf_counter()
+    while not replica.outBox and time.perf_counter() < start + timeout:
+        replica.serviceQueues()
+        time.sleep(0.01)
+    return list(replica.outBox)
+
+
+def service_till(replica, condition, timeout=30):
+    start = time.perf_counter()
+    while not condition() and time.perf_counter() < start + timeout:
+        replica.serviceQueues()
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_backup_primary_in_process_sends_pre_prepare(node, replica):
+    assert replica.name == 'Alpha:1'
+    assert not replica.hasPrimary
+
+    replica.primaryName = 'Alpha:1'
+    # The value set is seen before the process gets it
+    assert replica.isPrimary
+
+    req = Request(identifier='4QxzWk3ajdnEA37NdNU5Kt', reqId=1,
+                  operation={'type': 'buy'}, signature='sig')
+    node.requests.add(req)
+    node.requests.set_finalised(req)
+    node.requests.mark_as_forwarded(req, 2)
+    replica.inBox.append(ReqKey(req.key))
+
+    out = serviced_output(replica)
+    assert len(out) == 1
+    pre_prepare = out[0]
+    assert isinstance(pre_prepare, PrePrepare)
+    assert (pre_prepare.instId, pre_prepare.viewNo, pre_prepare.ppSeqNo) == \
+        (1, 0, 1)
+    assert pre_prepare.reqIdr == [req.key]
+    service_till(replica, lambda: replica.lastPrePrepareSeqNo == 1)
+    # The sent PRE-PREPARE is kept to serve MESSAGE_REQUESTs
+    assert replica.sentPrePrepares.get((0, 1)) == pre_prepare
+
+    # The request is freed in the node once the backup replica frees it
+    replica.on_view_change_start()
+    node.seqNoDB = {req.key: (DOMAIN_LEDGER_ID, 1)}
+    replica.clear_requests_and_fix_last_ordered()
+    service_till(replica, lambda: node.requests[req.key].forwardedTo == 1)
+
+
+def test_replica_process_does_not_proxy_other_attributes(replica):
+    with pytest.raises(AttributeError):
+        replica.primaryNames
+    with pytest.raises(AttributeError):
+        replica.prepares = None
+
+
+def test_replica_process_is_started_again_after_it_dies(node, replica):
+    replica.primaryName = 'Beta:1'
+    replica.last_ordered_3pc = (0, 5)
+    service_till(replica, lambda: not replica._overrides)
+    process = replica._process
+
+    process.terminate()
+    process.join()
+    replica.serviceQueues()
+
+    assert replica._process is not process
+    assert replica._process.is_alive()
+    assert replica.primaryName == 'Beta:1'
+    assert replica.last_ordered_3pc == (0, 5)
+    # The values are set in the new process
+    service_till(replica, lambda: not replica._overrides)
+    assert replica.primaryName == 'Beta:1'
+    assert replica.last_ordered_3pc == (0, 5)
+
+
+def test_replica_process_is_started_again_if_it_does_not_reply(
+        replica, tconf, monkeypatch):
+    monkeypatch.setattr(tconf, 'REPLICA_PROCESS_REPLY_TIMEOUT', 1)
+    monkeypatch.setattr(tconf, 'REPLICA_PROCESS_STOP_TIMEOUT', 1)
+    service_till(replica, lambda: replica._started)
+    process = replica._process
+
+    os.kill(process.pid, signal.SIGSTOP)
+    replica.primaryName = 'Beta:1'
+    # Servicing a hanging process does not wait for it
+    start = time.perf_counter()
+    replica.serviceQueues()
+    assert time.perf_counter() - start < 1
+    assert replica._process is process
+
+    time.sleep(1.1)
+    replica.serviceQueues()
+    assert replica._process is not process
+    # The stopped process does not handle SIGTERM and is killed later
+    service_till(replica, lambda: not process.is_alive())
+    service_till(replica, lambda: not replica._overrides)
+    assert replica.primaryName == 'Beta:1'
+
+
+def test_replica_process_is_not_passed_more_than_max_pending_bytes(
+        replica, tconf, monkeypatch):
+    monkeypatch.setattr(tconf, 'REPLICA_PROCESS_MAX_PENDING_BYTES', 1)
+    service_till(replica, lambda: replica._started)
+    process = replica._process
+
+    os.kill(process.pid, signal.SIGSTOP)
+    replica.on_view_change_start()
+    replica.on_propagate_primary_done()
+    replica.serviceQueues()
+    # The second call waits till the process handles the first one
+    assert replica._sent == replica._handled + 1
+    assert len(replica._commands) == 1
+
+    os.kill(process.pid, signal.SIGCONT)
+    service_till(replica, lambda: not replica._commands and
+                 replica._handled == replica._sent)
+    assert replica._pending_bytes == 0
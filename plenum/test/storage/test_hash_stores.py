@@ -1,6 +1,7 @@
 import pytest
 
 from ledger.compact_merkle_tree import CompactMerkleTree
+from ledger.hash_stores.cached_hash_store import CachedHashStore
 from ledger.ledger import Ledger
 from plenum.common.constants import HS_LEVELDB, HS_ROCKSDB
 from ledger.test.test_file_hash_store import nodesLeaves
@@ -45,6 +46,17 @@ def testReadWrite(hashStore, nodesLeaves):
     assert onebyone == multiple
 
 
+def testWriteMany(hashStore, nodesLeaves):
+    cleanup(hashStore)
+    nodes, leaves = nodesLeaves
+    hashStore.writeNodes(nodes)
+    hashStore.writeLeaves(leaves)
+    assert hashStore.leafCount == len(leaves)
+    assert hashStore.readLeafs(1, len(leaves)) == leaves
+    assert [hashStore.readNode(hashStore.getNodePosition(start, height))
+            for start, height, _ in nodes] == [h for _, _, h in nodes]
+
+
 def testRecoverLedgerFromHashStore(hashStore, tconf, tdir):
     cleanup(hashStore)
     tree = CompactMerkleTree(hashStore=hashStore)
@@ -61,3 +73,52 @@ def testRecoverLedgerFromHashStore(hashStore, tconf, tdir):
     assert restartedLedger.tree.hashes == updatedTree.hashes
     assert restartedLedger.tree.root_hash == updatedTree.root_hash
     restartedLedger.stop()
+
+
+def testReadByPositions(hashStore, nodesLeaves):
+    cleanup(hashStore)
+    nodes, leaves = nodesLeaves
+    hashStore.writeNodes(nodes)
+    hashStore.writeLeaves(leaves)
+    assert hashStore.readLeafsByPos([3, 1, 3]) == \
+        [leaves[2], leaves[0], leaves[2]]
+    positions = [hashStore.getNodePosition(start, height)
+                 for start, height, _ in reversed(nodes)]
+    assert hashStore.readNodesByPos(positions) == \
+        [h for _, _, h in reversed(nodes)]
+    with pytest.raises(IndexError):
+        hashStore.readLeafsByPos([1, 0])
+
+
+def testCachedHashStore(hashStore, tmpdir_factory):
+    cleanup(hashStore)
+    cached = CachedHashStore(hashStore, cache_size=8)
+    ledger = Ledger(CompactMerkleTree(hashStore=cached),
+                    dataDir=tmpdir_factory.mktemp('').strpath)
+    for d in range(20):
+        ledger.add(str(d).encode())
+    assert cached.leafCount == hashStore.leafCount == 20
+    assert cached.cache_info()['leaves'] == 8
+
+    # Proofs are the same as built from the underlying store only
+    uncached_tree = CompactMerkleTree(hashStore=hashStore)
+    uncached_tree.load(ledger.tree)
+    for seq_no in (1, 7, 13, 20):
+        assert ledger.tree.consistency_proof(seq_no, 20) == \
+            uncached_tree.consistency_proof(seq_no, 20)
+        assert ledger.tree.inclusion_proof(seq_no - 1, 20) == \
+            uncached_tree.inclusion_proof(seq_no - 1, 20)
+
+    # Recently written and read hashes come from memory
+    info = cached.cache_info()
+    assert cached.readLeafsByPos([20, 19]) == hashStore.readLeafsByPos([20, 19])
+    assert cached.cache_info()['hits'] == info['hits'] + 2
+    assert cached.readLeaf(2) == hashStore.readLeaf(2)
+    assert cached.cache_info()['misses'] == info['misses'] + 1
+    assert cached.readLeaf(2) == hashStore.readLeaf(2)
+    assert cached.cache_info()['misses'] == info['misses'] + 1
+
+    cached.reset()
+    assert cached.cache_info()['leaves'] == 0
+    assert hashStore.leafCount == 0
+    ledger.stop()
@@ -84,3 +84,39 @@ def test_action_cancellation_by_action():
 
         assert 'meth2' in q1.results
         assert 'meth3' not in q1.results
+
+
+def test_actions_run_in_order_of_their_time():
+    q1 = Q1('q1')
+    q1.meth4 = partial(q1.meth, 'meth4')
+    for x in (3, 1, 2):
+        q1._schedule(partial(q1.meth4, x), 0.01 * x)
+    q1._schedule(partial(q1.meth4, 0))
+
+    time.sleep(0.05)
+    assert q1._serviceActions() == 4
+    assert [t[0] for t in q1.results['meth4']] == [1, 2, 3, 0]
+    assert q1.pending_actions_count == 0
+    assert not q1.scheduled
+
+
+def test_cancelled_actions_are_dropped():
+    q1 = Q1('q1')
+    q1.meth5 = partial(q1.meth, 'meth5')
+    actions = [partial(q1.meth5, i) for i in range(1000)]
+    aids = [q1._schedule(action, 100) for action in actions]
+    assert q1.pending_actions_count == 1000
+
+    for aid in aids[:500]:
+        q1._cancel(aid=aid)
+    for action in actions[500:900]:
+        q1._cancel(action=action)
+    assert q1.pending_actions_count == 100
+    assert len(q1.scheduled) == 100
+    # The stash is compacted when cancelled events make up most of it
+    assert len(q1.aqStash) < 300
+
+    q1._clear_actions()
+    assert q1.pending_actions_count == 0
+    assert not q1.aqStash
+    assert q1._serviceActions() == 0
@@ -0,0 +1,130 @@
+from plenum.common.constants import CURRENT_PROTOCOL_VERSION, \
+    DOMAIN_LEDGER_ID
+from plenum.common.request import Request
+from plenum.common.txn_util import reqToTxn
+from plenum.server.admission_control import AdmissionControl
+from plenum.server.node import Node
+from plenum.server.propagator import Requests
+from plenum.test.testing_utils import FakeSomething
+
+
+def make_request(req_id=1):
+    return Request(identifier='4QxzWk3ajdnEA37NdNU5Kt', reqId=req_id,
+                   operation={'type': 'buy'}, signature='sig',
+                   protocolVersion=CURRENT_PROTOCOL_VERSION)
+
+
+def test_requests_rejected_over_limit():
+    admission = AdmissionControl(max_requests=4, max_bytes=0)
+    for i in range(4):
+        assert admission.check('cli{}'.format(i)) is None
+        admission.admit('key{}'.format(i), 'cli{}'.format(i))
+    assert admission.check('cli0') == 'too many requests are being processed'
+    admission.reject()
+
+    admission.release('key0')
+    assert admission.check('cli0') is None
+    assert admission.stats() == {'admitted_requests': 3,
+                                 'admitted_bytes': 0,
+                                 'clients': 3,
+                                 'rejected_requests': 1}
+
+
+def test_requests_rejected_over_bytes_limit():
+    admission = AdmissionControl(max_requests=0, max_bytes=1000)
+    admission.admit('key1', 'cli', 600)
+    assert admission.check('cli', 400) is None
+    assert admission.check('cli', 401) == \
+        'too much data of requests is being processed'
+
+    # Admitting or releasing a request twice changes nothing
+    admission.admit('key1', 'cli', 600)
+    admission.release('key1')
+    admission.release('key1')
+    assert admission.bytes_count == 0
+    assert admission.check('cli', 1000) is None
+
+
+def test_client_gets_fair_share_of_requests():
+    admission = AdmissionControl(max_requests=100, max_bytes=0,
+                                 min_client_quota=10)
+    for i in range(40):
+        admission.admit('a{}'.format(i), 'cliA')
+    assert admission.client_quota('cliA') == 100
+    assert admission.client_quota('cliB') == 50
+    assert admission.check('cliA') is None
+
+    for i in range(10):
+        admission.admit('b{}'.format(i), 'cliB')
+    for i in range(5):
+        admission.admit('c{}'.format(i), 'cliC')
+    # Each of 3 clients can have a third of the requests
+    assert admission.client_quota('cliA') == 33
+    assert admission.check('cliA') == \
+        'client has too many requests being processed'
+    assert admission.check('cliC') is None
+
+    # but not less than the minimum quota
+    admission.min_client_quota = 40
+    assert admission.client_quota('cliD') == 40
+
+
+def test_request_released_when_its_txn_is_caught_up():
+    admission = AdmissionControl(max_requests=10, max_bytes=0)
+    request = make_request()
+    admission.admit(request.key, 'cli')
+    discarded = []
+    node = FakeSomething(
+        admission_control=admission,
+        master_replica=FakeSomething(
+            discard_req_key=lambda lid, key: discarded.append(key)))
+
+    Node._clear_req_key_for_txn(node, DOMAIN_LEDGER_ID, reqToTxn(request))
+    assert discarded == [request.key]
+    assert admission.requests_count == 0
+
+
+def test_request_released_when_removed_from_requests():
+    admission = AdmissionControl(max_requests=10, max_bytes=0)
+    requests = Requests(on_removed=admission.release)
+    request = make_request()
+    admission.admit(request.key, 'cli')
+    requests.add(request)
+    requests.mark_as_forwarded(request, 1)
+
+    requests.mark_as_executed(request)
+    assert admission.requests_count == 1
+    requests.free(request.key)
+    assert request.key not in requests
+    assert admission.requests_count == 0
+
+
+def test_digest_computed_only_for_request_rejected_before_verification():
+    admission = AdmissionControl(max_requests=1, max_bytes=0)
+    requests = Requests()
+    nacks = []
+    node = FakeSomething(
+        admission_control=admission,
+        requests=requests,
+        requestSender={},
+        send_nack_to_client=lambda req_key, reason, frm: nacks.append(
+            req_key))
+    node.isProcessingReq = lambda key: Node.isProcessingReq(node, key)
+
+    request = make_request()
+    assert not Node._reject_if_overloaded(node, request, 'cli',
+                                          new_only=True)
+    # The digest is left to signature verification
+    assert request._digest is None
+
+    admission.admit('other', 'cli')
+    requests.add(request)
+    # A request the node already has is not rejected
+    assert not Node._reject_if_overloaded(node, request, 'cli',
+                                          new_only=True)
+    assert admission.rejected == 0
+
+    request = make_request(req_id=2)
+    assert Node._reject_if_overloaded(node, request, 'cli', new_only=True)
+    assert nacks == [(request.identifier, 2)]
+    assert admission.rejected == 1
@@ -1,12 +1,22 @@
 import psutil
+import pytest
 import shutil
 
+from ledger.compact_merkle_tree import CompactMerkleTree
+from ledger.hash_stores.file_hash_store import FileHashStore
 from plenum.common.constants import DOMAIN_LEDGER_ID
+from plenum.common.ledger import Ledger
+from plenum.common.txn_util import init_empty_txn, append_txn_metadata, \
+    get_seq_no
+from plenum.server.node import Node
 from plenum.test.helper import send_reqs_batches_and_get_suff_replies
 from plenum.test.node_catchup.helper import ensure_all_nodes_have_same_data, \
     waitNodeDataEquality
 from plenum.test.test_node import checkNodesConnected, TestNode
 from plenum.common.config_helper import PNodeConfigHelper
+from plenum.test.testing_utils import FakeSomething
+from state.pruning_state import PruningState
+from storage.kv_in_memory import KeyValueStorageInMemory
 from stp_core.types import HA
 
 TestRunningTimeLimitSec = 200
@@ -63,3 +73,50 @@ def test_memory_consumption_while_recreating_state_db():
     # TODO:
     # p = psutil.Process()
     # print(p.memory_info_ex())
+
+
+def test_state_recreation_continues_from_checkpoint(tdir_for_func):
+    ledger = Ledger(
+        CompactMerkleTree(hashStore=FileHashStore(dataDir=tdir_for_func)),
+        dataDir=tdir_for_func)
+    for i in range(1, 26):
+        txn = init_empty_txn('buy')
+        append_txn_metadata(txn, seq_no=i)
+        ledger.add(txn)
+
+    class Handler:
+        def __init__(self, state, fail_at=None):
+            self.state = state
+            self.fail_at = fail_at
+
+        def updateState(self, txns, isCommitted=False):
+            for txn in txns:
+                seq_no = get_seq_no(txn)
+                if seq_no == self.fail_at:
+                    raise RuntimeError('node stopped')
+                # Each txn depends on the committed state of the previous one
+                prev = self.state.get(str(seq_no - 1).encode(),
+                                      isCommitted=True) or b'0'
+                self.state.set(str(seq_no).encode(),
+                               str(int(prev) + seq_no).encode())
+
+    node = FakeSomething(name='Node1',
+                         config=FakeSomething(STATE_REBUILD_CHUNK_SIZE=10),
+                         update_txn_with_extra_data=lambda txn: txn)
+    kv = KeyValueStorageInMemory()
+    state = PruningState(kv)
+    with pytest.raises(RuntimeError):
+        Node.initStateFromLedger(node, state, ledger, Handler(state, 15))
+    assert state.rebuild_checkpoint == 10
+
+    state = PruningState(kv)
+    assert state.get(b'10') == str(sum(range(11))).encode()
+    assert state.get(b'11') is None
+    Node.initStateFromLedger(node, state, ledger, Handler(state))
+    assert state.rebuild_checkpoint is None
+    assert state.get(b'25') == str(sum(range(26))).encode()
+
+    expected = PruningState(KeyValueStorageInMemory())
+    Node.initStateFromLedger(node, expected, ledger, Handler(expected))
+    assert state.committedHeadHash == expected.committedHeadHash
+    ledger.stop()
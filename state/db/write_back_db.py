@@ -0,0 +1,52 @@
+from typing import Iterable, Tuple, Set
+
+from state.db.persistent_db import PersistentDB
+from storage.kv_store import KeyValueStorage
+
+
+class WriteBackDB(PersistentDB):
+    """
+    PersistentDB which keeps newly created trie nodes in memory instead of
+    writing each of them to the storage. Nodes are flushed to the storage
+    with a single batch on `flush` (done by the state on commit) or dropped
+    with `discard` if the changes that created them are reverted.
+    """
+
+    def __init__(self, keyValueStorage: KeyValueStorage):
+        super().__init__(keyValueStorage)
+        self._uncommitted = {}
+
+    def get(self, key: bytes) -> bytes:
+        try:
+            return self._uncommitted[bytes(key)]
+        except KeyError:
+            return self._keyValueStorage.get(key)
+
+    def inc_refcount(self, key, value):
+        self._uncommitted[key] = value
+
+    @property
+    def uncommitted_count(self):
+        return len(self._uncommitted)
+
+    def is_uncommitted(self, key: bytes) -> bool:
+        return bytes(key) in self._uncommitted
+
+    def flush(self, extra: Iterable[Tuple] = (), keys: Set[bytes] = None):
+        """
+        Writes all uncommitted nodes, along with `extra` (key, value) pairs,
+        to the storage in a single batch. If `keys` are given only the nodes
+        with these keys are written and the others are dropped.
+        """
+        if keys is None:
+            batch = list(self._uncommitted.items())
+        else:
+            batch = [(k, v) for k, v in self._uncommitted.items()
+                     if k in keys]
+        batch.extend(extra)
+        if batch:
+            self._keyValueStorage.setBatch(batch)
+        self._uncommitted.clear()
+
+    def discard(self):
+        self._uncommitted.clear()
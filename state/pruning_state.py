@@ -1,10 +1,11 @@
 from binascii import unhexlify
-from typing import Optional
+from typing import Optional, Set
 
-from state.db.persistent_db import PersistentDB
+from common.instrumentation import measured
+from state.db.write_back_db import WriteBackDB
 from state.state import State
 from state.trie.pruning_trie import BLANK_ROOT, Trie, BLANK_NODE, \
-    bin_to_nibbles
+    bin_to_nibbles, NODE_TYPE_BRANCH, NODE_TYPE_EXTENSION
 from state.util.fast_rlp import encode_optimized as rlp_encode, \
     decode_optimized as rlp_decode
 from state.util.utils import to_string, isHex
@@ -19,22 +20,35 @@ class PruningState(State):
     ledger. It might happen that a few batches are in 3 phase commit and the
     node crashes. Now when the node restarts, it restores the db from the
     committed root hash and all entries for uncommitted batches will be
-    ignored
+    ignored.
+    Trie nodes created by uncommitted batches are kept in memory and are
+    written to the db in a single batch along with the committed root hash.
     """
 
+    # Instrumentation of the node having the state, set by the node
+    instrumentation = None
+
     # SOME KEY THAT DOES NOT COLLIDE WITH ANY STATE VARIABLE'S NAME
     rootHashKey = b'\x88\xc8\x88 \x9a\xa7\x89\x1b'
+    # Sequence number of the last ledger transaction applied by a rebuild
+    # of the state from the ledger which is not finished yet
+    rebuildCheckpointKey = b'\x88\xc8\x88 \x9a\xa7\x89\x1c'
 
-    def __init__(self, keyValueStorage: KeyValueStorage):
+    def __init__(self, keyValueStorage: KeyValueStorage,
+                 node_cache_size: int = 0):
         self._kv = keyValueStorage
         if self.rootHashKey in self._kv:
             rootHash = bytes(self._kv.get(self.rootHashKey))
         else:
             rootHash = BLANK_ROOT
             self._kv.put(self.rootHashKey, BLANK_ROOT)
+        self._db = WriteBackDB(self._kv)
+        # Committed root which is not written to the db yet
+        self._unflushedCommittedHeadHash = None
         self._trie = Trie(
-            PersistentDB(self._kv),
-            rootHash)
+            self._db,
+            rootHash,
+            node_cache_size=node_cache_size)
 
     @property
     def head(self):
@@ -57,6 +71,7 @@ class PruningState(State):
             return BLANK_NODE
         return self._trie._decode_to_node(node_hash)
 
+    @measured('state_set')
     def set(self, key: bytes, value: bytes):
         self._trie.update(key, rlp_encode([value]))
 
@@ -76,10 +91,17 @@ class PruningState(State):
         if val:
             return self.get_decoded(val)
 
+    @measured('state_remove')
     def remove(self, key: bytes):
         self._trie.delete(key)
 
-    def commit(self, rootHash=None, rootNode=None):
+    @measured('state_commit')
+    def commit(self, rootHash=None, rootNode=None, flush=True):
+        """
+        Marks the given root as committed. With `flush` set to False the
+        root and the nodes it needs are kept in memory and written by the
+        next commit that flushes, so many commits can be written at once.
+        """
         if rootNode:
             rootHash = self._trie._encode_node(rootNode)
         elif rootHash and isHex(rootHash):
@@ -90,11 +112,74 @@ class PruningState(State):
             rootHash = rootHash
         else:
             rootHash = self.headHash
-        self._kv.put(self.rootHashKey, rootHash)
+        if flush:
+            self._db.flush(extra=[(self.rootHashKey, rootHash)])
+            self._unflushedCommittedHeadHash = None
+        else:
+            self._unflushedCommittedHeadHash = rootHash
+
+    @property
+    def rebuild_checkpoint(self) -> Optional[int]:
+        """
+        Sequence number of the last transaction applied by an unfinished
+        rebuild of the state from the ledger, None if there is no such one
+        """
+        if self.rebuildCheckpointKey not in self._kv:
+            return None
+        return int(self._kv.get(self.rebuildCheckpointKey))
+
+    def set_rebuild_checkpoint(self, seq_no: int):
+        """
+        Marks the committed state as having transactions till `seq_no`
+        applied, before applying next ones which are already in the ledger,
+        so the state is rebuilt from the ledger if they are not committed
+        """
+        self._kv.put(self.rebuildCheckpointKey, str(seq_no))
+
+    def commit_rebuilt(self, seq_no: int):
+        """
+        Commits the head of the state being rebuilt from the ledger, with
+        transactions till `seq_no` applied. The root and the checkpoint are
+        written in the same batch as the trie nodes, so a rebuild which is
+        interrupted can continue from the checkpoint. Nodes which are not
+        reachable from the root anymore are not written.
+        """
+        rootHash = self.headHash
+        self._db.flush(extra=[(self.rootHashKey, rootHash),
+                              (self.rebuildCheckpointKey, str(seq_no))],
+                       keys=self._unflushed_nodes_reachable_from(rootHash))
+        self._unflushedCommittedHeadHash = None
+
+    def finish_rebuild(self):
+        if self.rebuildCheckpointKey in self._kv:
+            self._kv.remove(self.rebuildCheckpointKey)
+
+    def _unflushed_nodes_reachable_from(self, rootHash) -> Set[bytes]:
+        # Nodes in the db have all of their descendants in the db too
+        reachable = set()
+        refs = [rootHash]
+        while refs:
+            ref = refs.pop()
+            if not isinstance(ref, list):
+                ref = bytes(ref)
+                if ref in reachable or not self._db.is_uncommitted(ref):
+                    continue
+                reachable.add(ref)
+            node = self._trie._decode_to_node(ref)
+            node_type = Trie._get_node_type(node)
+            if node_type == NODE_TYPE_BRANCH:
+                refs.extend(node[:16])
+            elif node_type == NODE_TYPE_EXTENSION:
+                refs.append(node[1])
+        return reachable
 
     def revertToHead(self, headHash=None):
         head = self._hash_to_node(headHash)
         self._trie.replace_root_hash(self._trie.root_node, head)
+        if self.headHash == self.committedHeadHash and \
+                self._unflushedCommittedHeadHash is None:
+            # Nothing uncommitted is reachable anymore
+            self._db.discard()
 
     # Proofs are always generated over committed state
     def generate_state_proof(self, key: bytes, root=None, serialize=False, get_value=False):
@@ -138,6 +223,8 @@ class PruningState(State):
 
     @property
     def committedHeadHash(self):
+        if self._unflushedCommittedHeadHash is not None:
+            return self._unflushedCommittedHeadHash
         return self._kv.get(self.rootHashKey)
 
     @property
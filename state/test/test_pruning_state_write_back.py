@@ -0,0 +1,159 @@
+import pytest
+
+from state.pruning_state import PruningState
+from storage.kv_in_memory import KeyValueStorageInMemory
+
+
+class CountingKeyValueStorage(KeyValueStorageInMemory):
+    def __init__(self):
+        super().__init__()
+        self.puts = 0
+        self.batches = 0
+
+    def put(self, key, value):
+        self.puts += 1
+        super().put(key, value)
+
+    def setBatch(self, batch):
+        self.batches += 1
+        super().setBatch(batch)
+
+
+@pytest.fixture(scope="function")
+def kv():
+    return CountingKeyValueStorage()
+
+
+@pytest.fixture(scope="function", params=[0, 100])
+def state(request, kv):
+    state = PruningState(kv, node_cache_size=request.param)
+    yield state
+    state.close()
+
+
+def test_nodes_not_written_before_commit(kv, state):
+    puts_before = kv.puts
+    for i in range(20):
+        state.set('k{}'.format(i).encode(), b'v')
+    assert kv.puts == puts_before
+    assert kv.batches == 0
+    assert b'v' == state.get(b'k5', isCommitted=False)
+
+
+def test_commit_writes_single_batch(kv, state):
+    for i in range(20):
+        state.set('k{}'.format(i).encode(), b'v')
+    puts_before = kv.puts
+    state.commit(state.headHash)
+    assert kv.batches == 1
+    assert kv.puts - puts_before > 1
+
+    restored = PruningState(kv)
+    for i in range(20):
+        assert b'v' == restored.get('k{}'.format(i).encode())
+
+
+def test_revert_to_committed_discards_nodes(kv, state):
+    state.set(b'k1', b'v1')
+    state.commit(state.headHash)
+    state.set(b'k2', b'v2')
+    state.set(b'k3', b'v3')
+    state.revertToHead(state.committedHeadHash)
+
+    state.commit(state.headHash)
+    restored = PruningState(kv)
+    assert restored.headHash == state.headHash
+    assert b'v1' == restored.get(b'k1')
+    assert restored.get(b'k2') is None
+
+
+def test_revert_to_uncommitted_head_keeps_nodes(kv, state):
+    state.set(b'k1', b'v1')
+    state.commit(state.headHash)
+    state.set(b'k2', b'v2')
+    head = state.headHash
+    state.set(b'k3', b'v3')
+    state.revertToHead(head)
+    assert b'v2' == state.get(b'k2', isCommitted=False)
+    assert state.get(b'k3', isCommitted=False) is None
+
+    state.commit(head)
+    restored = PruningState(kv)
+    assert b'v2' == restored.get(b'k2')
+
+
+def test_uncommitted_nodes_lost_on_restart(kv, state):
+    state.set(b'k1', b'v1')
+    state.commit(state.headHash)
+    state.set(b'k2', b'v2')
+
+    restored = PruningState(kv)
+    assert b'v1' == restored.get(b'k1')
+    assert restored.get(b'k2') is None
+
+
+def test_unflushed_commits_written_with_next_commit(kv, state):
+    state.set(b'k1', b'v1')
+    state.commit(state.headHash, flush=False)
+    first_root = state.headHash
+    assert state.committedHeadHash == first_root
+    assert b'v1' == state.get(b'k1')
+
+    state.set(b'k1', b'v2')
+    state.revertToHead(state.committedHeadHash)
+    assert b'v1' == state.get(b'k1', isCommitted=False)
+    assert kv.batches == 0
+    assert PruningState(kv).get(b'k1') is None
+
+    state.set(b'k2', b'v2')
+    state.commit(state.headHash)
+    assert kv.batches == 1
+    restored = PruningState(kv)
+    assert b'v1' == restored.get(b'k1')
+    assert b'v2' == restored.get(b'k2')
+
+
+def test_rebuild_commits_reachable_nodes_with_checkpoint(kv, state):
+    assert state.rebuild_checkpoint is None
+    for i in range(50):
+        state.set('k{}'.format(i).encode(), 'v{}'.format(i).encode())
+        state.commit(rootHash=state.headHash, flush=False)
+    unflushed = state._db.uncommitted_count
+    state.commit_rebuilt(50)
+    assert kv.batches == 1
+    assert state.rebuild_checkpoint == 50
+
+    # Nodes replaced by later updates are not written
+    written = [k for k, _ in kv.iterator()
+               if k not in (PruningState.rootHashKey,
+                            PruningState.rebuildCheckpointKey)]
+    assert len(written) < unflushed
+
+    restored = PruningState(kv)
+    assert restored.rebuild_checkpoint == 50
+    assert restored.committedHeadHash == state.headHash
+    for i in range(50):
+        assert 'v{}'.format(i).encode() == \
+            restored.get('k{}'.format(i).encode())
+
+    restored.finish_rebuild()
+    assert restored.rebuild_checkpoint is None
+
+
+def test_rebuild_continues_from_checkpoint_set_before_applying(kv, state):
+    state.set(b'k1', b'v1')
+    state.commit(state.headHash)
+    state.set_rebuild_checkpoint(1)
+
+    # Applied but not written, as if the node stopped
+    state.set(b'k2', b'v2')
+    state.commit(rootHash=state.headHash, flush=False)
+    restored = PruningState(kv)
+    assert restored.rebuild_checkpoint == 1
+    assert restored.get(b'k2') is None
+
+    state.commit_rebuilt(2)
+    state.finish_rebuild()
+    restored = PruningState(kv)
+    assert restored.rebuild_checkpoint is None
+    assert b'v2' == restored.get(b'k2')
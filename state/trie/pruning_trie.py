@@ -3,6 +3,7 @@
 import copy
 
 from common.exceptions import PlenumTypeError, PlenumValueError
+from common.lru_cache import LRUCache
 
 import rlp
 from rlp.utils import encode_hex, ascii_chr, str_to_bytes
@@ -213,15 +214,27 @@ def transient_trie_exception(*args):
     raise Exception("Transient trie")
 
 
+def copy_node(node):
+    # Trie methods modify decoded nodes in place, so cached nodes are never
+    # handed out directly; this is much cheaper than `copy.deepcopy`
+    return [copy_node(item) if isinstance(item, list) else item
+            for item in node]
+
+
 class Trie:
 
-    def __init__(self, db: BaseDB, root_hash=BLANK_ROOT, transient=False):
+    def __init__(self, db: BaseDB, root_hash=BLANK_ROOT, transient=False,
+                 node_cache_size=0):
         '''it also present a dictionary like interface
 
         :param db key value database
         :root: blank or trie node in form of [key, value] or [v0,v1..v15,v]
+        :param node_cache_size: number of decoded nodes to keep in memory,
+        0 disables the cache
         '''
         self._db = db  # Pass in a database object directly
+        self._node_cache = LRUCache(node_cache_size) \
+            if node_cache_size > 0 else None
         self.transient = transient
         if self.transient:
             self.update = self.get = self.delete = transient_trie_exception
@@ -349,7 +362,15 @@ class Trie:
             return BLANK_NODE
         if isinstance(encoded, list):
             return encoded
-        o = rlp.decode(self._db.get(encoded))
+        if self._node_cache is None:
+            o = rlp.decode(self._db.get(encoded))
+        else:
+            encoded = bytes(encoded)
+            o = self._node_cache.get(encoded)
+            if o is None:
+                o = rlp.decode(self._db.get(encoded))
+                self._node_cache.put(encoded, o)
+            o = copy_node(o)
         self.spv_grabbing(o)
         return o
 
@@ -1,6 +1,9 @@
+import mmap
 import os
 import shutil
+import struct
 
+from common.lru_cache import LRUCache
 from storage.kv_store_file import KeyValueStorageFile
 from storage.text_file_store import TextFileStore
 
@@ -18,9 +21,19 @@ class ChunkedFileStore(KeyValueStorageFile):
 
     Every instance of ChunkedFileStore maintains its own directory for
     storing the chunked data files.
+
+    When line numbers are keys, the end offset of each entry of a chunk is
+    kept in a sidecar file of fixed-width integers in a separate directory,
+    so entries are read from a memory map of the chunk file without scanning
+    it. Sidecar files are written along with the entries and rebuilt from
+    the chunk file when missing or outdated, unless entries of the chunk are
+    not separated by a line separator, in which case the chunk is scanned.
     """
 
     firstChunkIndex = 1
+    offsetsDirSuffix = '_offsets'
+    offsetEntry = struct.Struct('>Q')
+    maxMappedChunks = 64
 
     @staticmethod
     def _fileNameToChunkIndex(fileName):
@@ -61,6 +74,10 @@ class ChunkedFileStore(KeyValueStorageFile):
         self.dataDir = os.path.join(dbDir, dbName)  # chunk files destination
         self.currentChunk = None  # type: KeyValueStorageFile
         self.currentChunkIndex = None  # type: int
+        # end offsets of entries of chunks, written along with the entries
+        self.offsetsDir = self.dataDir + self.offsetsDirSuffix
+        self._currentOffsetsFile = None
+        self._mappedChunks = LRUCache(self.maxMappedChunks)
 
         # TODO: fix chunk_creator support
         def default_chunk_creator(name):
@@ -84,6 +101,8 @@ class ChunkedFileStore(KeyValueStorageFile):
     def _init_db_file(self):
         if not os.path.exists(self.db_path):
             os.makedirs(self.db_path)
+        if not os.path.exists(self.offsetsDir):
+            os.makedirs(self.offsetsDir)
         if not os.path.isdir(self.db_path):
             raise ValueError("Transactions file {} is not directory"
                              .format(self.db_path))
@@ -126,9 +145,11 @@ class ChunkedFileStore(KeyValueStorageFile):
                     not self.currentChunk.closed:
                 return
             self.currentChunk.close()
+            self._closeOffsetsFile()
 
         self.currentChunk = self._openChunk(index)
         self.currentChunkIndex = index
+        self._openOffsetsFile(index)
         self.itemNum = self.currentChunk.size + 1
 
     def _openChunk(self, index) -> KeyValueStorageFile:
@@ -164,6 +185,13 @@ class ChunkedFileStore(KeyValueStorageFile):
             self.itemNum = 1
         self.itemNum += 1
         self.currentChunk.put(key, value)
+        if self._currentOffsetsFile is not None:
+            end = os.fstat(self.currentChunk.db_file.fileno()).st_size
+            self._currentOffsetsFile.write(self.offsetEntry.pack(end))
+            self._currentOffsetsFile.flush()
+            mapped = self._mappedChunks.get(self.currentChunkIndex)
+            if mapped is not None:
+                mapped.ends.append(end)
 
     def get(self, key) -> str:
         """
@@ -171,12 +199,134 @@ class ChunkedFileStore(KeyValueStorageFile):
 
         :return: value corresponding to specified key
         """
+        chunk_no, offset = self._get_key_location(key)
+        mapped = self._getMappedChunk(chunk_no)
+        if mapped is not None:
+            if not 0 < offset <= len(mapped.ends):
+                raise KeyError("'{}' doesn't contain {} key".format(
+                    self.dataDir, str(key)))
+            return self._parseEntry(mapped.entry(offset))
         # TODO: get is creating files when a key is given which is more than
         # the store size
-        chunk_no, offset = self._get_key_location(key)
         with self._openChunk(chunk_no) as chunk:
             return chunk.get(str(offset))
 
+    def _chunkValues(self, chunk_no, start_offset, end_offset):
+        """
+        Values of the chunk entries from `start_offset` to `end_offset`, both
+        inclusive, `end_offset` can be None to read up to the end of chunk
+        """
+        mapped = self._getMappedChunk(chunk_no)
+        if mapped is not None:
+            end_offset = min(end_offset or len(mapped.ends), len(mapped.ends))
+            for offset in range(start_offset, end_offset + 1):
+                yield self._parseEntry(mapped.entry(offset))
+        else:
+            with self._openChunk(chunk_no) as chunk:
+                yield from (l for _, l in chunk.iterator(start=start_offset,
+                                                         end=end_offset))
+
+    def _parseEntry(self, entry: bytes):
+        line = entry.strip(self._lineSep)
+        if not self.currentChunk.is_byte:
+            line = line.decode()
+        return self._parse_line(line, returnKey=False)
+
+    @property
+    def _lineSep(self) -> bytes:
+        lineSep = self.currentChunk.lineSep
+        return lineSep if isinstance(lineSep, bytes) else lineSep.encode()
+
+    def _offsetsPath(self, index):
+        return os.path.join(self.offsetsDir,
+                            ChunkedFileStore._chunkIndexToFileName(index))
+
+    def _chunkPath(self, index):
+        for fileName in os.listdir(self.dataDir):
+            if ChunkedFileStore._fileNameToChunkIndex(fileName) == index:
+                return os.path.join(self.dataDir, fileName)
+        return None
+
+    def _getMappedChunk(self, index):
+        """
+        Returns memory mapped chunk if its entries can be located by offsets
+        """
+        if not self.isLineNoKey:
+            return None
+        mapped = self._mappedChunks.get(index)
+        if mapped is None:
+            path = self._chunkPath(index)
+            if path is None:
+                return _MappedChunk(None, [])
+            ends = self._loadOffsets(index, path)
+            if ends is None:
+                return None
+            mapped = _MappedChunk(path, ends)
+            self._mappedChunks.put(index, mapped)
+        return mapped
+
+    def _loadOffsets(self, index, path):
+        """
+        Returns end offsets of the chunk entries, rebuilding the sidecar file
+        if it does not match the chunk file, or None if it can not be rebuilt
+        """
+        ends = self._readOffsets(index)
+        size = os.path.getsize(path)
+        if ends is not None and (ends[-1] if ends else 0) == size:
+            return ends
+        if size == 0:
+            ends = []
+        elif self._lineSep:
+            ends = self._buildOffsets(path)
+        else:
+            return None
+        with open(self._offsetsPath(index), 'wb') as f:
+            f.write(b''.join(self.offsetEntry.pack(end) for end in ends))
+        return ends
+
+    def _readOffsets(self, index):
+        path = self._offsetsPath(index)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        # A partially written last entry is ignored
+        data = data[:len(data) - len(data) % self.offsetEntry.size]
+        return [end for end, in self.offsetEntry.iter_unpack(data)]
+
+    def _buildOffsets(self, path):
+        lineSep = self._lineSep
+        with open(path, 'rb') as f:
+            data = f.read()
+        ends = []
+        pos = 0
+        while pos < len(data):
+            sep_pos = data.find(lineSep, pos)
+            end = len(data) if sep_pos == -1 else sep_pos + len(lineSep)
+            if data[pos:end].strip(lineSep):
+                ends.append(end)
+            elif ends:
+                # Empty lines are skipped same as when reading lines
+                ends[-1] = end
+            pos = end
+        return ends
+
+    def _openOffsetsFile(self, index):
+        if not self.isLineNoKey:
+            return
+        ends = self._loadOffsets(index, self._chunkPath(index))
+        if ends is None:
+            # Offsets can not be tracked for the chunk, so it is scanned
+            if os.path.isfile(self._offsetsPath(index)):
+                os.remove(self._offsetsPath(index))
+            return
+        self._currentOffsetsFile = open(self._offsetsPath(index), 'ab')
+
+    def _closeOffsetsFile(self):
+        if self._currentOffsetsFile is not None:
+            self._currentOffsetsFile.close()
+        self._currentOffsetsFile = None
+
     def reset(self) -> None:
         """
         Clear all data in file storage.
@@ -184,6 +334,8 @@ class ChunkedFileStore(KeyValueStorageFile):
         self.close()
         for f in os.listdir(self.dataDir):
             os.remove(os.path.join(self.dataDir, f))
+        for f in os.listdir(self.offsetsDir):
+            os.remove(os.path.join(self.offsetsDir, f))
         self._useLatestChunk()
 
     def drop(self):
@@ -209,6 +361,8 @@ class ChunkedFileStore(KeyValueStorageFile):
     def close(self):
         if self.currentChunk is not None:
             self.currentChunk.close()
+        self._closeOffsetsFile()
+        self._mappedChunks.clear()
         self.currentChunk = None
         self.currentChunkIndex = None
         self.itemNum = None
@@ -266,23 +420,23 @@ class ChunkedFileStore(KeyValueStorageFile):
             if start_chunk_no == end_chunk_no:
                 # If entries lie in the same range
                 assert end_offset >= start_offset
-                with self._openChunk(start_chunk_no) as chunk:
-                    yield from zip(range(start, end + 1),
-                                   (l for _, l in chunk.iterator(start=start_offset,
-                                                                 end=end_offset)))
+                yield from zip(range(start, end + 1),
+                               self._chunkValues(start_chunk_no,
+                                                 start_offset, end_offset))
             else:
                 current_chunk_no = start_chunk_no
                 while current_chunk_no <= end_chunk_no:
-                    with self._openChunk(current_chunk_no) as chunk:
-                        if current_chunk_no == start_chunk_no:
-                            yield from ((str(current_chunk_no + int(k) - 1), l) for k, l in
-                                        chunk.iterator(start=start_offset))
-                        elif current_chunk_no == end_chunk_no:
-                            yield from ((str(current_chunk_no + int(k) - 1), l)
-                                        for k, l in chunk.iterator(end=end_offset))
-                        else:
-                            yield from ((str(current_chunk_no + int(k) - 1), l)
-                                        for k, l in chunk.iterator(start=1, end=self.chunkSize))
+                    if current_chunk_no == start_chunk_no:
+                        first, last = start_offset, None
+                    elif current_chunk_no == end_chunk_no:
+                        first, last = 1, end_offset
+                    else:
+                        first, last = 1, self.chunkSize
+                    yield from ((str(current_chunk_no + k - 1), l)
+                                for k, l in enumerate(
+                                    self._chunkValues(current_chunk_no,
+                                                      first, last),
+                                    first))
                     current_chunk_no += self.chunkSize
 
     def _append_new_line_if_req(self):
@@ -292,14 +446,17 @@ class ChunkedFileStore(KeyValueStorageFile):
     @property
     def size(self) -> int:
         """
-        This will iterate only over the last chunk since the name of the last
-        chunk indicates how many lines in total exist in all other chunks
+        This will only count entries of the last chunk since the name of the
+        last chunk indicates how many lines in total exist in all other chunks
         """
         chunks = self._listChunks()
         num_chunks = len(chunks)
         if num_chunks == 0:
             return 0
         count = (num_chunks - 1) * self.chunkSize
+        mapped = self._getMappedChunk(chunks[-1])
+        if mapped is not None:
+            return count + len(mapped.ends)
         last_chunk = self._openChunk(chunks[-1])
         count += sum(1 for _ in last_chunk._lines())
         last_chunk.close()
@@ -308,3 +465,27 @@ class ChunkedFileStore(KeyValueStorageFile):
     @property
     def closed(self):
         return self.currentChunk is None
+
+
+class _MappedChunk:
+    """
+    Read-only memory map of a chunk file along with end offsets of its
+    entries. The file is mapped again when an entry appended after mapping
+    is read.
+    """
+
+    def __init__(self, path, ends):
+        self.path = path
+        self.ends = ends
+        self._map = None
+
+    def entry(self, offset) -> bytes:
+        """
+        :param offset: 1-based offset of the entry in the chunk
+        """
+        start = self.ends[offset - 2] if offset > 1 else 0
+        end = self.ends[offset - 1]
+        if self._map is None or end > len(self._map):
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[start:end]
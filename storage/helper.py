@@ -1,3 +1,4 @@
+from ledger.hash_stores.cached_hash_store import CachedHashStore
 from ledger.hash_stores.file_hash_store import FileHashStore
 from ledger.hash_stores.hash_store import HashStore
 from ledger.hash_stores.memory_hash_store import MemoryHashStore
@@ -51,11 +52,14 @@ def initHashStore(data_dir, name, config=None, read_only=False) -> HashStore:
         return FileHashStore(dataDir=data_dir,
                              fileNamePrefix=name)
     elif hsConfig == HS_LEVELDB or hsConfig == HS_ROCKSDB:
-        return DbHashStore(dataDir=data_dir,
-                           fileNamePrefix=name,
-                           db_type=hsConfig,
-                           read_only=read_only,
-                           config=config)
+        hash_store = DbHashStore(dataDir=data_dir,
+                                 fileNamePrefix=name,
+                                 db_type=hsConfig,
+                                 read_only=read_only,
+                                 config=config)
+        if config.HASH_STORE_CACHE_SIZE:
+            return CachedHashStore(hash_store, config.HASH_STORE_CACHE_SIZE)
+        return hash_store
     else:
         return MemoryHashStore()
 
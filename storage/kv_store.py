@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABCMeta
-from typing import Tuple, Iterable
+from typing import Tuple, Iterable, List
 
 
 class KeyValueStorage(metaclass=ABCMeta):
@@ -68,6 +68,13 @@ class KeyValueStorage(metaclass=ABCMeta):
             c += 1
         return c
 
+    def get_multiple(self, keys: Iterable) -> List:
+        """
+        Returns values of the keys in the same order, raises KeyError if
+        any of them is missing
+        """
+        return [self.get(key) for key in keys]
+
     def _has_key(self, key):
         try:
             self.get(key)
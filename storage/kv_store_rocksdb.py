@@ -1,6 +1,6 @@
 import os
 
-from typing import Iterable, Tuple
+from typing import Iterable, Tuple, List
 
 import shutil
 from storage.kv_store import KeyValueStorage
@@ -114,6 +114,17 @@ class KeyValueStorageRocksdb(KeyValueStorage):
             raise KeyError
         return vv
 
+    def get_multiple(self, keys: Iterable) -> List:
+        keys = [self.to_byte_repr(key) for key in keys]
+        values = self._db.multi_get(keys)
+        result = []
+        for key in keys:
+            vv = values.get(key)
+            if vv is None:
+                raise KeyError(key)
+            result.append(vv)
+        return result
+
     def remove(self, key):
         key = self.to_byte_repr(key)
         self._db.delete(key)
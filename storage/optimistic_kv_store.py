@@ -32,6 +32,10 @@ class OptimisticKVStore:
         self.current_batch_ops = []
         self.un_committed = self.un_committed[:-1]
 
+    def discard_current_batch(self):
+        # Operations done for a batch which was not created
+        self.current_batch_ops = []
+
     def commit_batch(self):
         # Commit an already created batch
         if self.un_committed:
@@ -1,3 +1,5 @@
+from typing import Iterable, Tuple
+
 from stp_core.common.log import getlogger
 
 logger = getlogger()
@@ -19,6 +21,10 @@ class StateTsDbStorage():
     def set(self, timestamp: int, root_hash: bytes):
         self._storage.put(str(timestamp), root_hash)
 
+    def set_batch(self, items: Iterable[Tuple[int, bytes]]):
+        self._storage.setBatch([(str(timestamp), root_hash)
+                                for timestamp, root_hash in items])
+
     def close(self):
         self._storage.close()
 
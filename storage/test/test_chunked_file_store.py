@@ -117,3 +117,48 @@ def test_get_range(populatedChunkedFileStore):
         for k, v in populatedChunkedFileStore.iterator(
                 start=frm, end=to):
             assert data[int(k) - 1] == v
+
+
+def test_get_reads_entries_by_offsets(populatedChunkedFileStore, monkeypatch):
+    store = populatedChunkedFileStore
+    offsetsFiles = os.listdir(store.offsetsDir)
+    assert len(offsetsFiles) == math.ceil(dataSize / chunkSize)
+
+    # Chunks are not opened and scanned for reading entries
+    def openChunk(index):
+        raise AssertionError("chunk {} is opened".format(index))
+    monkeypatch.setattr(store, '_openChunk', openChunk)
+
+    for key in range(1, dataSize + 1):
+        assert store.get(key) == getValue(key)
+    assert [v for _, v in store.iterator(start=2, end=dataSize)] == data[1:]
+    assert store.size == dataSize
+
+    with pytest.raises(KeyError):
+        store.get(dataSize + 1)
+    with pytest.raises(KeyError):
+        store.get(dataSize + chunkSize + 1)
+    assert len(os.listdir(store.dataDir)) == math.ceil(dataSize / chunkSize)
+
+
+def test_offsets_rebuilt_when_missing_or_outdated(tempdir,
+                                                  populatedChunkedFileStore):
+    store = populatedChunkedFileStore
+    store.close()
+    os.remove(os.path.join(store.offsetsDir, '1'))
+    lastOffsets = os.path.join(store.offsetsDir, str(dataSize - dataSize % chunkSize + 1))
+    with open(lastOffsets, 'r+b') as f:
+        f.truncate(0)
+
+    store = ChunkedFileStore(tempdir, "chunked_data", True, True, chunkSize)
+    assert store.size == dataSize
+    for key in range(1, dataSize + 1):
+        assert store.get(key) == getValue(key)
+    assert os.path.getsize(lastOffsets) == \
+        (dataSize % chunkSize) * ChunkedFileStore.offsetEntry.size
+
+    # Entries appended after reopening are read by offsets too
+    store.put(None, getValue(dataSize + 1))
+    assert store.get(dataSize + 1) == getValue(dataSize + 1)
+    assert store.size == dataSize + 1
+    store.close()
@@ -142,3 +142,12 @@ def test_batch_bytes(kv):
 
     for i in range(5):
         assert 'v'.format(i).encode() == kv.get('k'.format(i))
+
+
+def test_get_multiple(kv):
+    kv.setBatch([('k{}'.format(i), 'v{}'.format(i)) for i in range(5)])
+
+    assert [bytes(v) for v in kv.get_multiple(['k3', b'k0', 'k3'])] == \
+        [b'v3', b'v0', b'v3']
+    with pytest.raises(KeyError):
+        kv.get_multiple(['k1', 'k5'])
@@ -58,3 +58,11 @@ def test_get_last_key(storage_with_ts_root_hashes):
 def test_empty_storage_get_last_key(empty_storage):
     storage = empty_storage
     assert storage.get_last_key() is None
+
+
+def test_set_batch(empty_storage):
+    storage = empty_storage
+    storage.set_batch([(7, "aaaa"), (3, "bbbb")])
+    assert storage.get(7).decode() == "aaaa"
+    assert storage.get_equal_or_prev(5).decode() == "bbbb"
+    assert storage.get_last_key().decode() == '7'
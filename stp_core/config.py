@@ -35,7 +35,28 @@ ENABLE_HEARTBEATS = False
 HEARTBEAT_FREQ = 5      # seconds
 ZMQ_CLIENT_QUEUE_SIZE = 3000  # messages (0 - no limit)
 ZMQ_NODE_QUEUE_SIZE = 20000  # messages (0 - no limit)
+# Whether stacks receive only from the sockets a poller reports as ready,
+# waking up an idle Looper once any socket becomes readable, instead of
+# trying to receive from every socket each time they are serviced.
+# Listener and sender quotas apply in both cases. Disabled by default, so
+# stacks are serviced as before unless a pool opts in.
+ZMQ_EVENT_DRIVEN_RECEIVE = False
 
 
 # All messages exceeding the limit will be rejected without processing
 MSG_LEN_LIMIT = 768 * 1024
+
+# Whether batches are sent as frames of length prefixed serialized messages
+# instead of BATCH messages with the serialized messages as JSON strings.
+# Both formats are always accepted. Nodes advertise on connection that they
+# accept frames and frames are sent only to the nodes which advertised it,
+# so nodes not supporting frames still get BATCH messages. Sending frames is
+# disabled by default, so batches go out as before unless a pool opts in.
+BATCH_FRAMING_ENABLED = False
+
+# Serialization of 3PC, PROPAGATE and CATCHUP_REP messages sent to nodes,
+# 'json' or 'msgpack'. msgpack is used only for nodes which advertised that
+# they accept both it and batch frames, and only with BATCH_FRAMING_ENABLED;
+# clients always get JSON. JSON by default, so nodes send messages as before
+# unless a pool opts in.
+NODE_STACK_SERIALIZATION = 'json'
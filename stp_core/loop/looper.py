@@ -4,6 +4,7 @@ import inspect
 import signal
 import sys
 import time
+import weakref
 from asyncio.coroutines import CoroWrapper
 from typing import List, Optional
 
@@ -61,6 +62,22 @@ class Prodable:
                                   .format(self))
 
 
+# Events waking up idle Loopers, by event loop the Loopers run on
+_idle_wakeup_events = weakref.WeakKeyDictionary()
+
+
+def idle_wakeup_event(loop) -> asyncio.Event:
+    """
+    Returns the event which, once set, ends waiting of an idle Looper
+    running on the given event loop, e.g. when a socket becomes readable
+    """
+    event = _idle_wakeup_events.get(loop)
+    if event is None:
+        event = asyncio.Event(loop=loop)
+        _idle_wakeup_events[loop] = event
+    return event
+
+
 class Looper:
     """
     A helper class for asyncio's event_loop
@@ -205,12 +222,18 @@ class Looper:
         """
         Execute `runOnce` with a small tolerance of 0.01 seconds so that the Prodables
         can complete their other asynchronous tasks not running on the event-loop.
+        The tolerance is cut short once the idle wakeup event is set.
         """
         start = time.perf_counter()
+        wakeup = idle_wakeup_event(self.loop)
+        wakeup.clear()
         msgsProcessed = await self.prodAllOnce()
         if msgsProcessed == 0:
             # if no let other stuff run
-            await asyncio.sleep(0.01, loop=self.loop)
+            try:
+                await asyncio.wait_for(wakeup.wait(), 0.01, loop=self.loop)
+            except asyncio.TimeoutError:
+                pass
         dur = time.perf_counter() - start
         if dur >= 0.5:
             logger.debug("it took {:.3f} seconds to run once nicely".
@@ -339,3 +339,91 @@ def test_queue_size_limit_set(tdir, tconf):
     stack.start()
     assert stack.listener.get_hwm() == queue_size
     stack.stop()
+
+
+def test_frame_msgs_round_trip():
+    msgs = [b'{"a": 1}', b'', b'po', b'{"b": "\xc3\xa9"}']
+    frame = ZStack.frameMsgs(msgs)
+    assert frame.startswith(ZStack.batchFramePrefix)
+    assert ZStack.unframeMsgs(frame) == msgs
+
+    with pytest.raises(ValueError):
+        ZStack.unframeMsgs(frame[:-1])
+
+
+def test_framed_batch_is_received_as_separate_msgs(tdir, looper, tconf):
+    names = ['Alpha', 'Beta']
+    (alpha, beta), (alphaP, betaP) = create_and_prep_stacks(names, tdir,
+                                                            looper, tconf)
+    msgs = [{'greetings': 'hi'}, {'greetings': 'hello'}]
+    frame = ZStack.frameMsgs([alpha.serializeMsg(msg) for msg in msgs])
+    alpha.transmit(frame, alpha.getRemote(beta.name).uid, serialized=True)
+
+    for msg in msgs:
+        looper.run(eventually(chkPrinted, betaP, msg))
+
+
+def test_framing_is_advertised(tdir, looper, tconf):
+    names = ['Alpha', 'Beta']
+    (alpha, beta), (alphaP, betaP) = create_and_prep_stacks(names, tdir,
+                                                            looper, tconf)
+    assert beta.name not in alpha.framingRemotes
+
+    beta.advertiseFraming(alpha.name)
+
+    def chk():
+        assert beta.name in alpha.framingRemotes
+
+    looper.run(eventually(chk))
+    assert not alphaP.printeds
+
+
+def test_msgpack_msgs_are_received_after_advertising(tdir, looper, tconf):
+    names = ['Alpha', 'Beta']
+    (alpha, beta), (alphaP, betaP) = create_and_prep_stacks(names, tdir,
+                                                            looper, tconf)
+    msg = {'op': 'PREPARE', 'ppSeqNo': 1, 'txns': {1: 'a'}}
+    assert ZStack.deserializeMsg(ZStack.serializeMsgpack(msg)) == msg
+
+    beta.advertiseMsgpack(alpha.name)
+
+    def chk():
+        assert beta.name in alpha.msgpackRemotes
+
+    looper.run(eventually(chk))
+    assert not alphaP.printeds
+
+    frame = ZStack.frameMsgs([alpha.serializeMsgpack(msg),
+                              alpha.serializeMsg({'greetings': 'hi'})])
+    alpha.transmit(frame, alpha.getRemote(beta.name).uid, serialized=True)
+    looper.run(eventually(chkPrinted, betaP, msg))
+    looper.run(eventually(chkPrinted, betaP, {'greetings': 'hi'}))
+
+
+def test_event_driven_receive_from_ready_sockets_only(tdir, looper, tconf,
+                                                      monkeypatch):
+    monkeypatch.setattr(tconf, 'ZMQ_EVENT_DRIVEN_RECEIVE', True)
+    names = ['Alpha', 'Beta']
+    (alpha, beta), (alphaP, betaP) = create_and_prep_stacks(names, tdir,
+                                                            looper, tconf)
+    assert beta.listener in beta._polledSockets
+    assert alpha.getRemote(beta.name).socket in alpha._polledSockets
+
+    receives = []
+    receiveFromListener = beta._receiveFromListener
+
+    def recordingReceive(quota):
+        receives.append(quota)
+        return receiveFromListener(quota)
+
+    monkeypatch.setattr(beta, '_receiveFromListener', recordingReceive)
+    looper.runFor(0.5)
+    assert not receives
+
+    msg = {'greetings': 'hi'}
+    alpha.send(msg, beta.name)
+    looper.run(eventually(chkPrinted, betaP, msg))
+    assert receives == [beta.listenerQuota]
+
+    beta.stop()
+    assert not beta._polledSockets
@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 
 from stp_core.common.config.util import getConfig
@@ -10,15 +11,17 @@ except ImportError:
 
 import os
 import shutil
+import struct
 import sys
 import time
 from binascii import hexlify, unhexlify
 from collections import deque
-from typing import Mapping, Tuple, Any, Union, Optional
+from typing import Mapping, Tuple, Any, Union, Optional, List, Set
 
 from common.exceptions import PlenumTypeError, PlenumValueError
 
 # import stp_zmq.asyncio
+import msgpack
 import zmq.auth
 from stp_core.crypto.nacl_wrappers import Signer, Verifier
 from stp_core.crypto.util import isHex, ed25519PkToCurve25519
@@ -29,6 +32,7 @@ from zmq.utils.monitor import recv_monitor_message
 
 import zmq
 from stp_core.common.log import getlogger
+from stp_core.loop.looper import idle_wakeup_event
 from stp_core.network.network_interface import NetworkInterface
 from stp_zmq.util import createEncAndSigKeys, \
     moveKeyFilesToCorrectLocations, createCertsFromKeys
@@ -55,9 +59,23 @@ class ZStack(NetworkInterface):
     pongMessage = 'po'
     healthMessages = {pingMessage.encode(), pongMessage.encode()}
 
+    # Prefix of a batch of serialized messages each preceded by its length,
+    # the second byte is the version of the format. Serialized messages never
+    # start with a zero byte, so batches are told apart without decoding.
+    # The prefix alone, an empty batch, is sent to remotes to advertise that
+    # batches of this format are accepted from them.
+    batchFramePrefix = b'\x00\x01'
+    _batchFrameLen = struct.Struct('>I')
+    # Prefix of a message serialized with msgpack. The prefix alone is sent
+    # to remotes to advertise that msgpack messages are accepted from them.
+    msgpackPrefix = b'\x00\x02'
+
     # TODO: This is not implemented, implement this
     messageTimeout = 3
 
+    # Instrumentation counting bytes sent and received, set by the node
+    instrumentation = None
+
     _RemoteClass = Remote
 
     def __init__(self, name, ha, basedirpath, msgHandler, restricted=True,
@@ -90,7 +108,11 @@ class ZStack(NetworkInterface):
         self.setupOwnKeysIfNeeded()
         self.setupSigning()
 
-        # self.poller = test.asyncio.Poller()
+        # Sockets which are polled when `ZMQ_EVENT_DRIVEN_RECEIVE` is enabled,
+        # each mapped to its file descriptor and the remote's identity
+        self.poller = zmq.Poller()
+        self._polledSockets = {}
+        self._loop = None
 
         self.restricted = restricted
 
@@ -105,6 +127,12 @@ class ZStack(NetworkInterface):
 
         self.remotesByKeys = {}
 
+        # Names of remotes which advertised they accept batch frames
+        self.framingRemotes = set()  # type: Set[str]
+
+        # Names of remotes which advertised they accept msgpack messages
+        self.msgpackRemotes = set()  # type: Set[str]
+
         # Indicates if this stack will maintain any remotes or will
         # communicate simply to listeners. Used in ClientZStack
         self.onlyListener = onlyListener
@@ -359,6 +387,7 @@ class ZStack(NetworkInterface):
         )
 
     def close(self):
+        self._unregisterPolledSockets()
         if self.listener_monitor is not None:
             self.listener.disable_monitor()
             self.listener_monitor = None
@@ -435,10 +464,68 @@ class ZStack(NetworkInterface):
             return self.processReceived(pracLimit)
         return 0
 
+    def _unframeAndAppend(self, msg, ident):
+        """
+        Appends the received message, or each message of a received batch
+        frame, to the received messages
+        """
+        if not msg.startswith(self.batchFramePrefix):
+            self._verifyAndAppend(msg, ident)
+            return
+        if msg == self.batchFramePrefix:
+            frm = self.remotesByKeys[ident].name if ident in self.remotesByKeys else ident
+            self.framingRemotes.add(frm)
+            return
+        try:
+            self.msgLenVal.validate(msg)
+            msgs = self.unframeMsgs(msg)
+        except (ValueError, InvalidMessageExceedingSizeException) as ex:
+            errstr = 'Batch will be discarded due to {}'.format(ex)
+            frm = self.remotesByKeys[ident].name if ident in self.remotesByKeys else ident
+            logger.error("Got from {} {}".format(frm, errstr))
+            self.msgRejectHandler(errstr, frm)
+            return
+        for m in msgs:
+            self._verifyAndAppend(m, ident)
+
+    @classmethod
+    def frameMsgs(cls, msgs: List[bytes]) -> bytes:
+        """
+        Joins serialized messages in a batch frame, the messages are not
+        serialized again
+        """
+        parts = [cls.batchFramePrefix]
+        for msg in msgs:
+            parts.append(cls._batchFrameLen.pack(len(msg)))
+            parts.append(msg)
+        return b''.join(parts)
+
+    @classmethod
+    def unframeMsgs(cls, frame: bytes) -> List[bytes]:
+        msgs = []
+        len_size = cls._batchFrameLen.size
+        pos = len(cls.batchFramePrefix)
+        while pos < len(frame):
+            if pos + len_size > len(frame):
+                raise ValueError('truncated batch frame')
+            length, = cls._batchFrameLen.unpack_from(frame, pos)
+            pos += len_size
+            if pos + length > len(frame):
+                raise ValueError('truncated batch frame')
+            msgs.append(frame[pos:pos + length])
+            pos += length
+        return msgs
+
     def _verifyAndAppend(self, msg, ident):
+        if msg == self.msgpackPrefix:
+            frm = self.remotesByKeys[ident].name if ident in self.remotesByKeys else ident
+            self.msgpackRemotes.add(frm)
+            return False
         try:
             self.msgLenVal.validate(msg)
-            decoded = msg.decode()
+            # msgpack messages are passed undecoded to `deserializeMsg`
+            decoded = msg if msg.startswith(self.msgpackPrefix) \
+                else msg.decode()
         except (UnicodeDecodeError, InvalidMessageExceedingSizeException) as ex:
             errstr = 'Message will be discarded due to {}'.format(ex)
             frm = self.remotesByKeys[ident].name if ident in self.remotesByKeys else ident
@@ -463,7 +550,11 @@ class ZStack(NetworkInterface):
                     # Router probing sends empty message on connection
                     continue
                 i += 1
-                self._verifyAndAppend(msg, ident)
+                if self.instrumentation is not None and \
+                        self.instrumentation.enabled:
+                    self.instrumentation.counter('stack_received_bytes').inc(
+                        len(msg))
+                self._unframeAndAppend(msg, ident)
             except zmq.Again:
                 break
         if i > 0:
@@ -483,24 +574,97 @@ class ZStack(NetworkInterface):
         for ident, remote in self.remotesByKeys.items():
             if not remote.socket:
                 continue
-            i = 0
-            sock = remote.socket
-            while i < quotaPerRemote:
-                try:
-                    msg, = sock.recv_multipart(flags=zmq.NOBLOCK)
-                    if not msg:
-                        # Router probing sends empty message on connection
-                        continue
-                    i += 1
-                    self._verifyAndAppend(msg, ident)
-                except zmq.Again:
-                    break
-            if i > 0:
-                logger.trace('{} got {} messages through remote {}'.
-                             format(self, i, remote))
-            totalReceived += i
+            totalReceived += self._receiveFromRemote(ident, remote.socket,
+                                                     quotaPerRemote)
+        return totalReceived
+
+    def _receiveFromRemote(self, ident, sock, quota) -> int:
+        i = 0
+        while i < quota:
+            try:
+                msg, = sock.recv_multipart(flags=zmq.NOBLOCK)
+                if not msg:
+                    # Router probing sends empty message on connection
+                    continue
+                i += 1
+                if self.instrumentation is not None and \
+                        self.instrumentation.enabled:
+                    self.instrumentation.counter('stack_received_bytes').inc(
+                        len(msg))
+                self._unframeAndAppend(msg, ident)
+            except zmq.Again:
+                break
+        if i > 0:
+            logger.trace('{} got {} messages through remote {}'.
+                         format(self, i, self.remotesByKeys.get(ident)))
+        return i
+
+    def _receiveFromReady(self) -> int:
+        """
+        Receives messages only from the listener and the remotes whose
+        sockets have messages, as reported by the poller
+        :return: number of received messages
+        """
+        self._updatePolledSockets()
+        totalReceived = 0
+        for sock, _ in self.poller.poll(0):
+            if sock is self.listener:
+                totalReceived += self._receiveFromListener(
+                    quota=self.listenerQuota)
+            else:
+                _, ident = self._polledSockets[sock]
+                totalReceived += self._receiveFromRemote(ident, sock,
+                                                         self.senderQuota)
         return totalReceived
 
+    def _updatePolledSockets(self):
+        """
+        Registers the listener and sockets of remotes in the poller and their
+        file descriptors in the event loop, so a Looper waiting idle is woken
+        up once any of them becomes readable. Sockets which were closed are
+        unregistered.
+        """
+        sockets = {remote.socket: ident
+                   for ident, remote in self.remotesByKeys.items()
+                   if remote.socket is not None}
+        if self.listener is not None:
+            sockets[self.listener] = None
+        closed = [sock for sock, (_, ident) in self._polledSockets.items()
+                  if sock not in sockets or sockets[sock] != ident]
+        for sock in closed:
+            self._unregisterPolledSocket(sock)
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self._unregisterPolledSockets()
+            self._loop = loop
+        for sock, ident in sockets.items():
+            if sock in self._polledSockets:
+                continue
+            fd = sock.FD
+            self.poller.register(sock, zmq.POLLIN)
+            self._loop.add_reader(fd, self._socketReadable, sock)
+            self._polledSockets[sock] = (fd, ident)
+
+    def _unregisterPolledSocket(self, sock):
+        fd, _ = self._polledSockets.pop(sock)
+        self.poller.unregister(sock)
+        if not self._loop.is_closed():
+            self._loop.remove_reader(fd)
+
+    def _unregisterPolledSockets(self):
+        for sock in list(self._polledSockets):
+            self._unregisterPolledSocket(sock)
+
+    def _socketReadable(self, sock):
+        # File descriptor of a socket only signals that its events may have
+        # changed, getting the events also resets the signal
+        try:
+            events = sock.getsockopt(zmq.EVENTS)
+        except zmq.ZMQError:
+            return
+        if events & zmq.POLLIN:
+            idle_wakeup_event(self._loop).set()
+
     async def _serviceStack(self, age):
         # TODO: age is unused
 
@@ -512,8 +676,11 @@ class ZStack(NetworkInterface):
                 self.config.HEARTBEAT_FREQ):
             self.send_heartbeats()
 
-        self._receiveFromListener(quota=self.listenerQuota)
-        self._receiveFromRemotes(quotaPerRemote=self.senderQuota)
+        if self.config.ZMQ_EVENT_DRIVEN_RECEIVE:
+            self._receiveFromReady()
+        else:
+            self._receiveFromListener(quota=self.listenerQuota)
+            self._receiveFromRemotes(quotaPerRemote=self.senderQuota)
         return len(self.rxMsgs)
 
     def processReceived(self, limit):
@@ -714,6 +881,9 @@ class ZStack(NetworkInterface):
                 msg = self.prepare_to_send(msg)
             # socket.send(self.signedMsg(msg), flags=zmq.NOBLOCK)
             socket.send(msg, flags=zmq.NOBLOCK)
+            if self.instrumentation is not None and \
+                    self.instrumentation.enabled:
+                self.instrumentation.counter('stack_sent_bytes').inc(len(msg))
             logger.trace('{} transmitting message {} to {}'.format(self, msg, uid))
             if not remote.isConnected and msg not in self.healthMessages:
                 logger.info('Remote {} is not connected - message will not be sent immediately.'
@@ -737,6 +907,9 @@ class ZStack(NetworkInterface):
             logger.trace('{} transmitting {} to {} through listener socket'.
                          format(self, msg, ident))
             self.listener.send_multipart([ident, msg], flags=zmq.NOBLOCK)
+            if self.instrumentation is not None and \
+                    self.instrumentation.enabled:
+                self.instrumentation.counter('stack_sent_bytes').inc(len(msg))
         except zmq.Again:
             return False, None
         except InvalidMessageExceedingSizeException as ex:
@@ -759,13 +932,32 @@ class ZStack(NetworkInterface):
         assert isinstance(msg, bytes)
         return msg
 
-    @staticmethod
-    def deserializeMsg(msg):
+    @classmethod
+    def serializeMsgpack(cls, msg: Mapping) -> bytes:
+        return cls.msgpackPrefix + msgpack.packb(msg, use_bin_type=True)
+
+    @classmethod
+    def deserializeMsg(cls, msg):
         if isinstance(msg, bytes):
+            if msg.startswith(cls.msgpackPrefix):
+                return msgpack.unpackb(msg[len(cls.msgpackPrefix):],
+                                       encoding='utf-8')
             msg = msg.decode()
         msg = json.loads(msg)
         return msg
 
+    def advertiseFraming(self, remoteName):
+        """
+        Lets the remote know that batch frames are accepted
+        """
+        self.transmit(self.batchFramePrefix, remoteName, serialized=True)
+
+    def advertiseMsgpack(self, remoteName):
+        """
+        Lets the remote know that msgpack messages are accepted
+        """
+        self.transmit(self.msgpackPrefix, remoteName, serialized=True)
+
     def signedMsg(self, msg: bytes, signer: Signer=None):
         sig = self.signer.signature(msg)
         return msg + sig